@@ -15,6 +15,7 @@ Usage:
 
 from __future__ import annotations
 
+import gzip
 import os
 import sqlite3
 import sys
@@ -51,7 +52,8 @@ def generate_case_packet(db_path: str, lead_id: str, output_dir: str = None) ->
         output_dir: Directory to save. Defaults to data/case_packets/.
 
     Returns:
-        Path to the generated HTML file.
+        Path to the generated HTML file. A gzip copy is written alongside
+        it as ``<path>.gz`` for servers that can send it pre-compressed.
     """
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
@@ -191,7 +193,9 @@ def generate_case_packet(db_path: str, lead_id: str, output_dir: str = None) ->
     filename = f"VF_PACKET_{county_clean}_{short_id}.html"
     filepath = out_dir / filename
 
-    filepath.write_text(html, encoding="utf-8")
+    data = html.encode("utf-8")
+    filepath.write_bytes(data)
+    filepath.with_name(filename + ".gz").write_bytes(gzip.compress(data, compresslevel=6, mtime=0))
     return str(filepath)
 
 
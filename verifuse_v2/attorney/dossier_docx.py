@@ -20,6 +20,7 @@ Usage:
 
 from __future__ import annotations
 
+import io
 import os
 import sqlite3
 import sys
@@ -654,19 +655,8 @@ def _add_footer(doc: Document):
 
 # ── Main Generator ─────────────────────────────────────────────────
 
-def generate_dossier(db_path: str, lead_id: str, output_dir: str = None) -> str:
-    """Generate a 3-page DOCX dossier for a lead.
-
-    Args:
-        db_path: Path to the SQLite database.
-        lead_id: The lead ID to generate the dossier for.
-        output_dir: Directory to save the .docx file. Defaults to data/dossiers/.
-
-    Returns:
-        Path to the generated .docx file.
-    """
-    data = _fetch_lead(db_path, lead_id)
-
+def _build_document(data: dict) -> Document:
+    """Lay out the 3-page dossier for an already-fetched lead."""
     doc = Document()
     section = doc.sections[0]
     section.page_height = Inches(11)
@@ -680,20 +670,51 @@ def generate_dossier(db_path: str, lead_id: str, output_dir: str = None) -> str:
     _build_page_2(doc, data)
     _build_page_3(doc, data)
     _add_footer(doc)
+    return doc
 
-    out_dir = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
-    out_dir.mkdir(parents=True, exist_ok=True)
 
+def _dossier_filename(data: dict, lead_id: str) -> str:
     county = (data.get("county") or "UNK").replace(" ", "_")
     short_id = str(lead_id)[:12]
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    filename = f"VF_DOSSIER_{county}_{short_id}_{timestamp}.docx"
-    filepath = out_dir / filename
+    return f"VF_DOSSIER_{county}_{short_id}_{timestamp}.docx"
+
+
+def generate_dossier(db_path: str, lead_id: str, output_dir: str = None) -> str:
+    """Generate a 3-page DOCX dossier for a lead.
 
+    Args:
+        db_path: Path to the SQLite database.
+        lead_id: The lead ID to generate the dossier for.
+        output_dir: Directory to save the .docx file. Defaults to data/dossiers/.
+
+    Returns:
+        Path to the generated .docx file.
+    """
+    data = _fetch_lead(db_path, lead_id)
+    doc = _build_document(data)
+
+    out_dir = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    filepath = out_dir / _dossier_filename(data, lead_id)
     doc.save(str(filepath))
     return str(filepath)
 
 
+def render_dossier(db_path: str, lead_id: str) -> tuple[str, bytes]:
+    """Generate the dossier in memory — returns (filename, .docx bytes).
+
+    Same document as generate_dossier() without touching disk; used by the
+    API, which streams the bytes straight back to the client.
+    """
+    data = _fetch_lead(db_path, lead_id)
+    doc = _build_document(data)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return _dossier_filename(data, lead_id), buf.getvalue()
+
+
 # ── CLI ────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+-- Migration 021: Cross-worker user-cache invalidation stamp
+-- Each API worker caches users rows for a short TTL; these triggers bump
+-- user_auth_stamp.n whenever an access-control column changes or a user is
+-- deleted, so every worker drops its cache within one probe interval.
+-- Safe to re-run (IF NOT EXISTS / OR IGNORE throughout)
+
+CREATE TABLE IF NOT EXISTS user_auth_stamp (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    n  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO user_auth_stamp (id, n) VALUES (1, 0);
+
+-- UPDATE OF columns are not validated, so older users tables are fine
+CREATE TRIGGER IF NOT EXISTS trg_users_auth_stamp_upd
+AFTER UPDATE OF is_active, is_admin, role, attorney_status, verified_attorney, email_verified ON users
+BEGIN
+    UPDATE user_auth_stamp SET n = n + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_auth_stamp_del
+AFTER DELETE ON users
+BEGIN
+    UPDATE user_auth_stamp SET n = n + 1 WHERE id = 1;
+END;
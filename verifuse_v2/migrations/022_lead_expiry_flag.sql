@@ -0,0 +1,38 @@
+-- Migration 022: Maintained lead expiry flag
+-- leads.is_expired (added by the pre-hook) is 1 once claim_deadline has
+-- passed, so the API's expired filter is a plain column predicate instead
+-- of a per-row TRIM/NULLIF/date() chain. The triggers cover writes; the
+-- API's hourly sweep covers the calendar rolling past a deadline.
+-- Safe to re-run (IF EXISTS / IF NOT EXISTS throughout)
+
+-- Superseded triggers that wrote statute_window_status at app startup
+DROP TRIGGER IF EXISTS trg_leads_expiry_ins;
+DROP TRIGGER IF EXISTS trg_leads_expiry_upd;
+DROP TRIGGER IF EXISTS trg_leads_expiry_extend;
+
+CREATE TRIGGER IF NOT EXISTS trg_leads_is_expired_ins
+AFTER INSERT ON leads
+WHEN NEW.is_expired IS NOT (CASE WHEN date(NULLIF(TRIM(NEW.claim_deadline), '')) < date('now') THEN 1 ELSE 0 END)
+BEGIN
+    UPDATE leads
+    SET is_expired = (CASE WHEN date(NULLIF(TRIM(NEW.claim_deadline), '')) < date('now') THEN 1 ELSE 0 END)
+    WHERE rowid = NEW.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_leads_is_expired_upd
+AFTER UPDATE OF claim_deadline, is_expired ON leads
+WHEN NEW.is_expired IS NOT (CASE WHEN date(NULLIF(TRIM(NEW.claim_deadline), '')) < date('now') THEN 1 ELSE 0 END)
+BEGIN
+    UPDATE leads
+    SET is_expired = (CASE WHEN date(NULLIF(TRIM(NEW.claim_deadline), '')) < date('now') THEN 1 ELSE 0 END)
+    WHERE rowid = NEW.rowid;
+END;
+
+-- Backfill: leads whose deadline has already passed
+UPDATE leads SET is_expired = 1
+WHERE is_expired = 0
+  AND claim_deadline IS NOT NULL
+  AND date(NULLIF(TRIM(claim_deadline), '')) < date('now');
+
+-- Active-lead set for the list/preview/stats filters
+CREATE INDEX IF NOT EXISTS idx_leads_active ON leads(id) WHERE is_expired = 0;
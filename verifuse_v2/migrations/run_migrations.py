@@ -709,6 +709,16 @@ def _apply_018_column_additions(conn: sqlite3.Connection) -> None:
     log.info("  018 column additions complete")
 
 
+def _apply_022_column_additions(conn: sqlite3.Connection) -> None:
+    """Migration 022 — maintained lead expiry flag."""
+    if _table_exists(conn, "leads"):
+        if "is_expired" not in _get_columns(conn, "leads"):
+            log.info("  ADD COLUMN leads.is_expired")
+            conn.execute("ALTER TABLE leads ADD COLUMN is_expired INTEGER NOT NULL DEFAULT 0")
+    conn.commit()
+    log.info("  022 column additions complete")
+
+
 def _pre_migration_hooks(filename: str, conn: sqlite3.Connection) -> None:
     """
     Run pre-flight repairs before a migration SQL file is applied.
@@ -721,6 +731,9 @@ def _pre_migration_hooks(filename: str, conn: sqlite3.Connection) -> None:
         _apply_017_column_additions(conn)
         _apply_018_column_additions(conn)
 
+    if filename == "022_lead_expiry_flag.sql":
+        _apply_022_column_additions(conn)
+
     if filename == "006_sota_indexes.sql":
         # Dedupe probe: remove duplicate user_daily_lead_views rows
         # before creating uniq_user_day_lead UNIQUE index
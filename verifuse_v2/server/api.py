@@ -18,30 +18,46 @@ mobile-safe download headers, Stripe guard.
 from __future__ import annotations
 
 import asyncio
+import collections
 import concurrent.futures
+import contextlib
+import functools
 import hashlib
 import hmac
+import itertools
 import json
 import logging
+import multiprocessing
 import os
+import pickle
+import queue
 import random
 import re
+import secrets
 import sqlite3
-import string
+import threading
 import time as _time
+import urllib.parse
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
-from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
+from fpdf import FPDF
 from pydantic import BaseModel
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.datastructures import MutableHeaders
+from verifuse_v2.attorney.case_packet import generate_case_packet
+from verifuse_v2.attorney.dossier_docx import render_dossier
+from verifuse_v2.legal.mail_room import generate_letter
 from verifuse_v2.utils.logging_setup import setup_logging, request_id_var
 
 # ── Fail-fast: VERIFUSE_DB_PATH ────────────────────────────────────
@@ -70,6 +86,164 @@ else:
     STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_TEST_PUBLISHABLE_KEY") or ""
     STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_TEST_WEBHOOK_SECRET") or os.environ.get("STRIPE_WEBHOOK_SECRET")
 
+# Stripe SDK: imported and keyed once. None when billing is unconfigured or
+# the SDK is missing — callers already turn that into a 503 / 400.
+_stripe = None
+if STRIPE_SECRET_KEY or STRIPE_WEBHOOK_SECRET:
+    try:
+        import stripe as _stripe
+        _stripe.api_key = STRIPE_SECRET_KEY
+    except ImportError:
+        _stripe = None
+
+# JSON codec: orjson when installed (bytes in/out, no str round-trip),
+# stdlib otherwise. Both raise ValueError subclasses on bad input.
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_default(obj):
+    """Encode what SQLite can hand back beyond JSON scalars (BLOBs)."""
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if _orjson is not None:
+    _json_loads = _orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        # NON_STR_KEYS: stdlib json stringifies int dict keys; keep parity
+        return _orjson.dumps(obj, default=_json_default, option=_orjson.OPT_NON_STR_KEYS)
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(
+            obj, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+        ).encode("utf-8")
+
+
+async def _request_json(request: Request):
+    """Decode the request body as JSON (Request.json() with a faster decoder).
+
+    The result is kept on request.state, so handlers that delegate to another
+    handler (restricted unlock -> unlock) decode the body only once.
+    """
+    body = getattr(request.state, "json_body", None)
+    if body is None:
+        body = request.state.json_body = _json_loads(await request.body())
+    return body
+
+
+def _raw_json(payload) -> Response:
+    """Pre-encoded JSON response — skips FastAPI's per-value jsonable_encoder walk."""
+    return Response(content=_json_dumps(payload), media_type="application/json")
+
+
+class _FastJSONResponse(JSONResponse):
+    """App-wide default response class: JSONResponse rendered via _json_dumps."""
+
+    def render(self, content) -> bytes:
+        return _json_dumps(content)
+
+
+def _fetch_dicts(conn: sqlite3.Connection, sql: str, params=()) -> list[dict]:
+    """Run a query and return plain dicts, keyed once from cursor.description.
+
+    Rows come back as tuples (cursor-level row_factory=None), so no
+    sqlite3.Row objects are built just to be copied into dicts.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, r)) for r in cur]
+
+
+# ── File downloads: nginx X-Accel-Redirect offload ──────────────────
+# VERIFUSE_XACCEL_MAP="/abs/dir=/_protected/name/;..." maps on-disk roots to
+# nginx `internal` locations. Files under a mapped root are sent by nginx
+# (sendfile, zero-copy); anything else, or no map at all, streams through
+# FileResponse as before.
+
+def _parse_xaccel_map(spec: str) -> list[tuple[Path, str]]:
+    pairs = []
+    for item in spec.split(";"):
+        root, sep, prefix = item.strip().partition("=")
+        if sep and root and prefix:
+            pairs.append((Path(root).resolve(), prefix.rstrip("/") + "/"))
+    return pairs
+
+
+_XACCEL_MAP = _parse_xaccel_map(os.environ.get("VERIFUSE_XACCEL_MAP", ""))
+
+
+def _attachment_header(fname: str) -> str:
+    """Content-Disposition value, RFC 5987-encoded when the name is not ASCII-safe."""
+    quoted = urllib.parse.quote(fname)
+    if quoted != fname:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{fname}"'
+
+
+def _xaccel_uri(filepath) -> Optional[str]:
+    """nginx internal URI for a file under a mapped root, else None."""
+    if _XACCEL_MAP:  # resolve() costs a syscall per path component — only when needed
+        path = Path(filepath).resolve()
+        for root, prefix in _XACCEL_MAP:
+            if path.is_relative_to(root):
+                return prefix + urllib.parse.quote(path.relative_to(root).as_posix())
+    return None
+
+
+def _serve_file(filepath, fname: str, media_type: str, headers: Optional[dict] = None) -> Response:
+    """Download response for a file on disk — X-Accel-Redirect when mapped."""
+    hdrs = {"Content-Disposition": _attachment_header(fname), **(headers or {})}
+    uri = _xaccel_uri(filepath)
+    if uri:
+        hdrs["X-Accel-Redirect"] = uri
+        return Response(media_type=media_type, headers=hdrs)
+    return FileResponse(filepath, media_type=media_type, headers=hdrs)
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """True when Accept-Encoding admits gzip with a non-zero q-value (RFC 9110 §12.5.3)."""
+    gzip_q = star_q = None
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            star_q = q
+        else:
+            gzip_q = q
+    q = gzip_q if gzip_q is not None else star_q
+    return bool(q and q > 0)
+
+
+def _weak_etag(*parts) -> str:
+    """Weak validator over the values a generated document is built from."""
+    return 'W/"' + hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest() + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match already names this representation."""
+    inm = request.headers.get("if-none-match")
+    return bool(inm) and (inm.strip() == "*" or etag in inm)
+
+
 # ── HMAC Secret for preview_key (fail-fast) ─────────────────────────
 _PREVIEW_HMAC_SECRET = os.environ.get("PREVIEW_HMAC_SECRET") or os.environ.get("VERIFUSE_JWT_SECRET")
 if not _PREVIEW_HMAC_SECRET:
@@ -80,6 +254,7 @@ if not _PREVIEW_HMAC_SECRET:
         "Preview keys will be unstable across deploys."
     )
     raise RuntimeError("HMAC secret required — set PREVIEW_HMAC_SECRET or VERIFUSE_JWT_SECRET")
+_PREVIEW_HMAC_KEY = _PREVIEW_HMAC_SECRET.encode()
 
 log = logging.getLogger(__name__)
 setup_logging(level=os.environ.get("LOG_LEVEL", "INFO"))
@@ -97,18 +272,42 @@ from verifuse_v2.server.pricing import (
     INVESTIGATION_PACK,
     SIGNUP_BONUS_CREDITS,
     STARTER_PACK,
+    TIERS,
     build_price_map,
     get_monthly_credits,
     get_daily_limit,
 )
 
+# Tier config is static — fold the per-request lookups into frozen tables.
+# "" resolves to pricing's default tier, so unknown tiers keep their old fallback.
+_TIER_VALID_SET = frozenset(TIERS)
+_TIER_MONTHLY_CREDITS: dict[str, int] = {t: get_monthly_credits(t) for t in TIERS}
+_TIER_DAILY_LIMIT: dict[str, int] = {t: get_daily_limit(t) or 100 for t in TIERS}
+_DEFAULT_MONTHLY_CREDITS = get_monthly_credits("")
+_DEFAULT_DAILY_LIMIT = get_daily_limit("") or 100
+
 EXPECTED_CURRENCY = "usd"
 EXPECTED_LIVEMODE = STRIPE_MODE == "live"
 _price_prefix = "STRIPE_LIVE_PRICE_" if STRIPE_MODE == "live" else "STRIPE_TEST_PRICE_"
 
-# Map Stripe price_id → {tier, monthly_credits, kind}
-# Built at startup via build_price_map()
-_PRICE_MAP: dict[str, dict] = {}
+# Checkout redirect targets — env is fixed for the process lifetime.
+_BASE_URL = os.environ.get("VERIFUSE_BASE_URL", "https://verifuse.tech")
+_CREDITS_SUCCESS_URL = f"{_BASE_URL}/account?credits=1"
+_PRICING_URL = f"{_BASE_URL}/pricing"
+_ACCOUNT_URL = f"{_BASE_URL}/account"
+
+
+@dataclass(frozen=True, slots=True)
+class _PriceInfo:
+    """One Stripe price: what it sells and how many credits it grants."""
+    kind: str
+    tier: str
+    monthly_credits: int
+
+
+# Map Stripe price_id → _PriceInfo
+# Built at startup via build_price_map(); read-only afterwards
+_PRICE_MAP: Mapping[str, _PriceInfo] = MappingProxyType({})
 
 # ── Build ID (git short hash at import time) ─────────────────────────
 _BUILD_ID = "dev"
@@ -124,12 +323,44 @@ except Exception:
 
 # ── Database connection (strict VERIFUSE_DB_PATH) ───────────────────
 
+# WAL + synchronous=NORMAL: commits append to the WAL without an fsync; the
+# fsync happens at checkpoint. VERIFUSE_SQLITE_SAFE=1 restores FULL (fsync
+# per commit) for deployments that can't tolerate losing the last commits
+# on power loss.
+_SQLITE_SYNCHRONOUS = (
+    "FULL" if os.getenv("VERIFUSE_SQLITE_SAFE", "").lower() in ("1", "true", "yes") else "NORMAL"
+)
+# journal_mode is persistent in the DB file — once any connection has seen
+# WAL, new connections skip re-asserting it.
+_wal_confirmed = False
+
+
+def _ensure_wal(conn: sqlite3.Connection) -> str:
+    """Set journal_mode=WAL unless already confirmed; returns the mode."""
+    global _wal_confirmed
+    if _wal_confirmed:
+        return "wal"
+    mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    _wal_confirmed = mode == "wal"
+    return mode
+
+
+# Per-connection prepared-statement LRU (sqlite3 default is 128). Pooled
+# connections live for the process, so hot SQL stays compiled.
+_STMT_CACHE_SIZE = 256
+
+
 def _get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(VERIFUSE_DB_PATH)
+    conn = sqlite3.connect(VERIFUSE_DB_PATH, cached_statements=_STMT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    _ensure_wal(conn)
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=5000")
+    # Same durability/IO settings as the pooled connections. No cache_size —
+    # the page cache dies with this short-lived connection anyway.
+    conn.execute(f"PRAGMA synchronous={_SQLITE_SYNCHRONOUS}")
+    conn.execute("PRAGMA mmap_size = 268435456")    # 256MB memory-mapped I/O
+    conn.execute("PRAGMA temp_store = MEMORY")      # temp tables in RAM
     return conn
 
 
@@ -148,23 +379,93 @@ PDF_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
     thread_name_prefix="vf-pdf",
 )
 
+# ── ProcessPoolExecutor for Word / HTML document generators ──────────
+# generate_letter / generate_case_packet / render_dossier are pure-Python
+# renders that hold the GIL for hundreds of ms; a process pool keeps them
+# off the event loop *and* off each other. Workers start on first use via
+# forkserver (never fork a process that already runs executor threads).
+# Arguments and results are plain paths/strings/bytes, so pickling is cheap.
+#
+# The pool is created in the startup hook, not at import, and the
+# forkserver preloads the generator modules instead of the default
+# ["__main__"]. Workers still re-import the launching script, as every
+# non-fork start method does. A script that imports the app and drives it
+# (TestClient smoke runs) therefore needs an `if __name__ == "__main__":`
+# guard. Without one, the script re-runs inside the worker. If the app
+# starts up there, it gets no pool of its own (see _start_doc_executor), so
+# it can't trip multiprocessing's "bootstrapping phase" error and break the
+# parent's pool. While DOC_EXECUTOR is None, run_in_executor falls back to
+# the loop's default thread pool.
+
+_DOC_WORKERS = int(os.environ.get("VERIFUSE_DOC_WORKERS", max(2, (os.cpu_count() or 2) // 2)))
+_DOC_PRELOAD = [
+    "verifuse_v2.attorney.case_packet",
+    "verifuse_v2.attorney.dossier_docx",
+    "verifuse_v2.legal.mail_room",
+]
+DOC_EXECUTOR: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def _start_doc_executor() -> Optional[concurrent.futures.ProcessPoolExecutor]:
+    """Build the document process pool (startup hook); None inside a pool worker."""
+    # In a pool worker, or while one is still importing the launching script
+    # (the same _inheriting flag multiprocessing checks before refusing to
+    # start a process during bootstrap).
+    if multiprocessing.parent_process() is not None or getattr(
+        multiprocessing.current_process(), "_inheriting", False,
+    ):
+        return None
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(_DOC_PRELOAD)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+    return concurrent.futures.ProcessPoolExecutor(max_workers=_DOC_WORKERS, mp_context=ctx)
+
+# Admission control: one job running plus one waiting per worker. A burst
+# beyond that waits briefly for a slot, then gets a 503 instead of piling
+# an unbounded queue into the pool.
+_DOC_SLOTS = asyncio.Semaphore(_DOC_WORKERS * 2)
+_DOC_SLOT_WAIT = 15.0
+
 
-def _thread_conn() -> sqlite3.Connection:
+@contextlib.asynccontextmanager
+async def _doc_slot():
+    """Hold a DOC_EXECUTOR slot for the duration of one document render."""
+    try:
+        await asyncio.wait_for(_DOC_SLOTS.acquire(), _DOC_SLOT_WAIT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Document generation busy — retry shortly.")
+    try:
+        yield
+    finally:
+        _DOC_SLOTS.release()
+
+
+# UPDATE ... RETURNING needs SQLite >= 3.35; older builds keep UPDATE + SELECT.
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _thread_conn(check_same_thread: bool = True) -> sqlite3.Connection:
     """Open a hardened SQLite connection for use inside DB_EXECUTOR threads."""
-    conn = sqlite3.connect(VERIFUSE_DB_PATH)
+    conn = sqlite3.connect(
+        VERIFUSE_DB_PATH,
+        check_same_thread=check_same_thread,
+        cached_statements=_STMT_CACHE_SIZE,
+    )
     conn.row_factory = sqlite3.Row
     try:
-        result = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        result = _ensure_wal(conn)
         if result != "wal":
             log.warning("[db] journal_mode=WAL not set — got %r (read-only or in-memory?)", result)
     except Exception as exc:
         log.warning("[db] Failed to set WAL mode: %s", exc)
-    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA synchronous={_SQLITE_SYNCHRONOUS}")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=30000")
     conn.execute("PRAGMA cache_size = -65536")      # 64MB page cache
     conn.execute("PRAGMA mmap_size = 268435456")    # 256MB memory-mapped I/O
     conn.execute("PRAGMA temp_store = MEMORY")      # temp tables in RAM
+    conn.execute("PRAGMA wal_autocheckpoint = 1000")  # SQLite default, pinned explicitly
     return conn
 
 
@@ -188,6 +489,249 @@ async def _run_in_db(fn):
     return await loop.run_in_executor(DB_EXECUTOR, fn)
 
 
+# ── Pooled connections (one writer, N readers) ──────────────────────
+# Readers are query_only and run in parallel under WAL snapshots; all
+# pooled writes funnel through one connection guarded by a lock.
+# Connections are opened lazily and reused, so the open + pragma cost
+# is paid once per pool slot instead of once per request.
+
+_READER_POOL_SIZE = max(1, int(os.getenv("VERIFUSE_DB_READERS", "8")))
+_reader_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+_reader_slots = threading.BoundedSemaphore(_READER_POOL_SIZE)
+_writer_lock = threading.Lock()
+_writer_conn: Optional[sqlite3.Connection] = None
+
+
+@contextlib.contextmanager
+def _reader():
+    """Borrow a read-only pooled connection."""
+    if not _reader_slots.acquire(timeout=30):
+        raise HTTPException(status_code=503, detail="Database busy — retry shortly.")
+    try:
+        try:
+            conn = _reader_pool.get_nowait()
+        except queue.Empty:
+            conn = _thread_conn(check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            _reader_pool.put(conn)
+    finally:
+        _reader_slots.release()
+
+
+@contextlib.contextmanager
+def _writer():
+    """Hold the pooled writer connection; uncommitted work is rolled back."""
+    global _writer_conn
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = _thread_conn(check_same_thread=False)
+        conn = _writer_conn
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+
+# ── Hot-path SQL ────────────────────────────────────────────────────
+# The statement cache is keyed by exact SQL text; sharing one constant
+# per query keeps every call site on the same compiled statement.
+
+_LEAD_BY_ID_SQL = "SELECT * FROM leads WHERE id = ?"
+# Effective surplus, spelled once for the expression indexes built at
+# startup. The planner only uses those indexes when a query repeats this
+# exact expression. It is not a generated column: ALTER TABLE can only add
+# VIRTUAL ones, which are evaluated per row anyway (no faster in a 200k-row
+# benchmark) and would surface as an extra field in every SELECT * payload.
+_SURPLUS_EXPR = "COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)"
+# Covered by the (user_id, lead_id) unique index (idx_lead_unlocks_dedupe,
+# or idx_lead_unlocks_user_lead on older schemas): a pure index probe.
+_LEAD_UNLOCK_EXISTS_SQL = "SELECT 1 FROM lead_unlocks WHERE user_id = ? AND lead_id = ?"
+# Unlock flow: the admin and paid branches (and the admin credit burn)
+# bind into the same statements, so each compiles once per connection.
+_ASSET_UNLOCK_INSERT_SQL = (
+    "INSERT OR IGNORE INTO asset_unlocks "
+    "(id, user_id, asset_id, credits_spent, unlocked_at, ip_address, tier_at_unlock) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_LEAD_UNLOCK_INSERT_SQL = (
+    "INSERT OR IGNORE INTO lead_unlocks "
+    "(user_id, lead_id, unlocked_at, ip_address, plan_tier) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_LEDGER_BALANCE_SQL = (
+    "SELECT COALESCE(SUM(qty_remaining), 0) FROM unlock_ledger_entries "
+    "WHERE user_id = ? AND (expires_ts IS NULL OR expires_ts > ?)"
+)
+_LEDGER_SPENDABLE_SQL = (
+    "SELECT id, qty_remaining FROM unlock_ledger_entries "
+    "WHERE user_id = ? AND qty_remaining > 0 AND (expires_ts IS NULL OR expires_ts > ?) "
+    "ORDER BY (expires_ts IS NULL) ASC, expires_ts ASC, purchased_ts ASC"
+)
+_LEDGER_DEBIT_SQL = "UPDATE unlock_ledger_entries SET qty_remaining = qty_remaining - ? WHERE id = ?"
+_SPEND_JOURNAL_INSERT_SQL = (
+    "INSERT INTO unlock_spend_journal "
+    "(id, unlock_id, ledger_entry_id, credits_consumed) "
+    "VALUES (?, ?, ?, ?)"
+)
+_UNLOCK_TRANSACTION_INSERT_SQL = (
+    "INSERT INTO transactions "
+    "(id, user_id, type, amount, credits, balance_after, idempotency_key, created_at) "
+    "VALUES (?, ?, 'unlock', 0, ?, ?, ?, ?)"
+)
+_AUDIT_LOG_INSERT_SQL = (
+    "INSERT INTO audit_log (id, user_id, action, meta_json, created_at, ip) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_VERIFY_CODE_UPDATE_SQL = (
+    "UPDATE users SET email_verify_code = ?, email_verify_sent_at = ? WHERE user_id = ?"
+)
+# verify_email: sent_at is UTC isoformat text, so the 10-minute cutoff is a
+# string comparison; a NULL sent_at never expires.
+_VERIFY_EMAIL_UPDATE_SQL = (
+    "UPDATE users SET email_verified = 1, email_verify_code = NULL, email_verify_sent_at = NULL "
+    "WHERE user_id = ? AND email_verify_code = ? "
+    "AND (email_verify_sent_at IS NULL OR email_verify_sent_at >= ?)"
+)
+_VERIFICATION_STATE_UPDATE_SQL = "UPDATE leads SET verification_state = ? WHERE id = ?"
+_STRIPE_EVENT_INSERT_SQL = "INSERT OR IGNORE INTO stripe_events (event_id, type, received_at) VALUES (?, ?, ?)"
+_DOWNLOAD_AUDIT_INSERT_SQL = (
+    "INSERT INTO download_audit (user_id, lead_id, doc_type, granted, ip_address, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_USER_BY_CUSTOMER_SQL = (
+    "SELECT user_id, stripe_subscription_id, tier FROM users WHERE stripe_customer_id = ?"
+)
+# set_attorney_ready gate: same checks as its diagnostic path, in SQL
+_ATTORNEY_READY_UPDATE_SQL = (
+    "UPDATE leads SET attorney_packet_ready = 1 "
+    "WHERE id = ? "
+    "AND COALESCE(county, '') != '' AND COALESCE(case_number, '') != '' "
+    "AND COALESCE(owner_name, '') != '' AND COALESCE(sale_date, '') != '' "
+    "AND CAST(COALESCE(NULLIF(NULLIF(estimated_surplus, 0), ''), NULLIF(surplus_amount, ''), 0) AS REAL) > 0 "
+    "AND EXISTS (SELECT 1 FROM lead_provenance WHERE lead_id = leads.id)"
+)
+# One county rollup for /api/counties (every grade) and the /api/stats
+# breakdown (REJECT excluded). Served by the partial idx_leads_county_surplus
+# without touching the table.
+_COUNTY_ROLLUP_SQL = f"""
+    SELECT county, COUNT(*) as lead_count,
+           COALESCE(SUM({_SURPLUS_EXPR}), 0) as total_surplus,
+           COALESCE(AVG({_SURPLUS_EXPR}), 0) as avg_surplus,
+           COALESCE(MAX({_SURPLUS_EXPR}), 0) as max_surplus,
+           SUM(CASE WHEN data_grade != 'REJECT' THEN 1 ELSE 0 END) as graded_count,
+           COALESCE(SUM(CASE WHEN data_grade != 'REJECT'
+                             THEN {_SURPLUS_EXPR}
+                             ELSE 0 END), 0) as graded_surplus
+    FROM leads
+    WHERE {_SURPLUS_EXPR} > 0
+    GROUP BY county ORDER BY total_surplus DESC
+"""
+
+
+def _close_pools() -> None:
+    """Close every pooled connection (shutdown)."""
+    global _writer_conn
+    for pool in (_reader_pool, _request_reader_pool):
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+    with _writer_lock:
+        if _writer_conn is not None:
+            _writer_conn.close()
+            _writer_conn = None
+
+
+# ── WAL status (background-maintained) ──────────────────────────────
+# Health probes never touch the WAL lock: a background loop runs the
+# PASSIVE checkpoint and caches the frame count; probes read the cache
+# plus the -wal file size from the filesystem.
+
+_WAL_CHECKPOINT_INTERVAL = 60.0
+_wal_state: dict = {"wal_pages": 0, "checked_at": 0.0}
+
+
+def _wal_size_mb() -> float:
+    """Current -wal file size in MB (0 if absent)."""
+    try:
+        return round(os.path.getsize(VERIFUSE_DB_PATH + "-wal") / 1_048_576, 2)
+    except OSError:
+        return 0.0
+
+
+def _wal_passive_checkpoint() -> int:
+    """Run a PASSIVE checkpoint and cache the WAL frame count."""
+    conn = sqlite3.connect(VERIFUSE_DB_PATH, timeout=5)
+    try:
+        wcp = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    finally:
+        conn.close()
+    _wal_state["wal_pages"] = wcp[1] if wcp else 0
+    _wal_state["checked_at"] = _time.monotonic()
+    return _wal_state["wal_pages"]
+
+
+# ── Per-request connection (FastAPI dependency) ──────────────────────
+# One handle shared by auth lookup + every query in the request. Used
+# serially, but may hop between the loop and DB_EXECUTOR threads.
+
+async def _request_db(request: Request):
+    """Open one connection for the request, stash it on request.state.conn."""
+    conn = _thread_conn(check_same_thread=False)
+    request.state.conn = conn
+    try:
+        yield conn
+    finally:
+        request.state.conn = None
+        conn.close()
+
+
+# Read-only routes reuse idle request connections instead of opening one per
+# request. Never waits: on a miss it opens a fresh query_only handle (the
+# same peak as _request_db); at most _READER_POOL_SIZE idle ones are kept.
+# Deliberately separate from _reader(): a request holds its handle across
+# awaits, so it must not compete for the executor-side reader slots.
+_request_reader_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(
+    maxsize=_READER_POOL_SIZE,
+)
+
+
+@contextlib.contextmanager
+def _nowait_reader():
+    """Borrow an idle request connection (or open one) — never blocks the loop."""
+    try:
+        conn = _request_reader_pool.get_nowait()
+    except queue.Empty:
+        conn = _thread_conn(check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _request_reader_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+async def _request_reader(request: Request):
+    """Like _request_db, but a reused query_only connection (read-only routes)."""
+    with _nowait_reader() as conn:
+        request.state.conn = conn
+        try:
+            yield conn
+        finally:
+            request.state.conn = None
+
+
 # ── Module-level compat flags (set at startup) ────────────────────────
 # True once asset_unlocks / lead_unlocks tables are confirmed present.
 _USE_ASSET_UNLOCKS_FOR_LOOKUP: bool = False
@@ -201,13 +745,37 @@ def _epoch_now() -> int:
     return int(datetime.now(timezone.utc).timestamp())
 
 
+def _sql_now() -> str:
+    """UTC 'YYYY-MM-DD HH:MM:SS' — same text as SQLite datetime('now'), bound as a parameter."""
+    return _time.strftime("%Y-%m-%d %H:%M:%S", _time.gmtime())
+
+
+_now_iso_cache: dict = {"data": "", "expires": 0.0}
+_NOW_ISO_TTL = 0.5
+
+
+def _now_iso_cached() -> str:
+    """UTC ISO-8601, re-formatted at most every _NOW_ISO_TTL seconds.
+
+    For coarse bookkeeping stamps only (tier resets, email codes); audit
+    and ledger rows keep a precise clock read.
+    """
+    now = _time.monotonic()
+    if now >= _now_iso_cache["expires"]:
+        _now_iso_cache["data"] = datetime.now(timezone.utc).isoformat()
+        _now_iso_cache["expires"] = now + _NOW_ISO_TTL
+    return _now_iso_cache["data"]
+
+
+def _now_stamps() -> tuple[int, str]:
+    """(epoch, ISO-8601) from one clock read — compute once per request."""
+    now = datetime.now(timezone.utc)
+    return int(now.timestamp()), now.isoformat()
+
+
 def _ledger_balance(conn: sqlite3.Connection, user_id: str) -> int:
     """Sum qty_remaining of all non-expired ledger entries for user."""
-    row = conn.execute(
-        "SELECT COALESCE(SUM(qty_remaining), 0) FROM unlock_ledger_entries "
-        "WHERE user_id = ? AND (expires_ts IS NULL OR expires_ts > ?)",
-        [user_id, _epoch_now()],
-    ).fetchone()
+    row = conn.execute(_LEDGER_BALANCE_SQL, [user_id, _epoch_now()]).fetchone()
     return int(row[0])
 
 
@@ -218,32 +786,30 @@ def _fifo_spend(
 ) -> list[dict] | None:
     """Deduct `cost` credits using FIFO ordering (expires soonest first).
 
-    SAFETY: checks total with SUM() BEFORE any UPDATE.
-    Never partially decrements — atomic or returns None.
+    Returns: list of {entry_id, spent} dicts on success, None if insufficient.
+    """
+    return _fifo_spend_with_balance(conn, user_id, cost)[0]
+
+
+def _fifo_spend_with_balance(
+    conn: sqlite3.Connection,
+    user_id: str,
+    cost: int,
+) -> tuple[list[dict] | None, int]:
+    """FIFO deduct from a single ledger read. Returns (debits, balance_before).
+
+    SAFETY: the balance is summed from the same ordered read BEFORE any UPDATE.
+    Never partially decrements — on insufficient credit returns (None, balance)
+    with no writes made.
 
     SQLite compat: ORDER BY (expires_ts IS NULL) ASC places NULLs last
     without relying on NULLS LAST (unsupported in older SQLite).
-
-    Returns: list of {entry_id, spent} dicts on success, None if insufficient.
     """
-    now = _epoch_now()
-
-    # Pre-flight: verify total before touching any rows
-    total_row = conn.execute(
-        "SELECT COALESCE(SUM(qty_remaining), 0) FROM unlock_ledger_entries "
-        "WHERE user_id = ? AND qty_remaining > 0 AND (expires_ts IS NULL OR expires_ts > ?)",
-        [user_id, now],
-    ).fetchone()
-    if int(total_row[0]) < cost:
-        return None  # Insufficient — no writes made
-
-    # Fetch ordered entries (expires soonest, NULLs last, oldest purchase within bucket)
-    entries = conn.execute(
-        "SELECT id, qty_remaining FROM unlock_ledger_entries "
-        "WHERE user_id = ? AND qty_remaining > 0 AND (expires_ts IS NULL OR expires_ts > ?) "
-        "ORDER BY (expires_ts IS NULL) ASC, expires_ts ASC, purchased_ts ASC",
-        [user_id, now],
-    ).fetchall()
+    # Ordered entries (expires soonest, NULLs last, oldest purchase within bucket)
+    entries = conn.execute(_LEDGER_SPENDABLE_SQL, [user_id, _epoch_now()]).fetchall()
+    balance = sum(e["qty_remaining"] for e in entries)
+    if balance < cost:
+        return None, balance  # Insufficient — no writes made
 
     # Deduct — total pre-verified so loop always succeeds
     debits: list[dict] = []
@@ -252,13 +818,10 @@ def _fifo_spend(
         if remaining <= 0:
             break
         spend = min(e["qty_remaining"], remaining)
-        conn.execute(
-            "UPDATE unlock_ledger_entries SET qty_remaining = qty_remaining - ? WHERE id = ?",
-            [spend, e["id"]],
-        )
         debits.append({"entry_id": e["id"], "spent": spend})
         remaining -= spend
-    return debits
+    conn.executemany(_LEDGER_DEBIT_SQL, [(d["spent"], d["entry_id"]) for d in debits])
+    return debits, balance
 
 
 def _audit_log(conn: sqlite3.Connection, user_id: str, action: str, meta: dict = None, ip: str = "") -> None:
@@ -272,6 +835,66 @@ def _audit_log(conn: sqlite3.Connection, user_id: str, action: str, meta: dict =
     )
 
 
+# ── Write-behind queue ───────────────────────────────────────────────
+# Writes that need no transaction of their own — audit/download_audit rows
+# (stamped when queued) and best-effort write-backs such as _row_to_safe's
+# verification_state — are written in batches by a startup loop, so the
+# request never waits on a commit. Entries are (sql, params); a flush runs
+# one executemany per statement inside a single writer transaction.
+
+_write_behind: "queue.SimpleQueue[tuple[str, tuple]]" = queue.SimpleQueue()
+_WRITE_BEHIND_INTERVAL = 0.5
+# lead id -> verification_state already queued, so list renders between
+# flushes don't queue the same UPDATE again
+_queued_verification_state: dict[str, str] = {}
+
+
+def _queue_verification_state(lead_id: str, state: str) -> None:
+    """Queue a leads.verification_state write-back once per lead and value."""
+    if _queued_verification_state.get(lead_id) == state:
+        return
+    _queued_verification_state[lead_id] = state
+    _write_behind.put((_VERIFICATION_STATE_UPDATE_SQL, (state, lead_id)))
+
+
+def _flush_write_behind() -> int:
+    """Write every queued row.
+
+    Each statement's batch runs under its own SAVEPOINT: if any row fails,
+    that whole batch is rolled back and dropped, and the other batches
+    still commit.
+    """
+    batches: dict[str, list[tuple]] = {}
+    while True:
+        try:
+            sql, params = _write_behind.get_nowait()
+        except queue.Empty:
+            break
+        batches.setdefault(sql, []).append(params)
+    for state, lead_id in batches.get(_VERIFICATION_STATE_UPDATE_SQL, ()):
+        if _queued_verification_state.get(lead_id) == state:
+            _queued_verification_state.pop(lead_id, None)
+    if batches:
+        with _writer() as conn:
+            conn.execute("BEGIN")
+            for sql, rows in batches.items():
+                conn.execute("SAVEPOINT write_behind_batch")
+                try:
+                    conn.executemany(sql, rows)
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write_behind_batch")
+                    log.error("Dropped %d write-behind rows: %s", len(rows), e)
+                conn.execute("RELEASE write_behind_batch")
+            conn.commit()
+    return sum(len(rows) for rows in batches.values())
+
+
+def _audit_log_deferred(user_id: str, action: str, meta: dict = None, ip: str = "") -> None:
+    """Queue an audit_log entry for the next write-behind flush (see _audit_log)."""
+    meta_json = json.dumps(meta) if meta else None
+    _write_behind.put((_AUDIT_LOG_INSERT_SQL, (str(uuid.uuid4()), user_id, action, meta_json, _sql_now(), ip)))
+
+
 def _get_client_ip(request: Request) -> str:
     """Extract client IP — uses direct connection to prevent X-Forwarded-For spoofing.
 
@@ -320,6 +943,7 @@ def _try_founders_redemption(user_id: str) -> bool:
             "UPDATE users SET founders_pricing = 1 WHERE user_id = ?", [user_id]
         )
         conn.execute("COMMIT")
+        _invalidate_user_cache(user_id)
         log.info("Founders slot claimed: user=%s (slot %d/%d)", user_id, count + 1, FOUNDERS_MAX_SLOTS)
         return True
     except Exception:
@@ -608,26 +1232,44 @@ except ImportError:
     RESTRICTION_DELTA = timedelta(days=182)
 
 
+# Deadline / sale-date strings repeat across a page (auction days), so the
+# ISO parse is memoised. Parses exactly what it is given — callers that
+# tolerate timestamps slice to [:10] first, as before.
+@functools.lru_cache(maxsize=4096)
+def _parse_date(s) -> date | None:
+    """date.fromisoformat(s), or None when unparseable."""
+    try:
+        return date.fromisoformat(s)
+    except (ValueError, TypeError):
+        return None
+
+
+# Pure function of the sale-date string, asked for up to four times per row
+# (status, sale status, ready-to-file, projection) and shared by every lead
+# sold on the same auction day. Kept in Python rather than SQL date(..., '+6
+# months'), whose month-end overflow differs from relativedelta.
+@functools.lru_cache(maxsize=4096)
 def _compute_restriction_end(sale_date_str: str) -> date | None:
     """Compute the end of the 6 calendar month restriction period."""
+    sale_dt = _parse_date(str(sale_date_str)[:10])
+    if sale_dt is None:
+        return None
     try:
-        sale_dt = date.fromisoformat(str(sale_date_str)[:10])
         return sale_dt + RESTRICTION_DELTA
     except (ValueError, TypeError):
         return None
 
 
-def _compute_status(row: dict) -> str:
+def _compute_status(row: dict, today: Optional[date] = None) -> str:
     """Dynamic status from UTC dates. NEVER stored."""
-    today = datetime.now(timezone.utc).date()
+    if today is None:
+        today = datetime.now(timezone.utc).date()
 
     deadline = row.get("claim_deadline")
     if deadline:
-        try:
-            if today > date.fromisoformat(deadline):
-                return "EXPIRED"
-        except (ValueError, TypeError):
-            pass
+        dl = _parse_date(deadline)
+        if dl is not None and today > dl:
+            return "EXPIRED"
 
     sale = row.get("sale_date")
     if sale:
@@ -640,20 +1282,20 @@ def _compute_status(row: dict) -> str:
     return "UNKNOWN"
 
 
-def _compute_sale_status(row: dict) -> tuple:
+def _compute_sale_status(row: dict, today: Optional[date] = None) -> tuple:
     """Conservative sale status + timeline_flags[].
 
     Returns (status, flags[]) — 3 states only: PRE_SALE | POST_SALE | UNKNOWN.
     Flags are informational — require attorney verification before any filing action.
     Never implies legal deadlines are confirmed.
     """
-    today = datetime.now(timezone.utc).date()
+    if today is None:
+        today = datetime.now(timezone.utc).date()
     sale = row.get("sale_date")
     if not sale:
         return "UNKNOWN", ["sale_date_missing — verify with county public trustee"]
-    try:
-        sale_dt = date.fromisoformat(str(sale)[:10])
-    except (ValueError, TypeError):
+    sale_dt = _parse_date(str(sale)[:10])
+    if sale_dt is None:
         return "UNKNOWN", ["sale_date_unparseable — verify with county public trustee"]
     if sale_dt > today:
         return "PRE_SALE", []
@@ -675,20 +1317,19 @@ def _compute_sale_status(row: dict) -> tuple:
             )
 
     if deadline:
-        try:
-            dl = date.fromisoformat(str(deadline)[:10])
-            if dl < today:
-                flags.append(
-                    f"statutory_deadline_may_have_passed_{dl.isoformat()} "
-                    f"— requires legal review before filing"
-                )
-            else:
-                flags.append(
-                    f"statutory_deadline_estimated_{dl.isoformat()} "
-                    f"— verify with public trustee before relying on this date"
-                )
-        except (ValueError, TypeError):
+        dl = _parse_date(str(deadline)[:10])
+        if dl is None:
             flags.append("claim_deadline_unparseable — verify with county public trustee")
+        elif dl < today:
+            flags.append(
+                f"statutory_deadline_may_have_passed_{dl.isoformat()} "
+                f"— requires legal review before filing"
+            )
+        else:
+            flags.append(
+                f"statutory_deadline_estimated_{dl.isoformat()} "
+                f"— verify with public trustee before relying on this date"
+            )
     else:
         flags.append("claim_deadline_unconfirmed — verify with county public trustee")
 
@@ -770,7 +1411,7 @@ def _compute_confidence(row: dict) -> tuple:
     return pts / 100.0, reasons, missing
 
 
-def _compute_ready_to_file(row: dict) -> bool:
+def _compute_ready_to_file(row: dict, today: Optional[date] = None) -> bool:
     """True only when all required fields are present, surplus meets threshold, AND status is ACTIONABLE."""
     surplus = _safe_float(row.get("overbid_amount")) or _safe_float(row.get("surplus_amount"))
     required = [
@@ -784,7 +1425,7 @@ def _compute_ready_to_file(row: dict) -> bool:
     # Below $500 overbid is not worth filing — costs exceed recovery
     if surplus < 500:
         return False
-    return _compute_status(row) == "ACTIONABLE"
+    return _compute_status(row, today) == "ACTIONABLE"
 
 
 def _compute_grade_reasons(row: dict) -> list:
@@ -830,6 +1471,8 @@ def _safe_float(val) -> Optional[float]:
     """Safely convert DB value to float, returning None for NULL/invalid."""
     if val is None:
         return None
+    if type(val) is float:  # REAL columns — the common case, no conversion
+        return val
     try:
         return float(val)
     except (ValueError, TypeError):
@@ -846,21 +1489,18 @@ def _ts_to_iso(ts) -> Optional[str]:
         return None
 
 
-def _safe_age_days(ts_str) -> Optional[int]:
+def _safe_age_days(ts_str, today: Optional[date] = None) -> Optional[int]:
     """Safely compute days since timestamp. Returns None for NULL, pre-2020, or unparseable."""
     if not ts_str:
         return None
-    try:
-        s = str(ts_str)[:10]
-        dt = date.fromisoformat(s)
-        # Pre-2020 dates are clearly DB defaults or errors
-        if dt.year < 2020:
-            return None
-        today = datetime.now(timezone.utc).date()
-        days = (today - dt).days
-        return days if 0 <= days <= 3650 else None  # Cap at 10 years for sanity
-    except (ValueError, TypeError):
+    dt = _parse_date(str(ts_str)[:10])
+    # Pre-2020 dates are clearly DB defaults or errors
+    if dt is None or dt.year < 2020:
         return None
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+    days = (today - dt).days
+    return days if 0 <= days <= 3650 else None  # Cap at 10 years for sanity
 
 
 def _compute_verification_state(row: dict) -> str:
@@ -940,9 +1580,10 @@ def _admin_override_log(
 def _extract_city(address: Optional[str], county: Optional[str]) -> str:
     if not address:
         return f"{county or 'CO'}, CO"
-    parts = [p.strip() for p in address.split(",")]
+    # Only the last two segments are used — don't split the whole address
+    parts = address.rsplit(",", 2)
     if len(parts) >= 2:
-        return ", ".join(parts[-2:]).strip()
+        return f"{parts[-2].strip()}, {parts[-1].strip()}".strip()
     return f"{county or 'CO'}, CO"
 
 
@@ -954,8 +1595,11 @@ def _round_surplus(amount: Optional[float]) -> Optional[float]:
     return round(amount / 100) * 100
 
 
-def is_preview_eligible(row: dict) -> bool:
-    """Single source of truth for preview eligibility. Uses only raw DB fields."""
+def is_preview_eligible(row: dict, today: Optional[date] = None) -> bool:
+    """Single source of truth for preview eligibility. Uses only raw DB fields.
+
+    Pass ``today`` (UTC) when checking many rows so the clock is read once.
+    """
     surplus = _safe_float(row.get("estimated_surplus")) or _safe_float(row.get("surplus_amount")) or _safe_float(row.get("overbid_amount")) or 0.0
     if surplus <= 100:
         return False
@@ -968,47 +1612,55 @@ def is_preview_eligible(row: dict) -> bool:
         s = str(deadline).strip()
         if not s:
             return False  # Empty string/whitespace = unparseable = ineligible
-        try:
-            s = s.split("T")[0].split(" ")[0]  # Strip timestamps safely
-            if datetime.now(timezone.utc).date() > date.fromisoformat(s):
-                return False
-        except (ValueError, TypeError):
+        dl = _parse_date(s.split("T")[0].split(" ")[0])  # Strip timestamps safely
+        if dl is None:
             return False  # FAIL-CLOSED: unparseable = ineligible
+        if (today or datetime.now(timezone.utc).date()) > dl:
+            return False
     # NULL deadline = pending (eligible) — consistent with _EXPIRED_FILTER
     return True
 
 
 def _compute_preview_key(row: dict) -> str:
     """HMAC-SHA256 preview key. Uses ONLY leads.id + secret. Stable across re-grading. 24 hex chars (96-bit)."""
-    lead_id = row.get("id") or ""
-    return hmac.new(
-        _PREVIEW_HMAC_SECRET.encode(), lead_id.encode(), hashlib.sha256
-    ).hexdigest()[:24]
+    return _preview_key_for_id(row.get("id") or "")
 
 
-def _row_to_safe(row: dict) -> dict:
-    """Convert a leads row to SafeAsset dict. NULL-safe."""
+# Keys are a pure function of the id — listings and lookup rebuilds keep
+# asking for the same ones.
+@functools.lru_cache(maxsize=65536)
+def _preview_key_for_id(lead_id: str) -> str:
+    """Preview key for a bare leads.id (no row dict needed)."""
+    # hmac.digest is the one-shot C path — same bytes as hmac.new(...).digest()
+    return hmac.digest(_PREVIEW_HMAC_KEY, lead_id.encode(), "sha256").hex()[:24]
+
+
+def _row_to_safe(row: dict, today: Optional[date] = None) -> dict:
+    """Convert a leads row to SafeAsset dict. NULL-safe.
+
+    ``today`` (UTC) is read from the clock once here when not supplied —
+    list endpoints pass one value for the whole page.
+    """
+    if today is None:
+        today = datetime.now(timezone.utc).date()
     _surp_a = _safe_float(row.get("surplus_amount"))
     _surp_e = _safe_float(row.get("estimated_surplus"))
     _surp_o = _safe_float(row.get("overbid_amount"))
     surplus = _surp_a or _surp_e or _surp_o or 0.0
     debt = _safe_float(row.get("total_debt")) or 0.0
     conf, conf_reasons, conf_missing = _compute_confidence(row)
-    status = _compute_status(row)
-    sale_status, timeline_flags = _compute_sale_status(row)
-    today = datetime.now(timezone.utc).date()
+    status = _compute_status(row, today)
+    sale_status, timeline_flags = _compute_sale_status(row, today)
 
     # Claim deadline tracking
     days_to_claim = None
     deadline_passed = None
     deadline = row.get("claim_deadline")
     if deadline:
-        try:
-            dl = date.fromisoformat(deadline)
+        dl = _parse_date(deadline)
+        if dl is not None:
             days_to_claim = (dl - today).days
             deadline_passed = days_to_claim < 0
-        except (ValueError, TypeError):
-            pass
 
     # Restriction period tracking
     restriction_end = None
@@ -1026,7 +1678,7 @@ def _row_to_safe(row: dict) -> dict:
                 pass
 
     # Data age — use safe helper to avoid garbage values for epoch defaults / pre-2020 dates
-    data_age_days = _safe_age_days(row.get("updated_at"))
+    data_age_days = _safe_age_days(row.get("updated_at"), today)
 
     data_grade = (row.get("data_grade") or "").upper()
     # REJECT leads: zero out surplus so they never appear claimable
@@ -1040,24 +1692,16 @@ def _row_to_safe(row: dict) -> dict:
     if _surplus_unknown and data_grade not in ("REJECT",):
         surplus = None  # Genuine unknown — do not show $0.00
 
-    pk = _compute_preview_key(row) if is_preview_eligible(row) else None
-    ready = _compute_ready_to_file(row)
+    pk = _compute_preview_key(row) if is_preview_eligible(row, today) else None
+    ready = _compute_ready_to_file(row, today)
     grade_reasons = _compute_grade_reasons(row)
 
     # Phase 4: verification state
     _computed_vs = _compute_verification_state(row)
-    # Persist if DB value differs (non-blocking — best-effort)
+    # Persist if DB value differs (best-effort). Queued write-behind:
+    # callers run on the event loop too, so never wait on the lock.
     if row.get("verification_state") != _computed_vs:
-        try:
-            _bg_conn = _get_conn()
-            _bg_conn.execute(
-                "UPDATE leads SET verification_state=? WHERE id=?",
-                [_computed_vs, row.get("id")]
-            )
-            _bg_conn.commit()
-            _bg_conn.close()
-        except Exception:
-            pass
+        _queue_verification_state(row.get("id"), _computed_vs)
     vstate = _computed_vs
 
     # Phase 5: two-tier net-to-owner display label
@@ -1070,52 +1714,59 @@ def _row_to_safe(row: dict) -> dict:
     display_tier = "VERIFIED" if _has_verified_net else "POTENTIAL"
     net_to_owner_label = "VERIFIED NET TO OWNER" if _has_verified_net else "OVERBID POOL (Potential)"
 
-    return SafeAsset(
-        asset_id=row.get("id"),
-        county=row.get("county"),
-        state="CO",
-        case_number=row.get("case_number"),
-        asset_type="FORECLOSURE_SURPLUS",
-        estimated_surplus=_round_surplus(surplus) if surplus is not None else None,
-        surplus_verified=verified,
-        data_grade=row.get("data_grade"),
-        record_class=row.get("record_class"),
-        sale_date=sale,
-        claim_deadline=deadline,
-        days_to_claim=days_to_claim,
-        deadline_passed=deadline_passed,
-        restriction_status=status,
-        restriction_end_date=restriction_end.isoformat() if restriction_end else None,
-        blackout_end_date=blackout_end.isoformat() if blackout_end else None,
-        days_until_actionable=max(0, days_until_actionable) if days_until_actionable is not None else None,
-        address_hint=_extract_city(row.get("property_address"), row.get("county")),
-        owner_img=None,
-        completeness_score=_safe_float(row.get("completeness_score")),
-        confidence_score=round(conf, 2),
-        data_age_days=data_age_days,
-        preview_key=pk,
-        registry_asset_id=(
+    # Plain dict in SafeAsset field order (the model documents the shape) —
+    # rows are trusted, so skip per-row pydantic validation + model_dump().
+    return {
+        "asset_id": row.get("id"),
+        "county": row.get("county"),
+        "state": "CO",
+        "case_number": row.get("case_number"),
+        "asset_type": "FORECLOSURE_SURPLUS",
+        "estimated_surplus": float(_round_surplus(surplus)) if surplus is not None else None,
+        "surplus_verified": verified,
+        "data_grade": row.get("data_grade"),
+        "record_class": row.get("record_class"),
+        "sale_date": sale,
+        "claim_deadline": deadline,
+        "days_to_claim": days_to_claim,
+        "deadline_passed": deadline_passed,
+        "restriction_status": status,
+        "restriction_end_date": restriction_end.isoformat() if restriction_end else None,
+        "blackout_end_date": blackout_end.isoformat() if blackout_end else None,
+        "days_until_actionable": max(0, days_until_actionable) if days_until_actionable is not None else None,
+        "address_hint": _extract_city(row.get("property_address"), row.get("county")),
+        "owner_img": None,
+        "completeness_score": _safe_float(row.get("completeness_score")),
+        "confidence_score": float(round(conf, 2)),
+        "data_age_days": data_age_days,
+        "preview_key": pk,
+        "unlocked_by_me": False,
+        "registry_asset_id": (
             f"FORECLOSURE:CO:{row['county'].upper()}:{row['case_number']}"
             if row.get("county") and row.get("case_number") else None
         ),
-        sale_status=sale_status,
-        timeline_flags=timeline_flags,
-        ready_to_file=ready,
-        grade_reasons=grade_reasons,
-        verification_state=vstate,
-        pool_source=pool_source,
-        verification_tier=row.get("verification_tier") or (
+        "gross_surplus_cents": None,
+        "net_owner_equity_cents": None,
+        "classification": None,
+        "sale_status": sale_status,
+        "timeline_flags": timeline_flags,
+        "ready_to_file": ready,
+        "grade_reasons": grade_reasons,
+        "verification_state": vstate,
+        "pool_source": pool_source,
+        "verification_tier": row.get("verification_tier") or (
             "TRIPLE_VERIFIED" if pool_source == "TRIPLE_VERIFIED"
             else "AI_VERIFIED" if pool_source == "AI_VERIFIED"
             else "HTML_MATH" if pool_source == "HTML_MATH"
             else "UNVERIFIED"
         ),
-        verification_confidence=_safe_float(row.get("verification_confidence")),
-        display_tier=display_tier,
-        net_to_owner_label=net_to_owner_label,
-        confidence_reasons=conf_reasons,
-        missing_inputs=conf_missing,
-    ).model_dump()
+        "verification_confidence": _safe_float(row.get("verification_confidence")),
+        "display_tier": display_tier,
+        "net_to_owner_label": net_to_owner_label,
+        "confidence_reasons": conf_reasons,
+        "missing_inputs": conf_missing,
+        "lien_search_performed": None,
+    }
 
 
 def _table_exists_conn(conn, table: str) -> bool:
@@ -1125,6 +1776,15 @@ def _table_exists_conn(conn, table: str) -> bool:
     ).fetchone() is not None
 
 
+def _has_index_prefix(conn, table: str, columns: tuple[str, ...]) -> bool:
+    """True if some index on table starts with exactly these columns."""
+    for idx in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        cols = tuple(r[2] for r in conn.execute(f"PRAGMA index_info({idx[1]})"))
+        if cols[:len(columns)] == columns:
+            return True
+    return False
+
+
 def _compute_opportunity_score(lead_row: dict, conn) -> int:
     """Score 0-10 based on surplus size, deadline proximity, grade, and lien burden."""
     score = 0
@@ -1181,13 +1841,16 @@ def _compute_opportunity_score(lead_row: dict, conn) -> int:
     return min(10, score)
 
 
-def _row_to_full(row: dict, conn=None, unlocked_by_me: bool = True, is_admin: bool = False) -> dict:
+def _row_to_full(
+    row: dict, conn=None, unlocked_by_me: bool = True, is_admin: bool = False,
+    today: Optional[date] = None,
+) -> dict:
     """Convert a leads row to FullAsset dict. NULL-safe.
 
     Optional conn enables quality_badge and opportunity_score computation.
     unlocked_by_me / is_admin control owner_name masking (EPIC 1C).
     """
-    safe = _row_to_safe(row)
+    safe = _row_to_safe(row, today)
     # Exact (unrounded) surplus for authenticated users — override the $100-rounded preview value
     exact_surplus = (
         _safe_float(row.get("surplus_amount"))
@@ -1286,66 +1949,162 @@ def _row_to_full(row: dict, conn=None, unlocked_by_me: bool = True, is_admin: bo
     return safe
 
 
+# Preview surplus bands: (upper bound in dollars, label), then the top band.
+# surplus_band() and _PREVIEW_SELECT's CASE are both built from these.
+_SURPLUS_BANDS = ((50_000, "0–50K"), (150_000, "50K–150K"), (500_000, "150K–500K"))
+_SURPLUS_BAND_TOP = "500K+"
+_SURPLUS_BAND_SQL = (
+    "CASE "
+    + "".join(f"WHEN ROUND({_SURPLUS_EXPR}, 2) < {bound} THEN '{label}' " for bound, label in _SURPLUS_BANDS)
+    + f"ELSE '{_SURPLUS_BAND_TOP}' END"
+)
+
+
 def surplus_band(cents: int) -> str:
     """Return human-readable surplus band for preview display. Never exposes exact amount."""
     dollars = cents / 100
-    if dollars < 50_000:
-        return "0–50K"
-    if dollars < 150_000:
-        return "50K–150K"
-    if dollars < 500_000:
-        return "150K–500K"
-    return "500K+"
-
-
-def _row_to_preview(row: dict) -> dict:
-    """Convert a leads row to PreviewLead dict.
-    ZERO PII, ZERO internal IDs, ZERO exact surplus amounts.
-    """
-    county = row.get("county")
-    sale_date_raw = row.get("sale_date")
-    data_grade = row.get("data_grade")
-    # Convert DB dollars (float) → cents for banding
-    surplus_dollars = _safe_float(row.get("estimated_surplus")) or _safe_float(row.get("surplus_amount")) or _safe_float(row.get("overbid_amount")) or 0.0
-    surplus_cents = int(round(surplus_dollars * 100))
-
-    # Truncate to YYYY-MM (anti-triangulation)
-    sale_month = (sale_date_raw or "")[:7] if sale_date_raw else None
-
-    # HMAC preview_key — stable, id-only salt (24 hex chars)
-    preview_key = _compute_preview_key(row)
-    # Pop id so it's not in output
-    row.pop("id", None)
-
-    return PreviewLead(
-        preview_key=preview_key,
-        county=county,
-        sale_month=sale_month,
-        data_grade=data_grade,
-        surplus_band=surplus_band(surplus_cents),
-    ).model_dump()
+    for bound, label in _SURPLUS_BANDS:
+        if dollars < bound:
+            return label
+    return _SURPLUS_BAND_TOP
 
 
 # ── Auth helpers (inline, using VERIFUSE_DB_PATH) ───────────────────
 
-def _get_user_from_request(request: Request) -> Optional[dict]:
-    """Extract JWT and look up user. Returns None if unauthenticated."""
-    auth = request.headers.get("Authorization")
-    if not auth or not auth.startswith("Bearer "):
+# ── User lookup cache ───────────────────────────────────────────────
+# LRU of user_id -> (expires_monotonic, user dict). Short TTL: invalidation
+# below is process-local, so other uvicorn workers only converge on expiry.
+# _user_cache_gen bumps on every invalidation so a lookup that raced a
+# write never re-caches the pre-write row.
+#
+# Access-control columns can't wait for the TTL: a deactivated account or a
+# revoked admin must stop passing _require_user/_require_admin everywhere.
+# Triggers (migration 021) bump user_auth_stamp.n on any change to
+# those columns or any delete, whichever process writes; each worker probes
+# it at most every _USER_STAMP_PROBE_INTERVAL and drops its whole cache
+# when it moves.
+_USER_CACHE_TTL = 15.0
+_USER_CACHE_MAX = 10_000
+_user_cache: "collections.OrderedDict[str, tuple[float, dict]]" = collections.OrderedDict()
+_user_cache_gen = 0
+
+_USER_STAMP_PROBE_INTERVAL = 1.0
+_USER_STAMP_SQL = "SELECT n FROM user_auth_stamp WHERE id = 1"
+_user_stamp: dict = {"value": None, "checked": 0.0}
+
+
+def _check_user_stamp(conn: Optional[sqlite3.Connection]) -> None:
+    """Clear the user cache if another process changed access-control columns."""
+    now = _time.monotonic()
+    if now - _user_stamp["checked"] < _USER_STAMP_PROBE_INTERVAL:
+        return
+    _user_stamp["checked"] = now
+    try:
+        if conn is not None:
+            row = conn.execute(_USER_STAMP_SQL).fetchone()
+        else:
+            with _nowait_reader() as _sc:
+                row = _sc.execute(_USER_STAMP_SQL).fetchone()
+    except sqlite3.Error:
+        return  # stamp not installed — TTL expiry only
+    value = row[0] if row else None
+    if value != _user_stamp["value"]:
+        if _user_stamp["value"] is not None:
+            _invalidate_user_cache()
+        _user_stamp["value"] = value
+
+
+def _invalidate_user_cache(user_id: Optional[str] = None) -> None:
+    """Drop one cached user (or all) after a users-table write."""
+    global _user_cache_gen
+    _user_cache_gen += 1
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id, None)
+
+
+def _load_user(request: Request, user_id: str) -> Optional[dict]:
+    """users row by id — TTL/LRU cache first, then SQLite."""
+    shared = getattr(request.state, "conn", None)
+    _check_user_stamp(shared)
+    now = _time.monotonic()
+    hit = _user_cache.get(user_id)
+    if hit is not None:
+        if hit[0] > now:
+            with contextlib.suppress(KeyError):  # raced an invalidation
+                _user_cache.move_to_end(user_id)
+            return dict(hit[1])
+        _user_cache.pop(user_id, None)
+    gen = _user_cache_gen
+    if shared is not None:
+        row = shared.execute("SELECT * FROM users WHERE user_id = ?", [user_id]).fetchone()
+    else:
+        # Runs on the event loop (_require_user): never wait on a _reader() slot
+        with _nowait_reader() as conn:
+            row = conn.execute("SELECT * FROM users WHERE user_id = ?", [user_id]).fetchone()
+    if not row:
         return None
-    token = auth.split(" ", 1)[1]
+    user = dict(row)
+    if gen == _user_cache_gen:
+        _user_cache[user_id] = (now + _USER_CACHE_TTL, user)
+        if len(_user_cache) > _USER_CACHE_MAX:
+            with contextlib.suppress(KeyError):
+                _user_cache.popitem(last=False)  # least recently used
+    return dict(user)
+
+
+# ── Verified-token cache ────────────────────────────────────────────
+# Raw bearer token -> (valid_until_epoch, sub). A token string always decodes
+# to the same payload, so re-running the HS256 check on every request only
+# re-proves what we already know. Entries never outlive the token's own exp.
+_TOKEN_CACHE_TTL = 30.0
+_TOKEN_CACHE_MAX = 1024
+_token_cache: "collections.OrderedDict[str, tuple[float, str]]" = collections.OrderedDict()
+
+
+def _token_subject(token: str) -> Optional[str]:
+    """Verified JWT subject — cached decode, None on any invalid token."""
+    now = _time.time()
+    hit = _token_cache.get(token)
+    if hit is not None:
+        if hit[0] > now:
+            with contextlib.suppress(KeyError):  # raced an eviction
+                _token_cache.move_to_end(token)
+            return hit[1]
+        _token_cache.pop(token, None)
     try:
         import jwt as pyjwt
         secret = os.getenv("VERIFUSE_JWT_SECRET", "vf2-dev-secret-change-in-production")
         payload = pyjwt.decode(token, secret, algorithms=["HS256"])
     except Exception:
         return None
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM users WHERE user_id = ?", [payload.get("sub")]).fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
+    sub = payload.get("sub")
+    valid_until = now + _TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        valid_until = min(valid_until, exp)
+    _token_cache[token] = (valid_until, sub)
+    if len(_token_cache) > _TOKEN_CACHE_MAX:
+        with contextlib.suppress(KeyError):
+            _token_cache.popitem(last=False)  # least recently used
+    return sub
+
+
+def _get_user_from_request(request: Request) -> Optional[dict]:
+    """Extract JWT and look up user. Returns None if unauthenticated."""
+    auth = request.headers.get("Authorization")
+    if not auth or not auth.startswith("Bearer "):
+        return None  # anonymous — never touches SQLite
+    # Memoised per request: _require_user / _effective_admin / handlers share one lookup
+    if hasattr(request.state, "vf_user"):
+        return request.state.vf_user
+    sub = _token_subject(auth.split(" ", 1)[1])
+    if sub is None:
+        return None
+    user = _load_user(request, sub)
+    request.state.vf_user = user
+    return user
 
 
 def _require_user(request: Request) -> dict:
@@ -1406,6 +2165,14 @@ def _require_admin_or_api_key(request: Request) -> None:
     raise HTTPException(status_code=403, detail="Admin access required.")
 
 
+def _require_admin(request: Request) -> dict:
+    """JWT admin only. Used as a route dependency: admin = Depends(_require_admin)."""
+    user = _require_user(request)
+    if not _is_admin(user):
+        raise HTTPException(status_code=403, detail="Admin only.")
+    return user
+
+
 def _check_email_verified(user: dict, request: Request = None) -> None:
     """Check email verification. Raises 403 if not verified and not admin.
 
@@ -1437,6 +2204,7 @@ app = FastAPI(
     title="VeriFuse V2 — Titanium API",
     version="4.2.0",
     description="Colorado Surplus Intelligence Platform — Sprint 12",
+    default_response_class=_FastJSONResponse,
 )
 
 app.state.limiter = limiter
@@ -1483,20 +2251,64 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type", "x-verifuse-api-key", "X-Verifuse-Simulate"],
     expose_headers=["Content-Disposition"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Routes that serve their own pre-compressed bytes. Older Starlette releases
+# (still allowed by fastapi>=0.115) compress a response again even when it
+# already carries Content-Encoding, so these bypass the middleware entirely.
+_GZIP_EXEMPT_PREFIXES = ("/api/case-packet/",)
 
 
-@app.middleware("http")
-async def add_vary_header(request: Request, call_next):
-    response = await call_next(request)
-    existing = response.headers.get("Vary", "")
+class _GZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves _GZIP_EXEMPT_PREFIXES untouched."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(_GZIP_EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(_GZipMiddleware, minimum_size=1000)
+
+
+# Responses differ by caller and by admin simulation, so every one varies on
+# both headers. Plain ASGI (no BaseHTTPMiddleware task/stream wrapping), and
+# the merge is memoised: inner layers only ever produce a handful of Vary
+# values (CORS's Origin, GZip's Accept-Encoding), so each is tokenized once.
+_VARY_TOKENS = ("Authorization", "X-Verifuse-Simulate")
+
+
+@functools.lru_cache(maxsize=64)
+def _merged_vary(existing: str) -> str:
+    """Existing Vary value plus whichever of _VARY_TOKENS it lacks."""
     existing_tokens = {t.strip().lower() for t in existing.split(",") if t.strip()}
-    new_tokens = ["Authorization", "X-Verifuse-Simulate"]
-    to_add = [t for t in new_tokens if t.lower() not in existing_tokens]
-    if to_add:
-        combined = f"{existing}, {', '.join(to_add)}" if existing else ", ".join(to_add)
-        response.headers["Vary"] = combined
-    return response
+    to_add = [t for t in _VARY_TOKENS if t.lower() not in existing_tokens]
+    if not to_add:
+        return existing
+    return f"{existing}, {', '.join(to_add)}" if existing else ", ".join(to_add)
+
+
+class _VaryHeaderMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                existing = headers.get("vary", "")
+                merged = _merged_vary(existing)
+                if merged != existing:
+                    headers["Vary"] = merged
+            await send(message)
+
+        await self.app(scope, receive, send_with_vary)
+
+
+app.add_middleware(_VaryHeaderMiddleware)
 
 
 def _needs_nocache(path: str) -> bool:
@@ -1505,7 +2317,10 @@ def _needs_nocache(path: str) -> bool:
     Uses exact match for the leads listing route and prefix match for
     subroutes to avoid false positives on unrelated paths.
     Must NOT apply to /api/webhooks/*, /api/health, /api/public-config.
+    The non-PII sample dossier sets its own revalidation policy.
     """
+    if path.startswith("/api/dossier/sample/"):
+        return False
     return (
         path.startswith("/api/auth/")
         or path == "/api/leads"
@@ -1728,6 +2543,91 @@ _EXPIRED_FILTER = ""
 _PREVIEW_LOOKUP: dict[str, str] = {}  # preview_key -> leads.id
 _claim_deadline_expr = "NULL AS claim_deadline"  # Set at startup
 
+# Column projections for the SafeAsset / FullAsset paths — only what
+# _row_to_safe / _row_to_full (and their _compute_* helpers) actually read.
+# Narrowed to columns that exist at startup; SELECT * until then.
+_SAFE_COLUMNS = (
+    "id", "county", "case_number", "sale_date", "data_grade",
+    "estimated_surplus", "surplus_amount", "overbid_amount", "total_debt", "trustee_fees",
+    "owner_name", "property_address", "pool_source", "record_class", "completeness_score",
+    "confidence_score", "updated_at", "verification_state", "verification_tier",
+    "verification_confidence", "audit_grade", "lien_search_performed",
+)
+_FULL_COLUMNS = _SAFE_COLUMNS + ("winning_bid", "recorder_link", "restriction_status")
+_SAFE_SELECT = "SELECT * FROM leads"
+_FULL_SELECT = "SELECT * FROM leads"
+# Per-user unlock flag folded into the list SELECT (binds user_id first);
+# EXISTS rather than a JOIN so duplicate unlock rows can't repeat a lead.
+_UNLOCKED_BY_ME_COL = (
+    "EXISTS(SELECT 1 FROM lead_unlocks lu "
+    "WHERE lu.user_id = ? AND lu.lead_id = leads.id) AS unlocked_by_me"
+)
+_SAFE_SELECT_UNLOCKED = f"SELECT *, {_UNLOCKED_BY_ME_COL} FROM leads"
+# Anonymous callers (or no lead_unlocks table) skip the per-row EXISTS
+_SAFE_SELECT_LOCKED = "SELECT *, 0 AS unlocked_by_me FROM leads"
+
+# Single-lead reads for the text dossier and the filing gate (letter, case
+# packet). Only columns that exist are selected, so a missing one reads as
+# absent from the row dict exactly as it would under SELECT *.
+_DOSSIER_TEXT_COLUMNS = (
+    "case_number", "county", "owner_name", "property_address", "sale_date",
+    "claim_deadline", "winning_bid", "total_debt", "surplus_amount",
+    "data_grade", "confidence_score",
+)
+_FILING_GATE_COLUMNS = ("owner_name", "property_address", "sale_date", "overbid_amount", "surplus_amount")
+_DOSSIER_TEXT_SQL = _LEAD_BY_ID_SQL
+_FILING_GATE_SQL = _LEAD_BY_ID_SQL
+
+
+def _lead_by_id_sql(columns: tuple) -> str:
+    """SELECT of the existing subset of columns for one lead id."""
+    present = [c for c in columns if c in _LEADS_COLUMNS]
+    if not present:
+        return _LEAD_BY_ID_SQL
+    return f"SELECT {', '.join(present)} FROM leads WHERE id = ?"
+
+
+# ── Maintained expiry flag ──────────────────────────────────────────
+# leads.is_expired (1 once claim_deadline has passed; migration 022) keeps
+# _EXPIRED_FILTER a plain column predicate instead of a per-row
+# TRIM/NULLIF/date() chain. The migration's triggers cover writes; the
+# sweep covers the calendar rolling past a deadline. It is a column of its
+# own: statute_window_status carries the migration/scraper window states
+# (DATA_ACCESS_ONLY, ESCROW_ENDED, ...) and is never written here.
+
+_PAST_DEADLINE_SQL = "date(NULLIF(TRIM({col}), '')) < date('now')"
+
+
+def _sweep_expired_leads(conn: sqlite3.Connection) -> int:
+    """Flag leads whose claim_deadline has passed as expired. Returns rows updated."""
+    cur = conn.execute(
+        "UPDATE leads SET is_expired = 1 "
+        "WHERE is_expired = 0 AND claim_deadline IS NOT NULL AND "
+        + _PAST_DEADLINE_SQL.format(col="claim_deadline")
+    )
+    return cur.rowcount
+
+
+def _build_preview_lookup(conn: sqlite3.Connection) -> dict[str, str]:
+    """preview_key -> leads.id for every preview-eligible lead."""
+    q = ("SELECT id, "
+         f"ROUND({_SURPLUS_EXPR}, 2) as estimated_surplus, "
+         f"data_grade, {_claim_deadline_expr} "
+         f"FROM leads WHERE {_SURPLUS_EXPR} > 100 "
+         f"AND data_grade != 'REJECT' {_EXPIRED_FILTER}")
+    lookup: dict[str, str] = {}
+    today = datetime.now(timezone.utc).date()
+    # Tuple rows zipped against the column names once — no sqlite3.Row per lead
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(q)
+    cols = [d[0] for d in cur.description]
+    for values in cur:
+        r = dict(zip(cols, values))
+        if is_preview_eligible(r, today):  # STRICT gate — single source of truth
+            lookup[_preview_key_for_id(r["id"] or "")] = r["id"]
+    return lookup
+
 
 # ── Startup ─────────────────────────────────────────────────────────
 
@@ -1735,16 +2635,23 @@ _claim_deadline_expr = "NULL AS claim_deadline"  # Set at startup
 async def startup():
     """Log DB identity on boot + detect lead columns for preview SQL + build preview lookup."""
     global _LEADS_COLUMNS, _PREVIEW_SELECT, _EXPIRED_FILTER, _PREVIEW_LOOKUP, _claim_deadline_expr
+    global _SAFE_SELECT, _SAFE_SELECT_UNLOCKED, _FULL_SELECT, _INVENTORY_HEALTH_SQL, _SAMPLE_DOSSIER_SQL
+    global _SAFE_SELECT_LOCKED, _STATS_TOTALS_SQL, _DOSSIER_TEXT_SQL, _FILING_GATE_SQL
     global _USE_ASSET_UNLOCKS_FOR_LOOKUP, _HAS_LEAD_UNLOCKS
+    global DOC_EXECUTOR
+
+    if DOC_EXECUTOR is None:
+        DOC_EXECUTOR = _start_doc_executor()
 
     db_path = Path(VERIFUSE_DB_PATH)
     inode = "N/A"
-    sha = "N/A"
+    fingerprint = "N/A"
     rows = "N/A"
     try:
         stat = db_path.stat()
         inode = stat.st_ino
-        sha = hashlib.sha256(db_path.read_bytes()[:8192]).hexdigest()[:16]
+        # mtime/size fingerprint — read_bytes() would pull the whole DB into memory
+        fingerprint = f"{stat.st_mtime_ns:x}-{stat.st_size}"
         conn = _get_conn()
         try:
             rows = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
@@ -1757,20 +2664,58 @@ async def startup():
     except Exception as e:
         log.warning("Startup DB check: %s", e)
 
+    # Catch up the expiry flag (migration 022) on deadlines that passed while down
+    if "is_expired" in _LEADS_COLUMNS and "claim_deadline" in _LEADS_COLUMNS:
+        try:
+            _ex = _get_conn()
+            try:
+                _swept = _sweep_expired_leads(_ex)
+                _ex.commit()
+                if _swept:
+                    log.info("Expiry flag: %d leads marked expired", _swept)
+            finally:
+                _ex.close()
+        except Exception as _exe:
+            log.warning("Expiry flag sweep: %s", _exe)
+
     # Build dynamic preview SELECT
     claim_deadline_expr = "claim_deadline" if "claim_deadline" in _LEADS_COLUMNS else "NULL AS claim_deadline"
     _claim_deadline_expr = claim_deadline_expr
-    statute_status_expr = "statute_window_status" if "statute_window_status" in _LEADS_COLUMNS else "NULL AS statute_window_status"
+    _SAMPLE_DOSSIER_SQL = _SAMPLE_DOSSIER_SQL_TMPL.format(claim_deadline_expr=claim_deadline_expr)
+    if _LEADS_COLUMNS:
+        _SAFE_SELECT = (
+            f"SELECT {', '.join(c for c in _SAFE_COLUMNS if c in _LEADS_COLUMNS)}, "
+            f"{claim_deadline_expr} FROM leads"
+        )
+        _SAFE_SELECT_UNLOCKED = _SAFE_SELECT.replace(
+            " FROM leads", f", {_UNLOCKED_BY_ME_COL} FROM leads", 1,
+        )
+        _SAFE_SELECT_LOCKED = _SAFE_SELECT.replace(
+            " FROM leads", ", 0 AS unlocked_by_me FROM leads", 1,
+        )
+        _FULL_SELECT = (
+            f"SELECT {', '.join(c for c in _FULL_COLUMNS if c in _LEADS_COLUMNS)}, "
+            f"{claim_deadline_expr} FROM leads"
+        )
+        _DOSSIER_TEXT_SQL = _lead_by_id_sql(_DOSSIER_TEXT_COLUMNS)
+        _FILING_GATE_SQL = _lead_by_id_sql(_FILING_GATE_COLUMNS)
+    # Projects the PreviewLead shape directly (bands from _SURPLUS_BANDS).
+    # Column order is fixed: preview_leads unpacks rows positionally.
     _PREVIEW_SELECT = (
-        f"SELECT id, county, sale_date, data_grade, confidence_score, "
-        f"ROUND(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0), 2) as estimated_surplus, "
-        f"{claim_deadline_expr}, {statute_status_expr} "
-        f"FROM leads"
+        "SELECT id, county, NULLIF(substr(sale_date, 1, 7), '') AS sale_month, data_grade, "
+        f"{_SURPLUS_BAND_SQL} AS surplus_band "
+        "FROM leads"
     )
 
     # Build expired filter
-    if "statute_window_status" in _LEADS_COLUMNS:
-        _EXPIRED_FILTER = " AND (statute_window_status IS NULL OR statute_window_status != 'EXPIRED')"
+    _status_filter = (
+        " AND (statute_window_status IS NULL OR statute_window_status != 'EXPIRED')"
+        if "statute_window_status" in _LEADS_COLUMNS else ""
+    )
+    if "is_expired" in _LEADS_COLUMNS:
+        _EXPIRED_FILTER = " AND is_expired = 0" + _status_filter
+    elif _status_filter:
+        _EXPIRED_FILTER = _status_filter
     elif "claim_deadline" in _LEADS_COLUMNS:
         _EXPIRED_FILTER = (
             " AND (claim_deadline IS NULL OR TRIM(claim_deadline) = '' "
@@ -1779,22 +2724,15 @@ async def startup():
         )
     else:
         _EXPIRED_FILTER = ""
+    _INVENTORY_HEALTH_SQL = _INVENTORY_HEALTH_SQL_TMPL.format(expired_filter=_EXPIRED_FILTER)
+    _STATS_TOTALS_SQL = _STATS_TOTALS_SQL_TMPL.format(expired_filter=_EXPIRED_FILTER)
 
     # Build preview lookup — O(1) preview_key -> leads.id
     _PREVIEW_LOOKUP = {}
     try:
         conn = _get_conn()
         try:
-            q = ("SELECT id, "
-                 "ROUND(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0), 2) as estimated_surplus, "
-                 f"data_grade, {claim_deadline_expr} "
-                 "FROM leads WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100 "
-                 f"AND data_grade != 'REJECT' {_EXPIRED_FILTER}")
-            for row in conn.execute(q).fetchall():
-                r = dict(row)
-                if is_preview_eligible(r):  # STRICT gate — single source of truth
-                    pk = _compute_preview_key(r)
-                    _PREVIEW_LOOKUP[pk] = r["id"]
+            _PREVIEW_LOOKUP = _build_preview_lookup(conn)
         finally:
             conn.close()
     except Exception as e:
@@ -1803,7 +2741,9 @@ async def startup():
 
     # Build PRICE_MAP
     global _PRICE_MAP
-    _PRICE_MAP = build_price_map(STRIPE_MODE)
+    _PRICE_MAP = MappingProxyType({
+        pid: _PriceInfo(**row) for pid, row in build_price_map(STRIPE_MODE).items()
+    })
     log.info("PRICE_MAP built: %d entries (mode=%s)", len(_PRICE_MAP), STRIPE_MODE)
 
     # Detect vNEXT tables for compat flags
@@ -1927,6 +2867,75 @@ async def startup():
     except Exception as _oe:
         log.warning("Migration 018 (ops_jobs): %s", _oe)
 
+    # Planner statistics — refresh sqlite_stat1 so multi-filter list queries
+    # keep picking the right index as tables grow.
+    try:
+        _an = _get_conn()
+        try:
+            # Unlock checks probe (user_id, lead_id); schema.sql and migration
+            # 002 both index it, but DBs built from only one path may lack it.
+            if _table_exists_conn(_an, "lead_unlocks") and not _has_index_prefix(
+                _an, "lead_unlocks", ("user_id", "lead_id")
+            ):
+                _an.execute("CREATE INDEX IF NOT EXISTS idx_lead_unlocks_user_lead ON lead_unlocks(user_id, lead_id)")
+                log.info("Created idx_lead_unlocks_user_lead")
+            # /api/leads/attorney-ready pages by surplus within the ready set;
+            # a partial expression index serves both its COUNT and ORDER BY.
+            if "attorney_packet_ready" in _LEADS_COLUMNS:
+                _an.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_leads_ready_surplus ON leads("
+                    f"{_SURPLUS_EXPR} DESC) WHERE attorney_packet_ready = 1"
+                )
+            # Every public list orders by the surplus COALESCE then the same
+            # tie-breakers; an index on that exact expression lets LIMIT pages
+            # walk the index instead of sorting the filtered table.
+            _an.execute(
+                "CREATE INDEX IF NOT EXISTS idx_leads_surplus_order ON leads("
+                f"{_SURPLUS_EXPR} DESC, sale_date DESC, county, id)"
+            )
+            # County rollups (get_counties, get_stats) only aggregate leads
+            # with a positive surplus; a partial index carrying county, grade
+            # and the surplus expression covers them and skips the rest.
+            _an.execute(
+                "CREATE INDEX IF NOT EXISTS idx_leads_county_surplus ON leads("
+                "county, data_grade, "
+                f"{_SURPLUS_EXPR}) WHERE {_SURPLUS_EXPR} > 0"
+            )
+            for _tbl_name in ("leads", "lead_unlocks", "unlock_ledger_entries", "asset_unlocks"):
+                if _table_exists_conn(_an, _tbl_name):
+                    _an.execute(f"ANALYZE {_tbl_name}")
+            _an.commit()
+
+            # Opt-in plan dump for the hot list queries (regression canary)
+            if os.environ.get("VERIFUSE_EXPLAIN_PLANS", "").lower() in ("1", "true", "yes"):
+                _hot = {
+                    "preview_leads": (
+                        f"{_PREVIEW_SELECT} WHERE {_SURPLUS_EXPR} > 100 "
+                        f"AND data_grade != 'REJECT'{_EXPIRED_FILTER} "
+                        f"ORDER BY {_SURPLUS_EXPR} DESC, "
+                        "sale_date DESC, county ASC, id ASC LIMIT 25"
+                    ),
+                    "get_leads": (
+                        f"{_SAFE_SELECT_UNLOCKED} WHERE 1=1 "
+                        f"AND {_SURPLUS_EXPR} > 100 "
+                        "AND data_grade != 'REJECT' AND county = 'Denver' "
+                        f"ORDER BY {_SURPLUS_EXPR} DESC, "
+                        "sale_date DESC, county ASC, id ASC LIMIT 50"
+                    ),
+                    "lead_unlock_exists": _LEAD_UNLOCK_EXISTS_SQL,
+                    "daily_views": "SELECT COUNT(*) FROM user_daily_lead_views WHERE user_id = ? AND day = ?",
+                }
+                for _name, _sql in _hot.items():
+                    try:
+                        _plan = " | ".join(r[3] for r in _an.execute(f"EXPLAIN QUERY PLAN {_sql}", [None] * _sql.count("?")))
+                        log.info("Query plan [%s]: %s", _name, _plan)
+                    except Exception as _pe:
+                        log.warning("Query plan [%s] failed: %s", _name, _pe)
+        finally:
+            _an.close()
+    except Exception as _ane:
+        log.warning("ANALYZE failed: %s", _ane)
+
     # ── Background tasks ────────────────────────────────────────────
     async def _wal_checkpoint_loop():
         """Hourly WAL checkpoint to keep WAL file from growing unbounded."""
@@ -1943,40 +2952,83 @@ async def startup():
             except Exception as _we:
                 log.warning("WAL checkpoint failed: %s", _we)
 
+    async def _wal_passive_loop():
+        """Frequent PASSIVE checkpoint — keeps the WAL short and feeds /health."""
+        while True:
+            try:
+                await _run_in_db(_wal_passive_checkpoint)
+            except Exception as _wpe:
+                log.warning("WAL passive checkpoint failed: %s", _wpe)
+            await asyncio.sleep(_WAL_CHECKPOINT_INTERVAL)
+
+    async def _write_behind_loop():
+        """Drain the write-behind queue every half second."""
+        while True:
+            await asyncio.sleep(_WRITE_BEHIND_INTERVAL)
+            if _write_behind.empty():
+                continue
+            try:
+                await _run_in_db(_flush_write_behind)
+            except Exception as _afe:
+                log.warning("Write-behind flush failed: %s", _afe)
+
     async def _preview_lookup_refresh_loop():
         """Refresh preview lookup every 5 minutes so new GOLD leads appear without restart."""
         while True:
             await asyncio.sleep(300)
             try:
                 global _PREVIEW_LOOKUP
-                _new_lookup: dict[str, str] = {}
-                _rc = _get_conn()
-                try:
-                    _rq = (
-                        "SELECT id, "
-                        "ROUND(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0), 2) as estimated_surplus, "
-                        f"data_grade, {_claim_deadline_expr} "
-                        "FROM leads WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100 "
-                        f"AND data_grade != 'REJECT' {_EXPIRED_FILTER}"
-                    )
-                    for _rrow in _rc.execute(_rq).fetchall():
-                        _rd = dict(_rrow)
-                        if is_preview_eligible(_rd):
-                            _pk = _compute_preview_key(_rd)
-                            _new_lookup[_pk] = _rd["id"]
-                finally:
-                    _rc.close()
-                _PREVIEW_LOOKUP = _new_lookup
+                def _rebuild():
+                    with _reader() as _rc:
+                        return _build_preview_lookup(_rc)
+                # Rescan off the event loop; keys for known ids come from
+                # _preview_key_for_id's cache, so only new leads pay the HMAC.
+                _PREVIEW_LOOKUP = await _run_in_db(_rebuild)
                 log.debug("Preview lookup refreshed: %d entries", len(_PREVIEW_LOOKUP))
             except Exception as _re:
                 log.warning("Preview lookup refresh failed: %s", _re)
 
+    async def _expiry_sweep_loop():
+        """Hourly: flag leads whose claim_deadline just passed as expired."""
+        while True:
+            await asyncio.sleep(3600)
+            try:
+                def _sweep():
+                    _sw = _get_conn()
+                    try:
+                        n = _sweep_expired_leads(_sw)
+                        _sw.commit()
+                        return n
+                    finally:
+                        _sw.close()
+                _n = await _run_in_db(_sweep)
+                if _n:
+                    log.info("Expiry sweep: %d leads marked expired", _n)
+            except Exception as _swe:
+                log.warning("Expiry sweep failed: %s", _swe)
+
     asyncio.ensure_future(_wal_checkpoint_loop())
+    asyncio.ensure_future(_wal_passive_loop())
+    asyncio.ensure_future(_write_behind_loop())
     asyncio.ensure_future(_preview_lookup_refresh_loop())
+    if "is_expired" in _LEADS_COLUMNS and "claim_deadline" in _LEADS_COLUMNS:
+        asyncio.ensure_future(_expiry_sweep_loop())
+
+    async def _warm_samples():
+        """One-shot: render sample dossiers off the request path."""
+        try:
+            _n = await asyncio.get_running_loop().run_in_executor(
+                PDF_EXECUTOR, _warm_sample_dossier_cache, list(_PREVIEW_LOOKUP.values()),
+            )
+            log.info("Sample dossier cache warmed: %d renders", _n)
+        except Exception as _se:
+            log.warning("Sample dossier warm-up failed: %s", _se)
+
+    asyncio.ensure_future(_warm_samples())
 
     log.info(
-        "Omega v4.8 BOOT — DB: %s | inode: %s | sha256: %s | leads: %s | columns: %d | build: %s",
-        VERIFUSE_DB_PATH, inode, sha, rows, len(_LEADS_COLUMNS), _BUILD_ID,
+        "Omega v4.8 BOOT — DB: %s | inode: %s | fingerprint: %s | leads: %s | columns: %d | build: %s",
+        VERIFUSE_DB_PATH, inode, fingerprint, rows, len(_LEADS_COLUMNS), _BUILD_ID,
     )
 
 
@@ -1984,9 +3036,35 @@ async def startup():
 async def _shutdown_db_executor():
     DB_EXECUTOR.shutdown(wait=True)
     PDF_EXECUTOR.shutdown(wait=False)  # PDF renders are non-critical at exit
+    global DOC_EXECUTOR
+    if DOC_EXECUTOR is not None:
+        DOC_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        DOC_EXECUTOR = None
+    try:
+        _flush_write_behind()
+    except Exception as e:
+        log.warning("Write-behind flush at shutdown failed: %s", e)
+    _close_pools()
 
 
 # ── Health ──────────────────────────────────────────────────────────
+# Probes poll these every second or so; the DB figures are memoized briefly
+# so a load balancer doesn't turn into a stream of aggregate scans.
+
+_health_cache: dict = {}  # name -> (expires, value)
+_HEALTH_CACHE_TTL = 5.0
+
+
+async def _cached_health(name: str, fn):
+    """Run fn on the DB executor at most once per _HEALTH_CACHE_TTL."""
+    now = _time.monotonic()
+    hit = _health_cache.get(name)
+    if hit is not None and now < hit[0]:
+        return hit[1]
+    value = await _run_in_db(fn)
+    _health_cache[name] = (_time.monotonic() + _HEALTH_CACHE_TTL, value)
+    return value
+
 
 @app.get("/health")
 async def health_check():
@@ -1994,16 +3072,17 @@ async def health_check():
     deps = {}
 
     def _db_health():
-        conn = sqlite3.connect(VERIFUSE_DB_PATH, timeout=5)
-        conn.execute("PRAGMA journal_mode=WAL")
-        wcp = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
         sz_mb = round(os.path.getsize(VERIFUSE_DB_PATH) / 1_048_576, 1)
-        cnt = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
-        conn.close()
-        return {"status": "ok", "size_mb": sz_mb, "leads": cnt, "wal_pages": wcp[1] if wcp else 0}
+        with _reader() as conn:
+            cnt = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        # WAL figures come from the background checkpoint loop + filesystem
+        return {
+            "status": "ok", "size_mb": sz_mb, "leads": cnt,
+            "wal_pages": _wal_state["wal_pages"], "wal_mb": _wal_size_mb(),
+        }
 
     try:
-        deps["database"] = await asyncio.get_event_loop().run_in_executor(DB_EXECUTOR, _db_health)
+        deps["database"] = await _cached_health("db", _db_health)
     except Exception as e:
         deps["database"] = {"status": "error", "detail": str(e)[:120]}
 
@@ -2032,48 +3111,46 @@ async def health_check():
 async def admin_health(request: Request):
     """Full health diagnostics — admin/API-key only."""
     _require_admin_or_api_key(request)
-    conn = _get_conn()
-    try:
-        total = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
-
-        # WAL status
-        wal_info = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
-        wal_pages = wal_info[1] if wal_info else 0
-
-        # Scoreboard by data_grade
-        scoreboard_rows = conn.execute("""
-            SELECT data_grade,
-                   COUNT(*) as lead_count,
-                   COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as verified_surplus
-            FROM leads
-            GROUP BY data_grade
-            ORDER BY verified_surplus DESC
-        """).fetchall()
-        scoreboard = [
-            {
-                "data_grade": r["data_grade"] or "UNGRADED",
-                "lead_count": r["lead_count"],
-                "verified_surplus": round(r["verified_surplus"], 2),
-            }
-            for r in scoreboard_rows
-        ]
 
-        # Quarantine count
-        quarantined = 0
-        try:
-            quarantined = conn.execute(
-                "SELECT COUNT(*) FROM leads_quarantine"
-            ).fetchone()[0]
-        except Exception:
-            pass
+    def _query():
+        with _reader() as conn:
+            # WAL status — cached by the background checkpoint loop
+            wal_pages = _wal_state["wal_pages"]
+
+            # Scoreboard by data_grade — one scan also yields the lead total
+            # and the positive-surplus total
+            scoreboard_rows = conn.execute(f"""
+                SELECT data_grade,
+                       COUNT(*) as lead_count,
+                       COALESCE(SUM({_SURPLUS_EXPR}), 0) as verified_surplus,
+                       COALESCE(SUM(CASE WHEN {_SURPLUS_EXPR} > 0
+                                         THEN {_SURPLUS_EXPR} END), 0) as positive_surplus
+                FROM leads
+                GROUP BY data_grade
+                ORDER BY verified_surplus DESC
+            """).fetchall()
+            scoreboard = [
+                {
+                    "data_grade": r["data_grade"] or "UNGRADED",
+                    "lead_count": r["lead_count"],
+                    "verified_surplus": round(r["verified_surplus"], 2),
+                }
+                for r in scoreboard_rows
+            ]
+            total = sum(r["lead_count"] for r in scoreboard_rows)
+            verified_total = sum(r["positive_surplus"] for r in scoreboard_rows)
 
-        # Verified total
-        verified_total = conn.execute(
-            "SELECT COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) FROM leads WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0"
-        ).fetchone()[0]
+            # Quarantine count
+            quarantined = 0
+            try:
+                quarantined = conn.execute(
+                    "SELECT COUNT(*) FROM leads_quarantine"
+                ).fetchone()[0]
+            except Exception:
+                pass
+        return total, wal_pages, scoreboard, quarantined, verified_total
 
-    finally:
-        conn.close()
+    total, wal_pages, scoreboard, quarantined, verified_total = await _cached_health("admin", _query)
 
     return {
         "status": "ok",
@@ -2106,6 +3183,34 @@ async def public_config():
 
 # ── GET /api/preview/leads — Zero-PII public preview ────────────────
 
+# Shared by both list routes (and matched by idx_leads_surplus_order).
+_LEADS_ORDER = (
+    f" ORDER BY {_SURPLUS_EXPR} DESC,"
+    " sale_date DESC, county ASC, id ASC"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _preview_sql(has_county: bool, has_grade: bool, expired_filter: str, select: str) -> tuple[str, str]:
+    """(count, page) SQL for one preview filter combination — built once.
+
+    Identical text per combination also keeps the pooled connections'
+    statement caches hot. The startup-built fragments are part of the key.
+    """
+    where = (
+        f" WHERE {_SURPLUS_EXPR} > 100"
+        " AND data_grade != 'REJECT'" + expired_filter
+    )
+    if has_county:
+        where += " AND county = ?"
+    if has_grade:
+        where += " AND data_grade = ?"
+    return (
+        f"SELECT COUNT(*) FROM leads{where}",
+        f"{select}{where}{_LEADS_ORDER} LIMIT ? OFFSET ?",
+    )
+
+
 @app.get("/api/preview/leads")
 @limiter.limit("30/minute")
 async def preview_leads(
@@ -2117,38 +3222,33 @@ async def preview_leads(
 ):
     """Public preview — no auth required. ZERO PII, ZERO internal IDs."""
     def _run():
-        conn = _thread_conn()
-        try:
-            where = " WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100"
-            where += " AND data_grade != 'REJECT'"
-            where += _EXPIRED_FILTER
-            params: list = []
-
-            if county:
-                where += " AND county = ?"
-                params.append(county)
-            if grade:
-                where += " AND data_grade = ?"
-                params.append(grade)
+        count_q, data_q = _preview_sql(bool(county), bool(grade), _EXPIRED_FILTER, _PREVIEW_SELECT)
+        params: list = []
+        if county:
+            params.append(county)
+        if grade:
+            params.append(grade)
 
+        with _reader() as conn:
             # Total count (independent query for stable pagination)
-            count_q = f"SELECT COUNT(*) FROM leads{where}"
             total = conn.execute(count_q, params).fetchone()[0]
 
-            # Data query
-            order = " ORDER BY COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) DESC, sale_date DESC, county ASC, id ASC"
-            data_q = f"{_PREVIEW_SELECT}{where}{order} LIMIT ? OFFSET ?"
-            rows = conn.execute(data_q, params + [limit, offset]).fetchall()
-        finally:
-            conn.close()
-
-        leads = []
-        for row in rows:
-            try:
-                leads.append(_row_to_preview(dict(row)))
-            except Exception as e:
-                log.warning("Preview projection error: %s", e)
-                continue
+            # Shape is projected in SQL; only the HMAC key is computed here.
+            # Plain tuples in _PREVIEW_SELECT column order — no sqlite3.Row
+            # objects or by-name lookups, no intermediate fetchall() list.
+            cur = conn.cursor()
+            cur.row_factory = None
+            leads = [
+                {
+                    "preview_key": _preview_key_for_id(lead_id or ""),
+                    "county": lead_county,
+                    "sale_month": sale_month,
+                    "data_grade": data_grade,
+                    "surplus_band": band,
+                }
+                for lead_id, lead_county, sale_month, data_grade, band
+                in cur.execute(data_q, params + [limit, offset])
+            ]
 
         return {
             "total": total,
@@ -2173,9 +3273,10 @@ async def get_rtf_leads(request: Request):
             "ORDER BY updated_at DESC LIMIT 100"
         ).fetchall()
         results = []
+        today = datetime.now(timezone.utc).date()
         for r in rows:
             d = dict(r)
-            safe = _row_to_safe(d)
+            safe = _row_to_safe(d, today)
             results.append(safe)
         return {"leads": results, "count": len(results)}
     finally:
@@ -2190,7 +3291,7 @@ async def promote_rtf(lead_id: str, request: Request):
         raise HTTPException(403, detail="Admin required.")
     conn = _get_conn()
     try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
+        row = conn.execute(_LEAD_BY_ID_SQL, [lead_id]).fetchone()
         if not row:
             raise HTTPException(404, detail="Lead not found.")
         row = dict(row)
@@ -2282,6 +3383,38 @@ async def admin_verify_sota(lead_id: str, request: Request):
 
 # ── GET /api/leads — Paginated, NULL-safe ───────────────────────────
 
+@functools.lru_cache(maxsize=None)
+def _leads_sql(
+    skip_zombie: bool, hide_reject: bool, has_county: bool, has_min_surplus: bool,
+    has_grade: bool, has_verification_state: bool, has_surplus_stream: bool, select: str,
+) -> tuple[str, str]:
+    """(count, page) SQL for one /api/leads filter combination — built once.
+
+    Placeholder order: county, min_surplus, grade, verification_state,
+    surplus_stream (each only when present); the page query binds user_id
+    first and limit/offset last.
+    """
+    where = " WHERE 1=1"
+    if not skip_zombie:
+        where += f" AND {_SURPLUS_EXPR} > 100"
+    if hide_reject:
+        where += " AND data_grade != 'REJECT'"
+    if has_county:
+        where += " AND county = ?"
+    if has_min_surplus:
+        where += f" AND {_SURPLUS_EXPR} >= ?"
+    if has_grade:
+        where += " AND data_grade = ?"
+    if has_verification_state:
+        where += " AND verification_state = ?"
+    if has_surplus_stream:
+        where += " AND surplus_stream = ?"
+    return (
+        f"SELECT COUNT(*) FROM leads{where}",
+        f"{select}{where}{_LEADS_ORDER} LIMIT ? OFFSET ?",
+    )
+
+
 @app.get("/api/leads")
 @limiter.limit("100/minute")
 async def get_leads(
@@ -2296,6 +3429,7 @@ async def get_leads(
     offset: int = Query(0, ge=0),
     verification_state: Optional[str] = Query(None),
     surplus_stream: Optional[str] = Query(None),
+    _db: sqlite3.Connection = Depends(_request_reader),
 ):
     """Return paginated leads as SafeAsset. Handles NULLs gracefully.
 
@@ -2306,104 +3440,103 @@ async def get_leads(
     is_admin_user = user and _is_admin(user)
     is_eff_admin = user and _effective_admin(user, request)
     user_id = user["user_id"] if user else None
+    per_user = user_id is not None and _HAS_LEAD_UNLOCKS
 
     def _run():
-        conn = _thread_conn()
-        try:
-            where = " WHERE 1=1"
-            params: list = []
+        conn = request.state.conn
 
-            # Zombie filter: skip when explicitly requesting BRONZE/REJECT leads or
-            # PRE_SALE pipeline leads — all three categories have $0 surplus by definition.
-            _skip_zombie = (
-                include_zombies
-                or grade in ("BRONZE", "REJECT")
-            )
-            if not _skip_zombie:
-                where += " AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100"
-            if not include_reject or not is_admin_user:
-                where += " AND data_grade != 'REJECT'"
-            if county:
-                where += " AND county = ?"
-                params.append(county)
-            if min_surplus > 0:
-                where += " AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) >= ?"
-                params.append(min_surplus)
-            if grade:
-                where += " AND data_grade = ?"
-                params.append(grade)
-            if verification_state:
-                where += " AND verification_state = ?"
-                params.append(verification_state)
-            if surplus_stream:
-                where += " AND surplus_stream = ?"
-                params.append(surplus_stream.upper())
-
-            # Count for pagination
-            total = conn.execute(f"SELECT COUNT(*) FROM leads{where}", params).fetchone()[0]
-
-            query = f"SELECT *, {_claim_deadline_expr} FROM leads{where}"
-            query += " ORDER BY COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) DESC, sale_date DESC, county ASC, id ASC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+        # Zombie filter: skip when explicitly requesting BRONZE/REJECT leads or
+        # PRE_SALE pipeline leads — all three categories have $0 surplus by definition.
+        _skip_zombie = (
+            include_zombies
+            or grade in ("BRONZE", "REJECT")
+        )
+        count_q, query = _leads_sql(
+            bool(_skip_zombie), bool(not include_reject or not is_admin_user),
+            bool(county), min_surplus > 0, bool(grade),
+            bool(verification_state), bool(surplus_stream),
+            _SAFE_SELECT_UNLOCKED if per_user else _SAFE_SELECT_LOCKED,
+        )
+        params: list = []
+        if county:
+            params.append(county)
+        if min_surplus > 0:
+            params.append(min_surplus)
+        if grade:
+            params.append(grade)
+        if verification_state:
+            params.append(verification_state)
+        if surplus_stream:
+            params.append(surplus_stream.upper())
 
-            rows = conn.execute(query, params).fetchall()
+        # Count for pagination
+        total = conn.execute(count_q, params).fetchone()[0]
 
-            # Determine which leads the current user has unlocked (paginated set only)
-            lead_ids = [dict(row)["id"] for row in rows]
-            unlocked_ids: set[str] = set()
-            if user_id and lead_ids:
-                placeholders = ",".join(["?"] * len(lead_ids))
-                u_rows = conn.execute(
-                    f"SELECT lead_id FROM lead_unlocks WHERE user_id = ? AND lead_id IN ({placeholders})",
-                    [user_id] + lead_ids
-                ).fetchall()
-                unlocked_ids = {r["lead_id"] for r in u_rows}
+        # Unlock flag for the current user comes back on each row (anonymous → 0)
+        rows = _fetch_dicts(conn, query, [*([user_id] if per_user else ()), *params, limit, offset])
 
-            leads = []
-            for row in rows:
-                try:
-                    r = dict(row)
-                    safe = _row_to_safe(r)
-                    is_unlocked = r["id"] in unlocked_ids
-                    safe["unlocked_by_me"] = is_unlocked
-                    # Exact cents for admins and unlocked leads — override the $100-rounded preview value
-                    if is_unlocked or is_eff_admin:
-                        exact = (
-                            _safe_float(r.get("surplus_amount"))
-                            or _safe_float(r.get("estimated_surplus"))
-                            or _safe_float(r.get("overbid_amount"))
-                            or 0.0
-                        )
-                        safe["estimated_surplus"] = round(exact, 2)
-                    # Mask PII for non-unlocked, non-admin users
-                    if not is_unlocked and not is_eff_admin:
-                        safe["case_number"] = None
-                    # Filter out EXPIRED unless explicitly requested
-                    if not include_expired and safe.get("restriction_status") == "EXPIRED":
-                        continue
-                    leads.append(safe)
-                except Exception as e:
-                    log.warning("Lead projection error: %s", e)
+        leads = []
+        today = datetime.now(timezone.utc).date()
+        for r in rows:
+            try:
+                safe = _row_to_safe(r, today)
+                is_unlocked = bool(r["unlocked_by_me"])
+                safe["unlocked_by_me"] = is_unlocked
+                # Exact cents for admins and unlocked leads — override the $100-rounded preview value
+                if is_unlocked or is_eff_admin:
+                    exact = (
+                        _safe_float(r.get("surplus_amount"))
+                        or _safe_float(r.get("estimated_surplus"))
+                        or _safe_float(r.get("overbid_amount"))
+                        or 0.0
+                    )
+                    safe["estimated_surplus"] = round(exact, 2)
+                # Mask PII for non-unlocked, non-admin users
+                if not is_unlocked and not is_eff_admin:
+                    safe["case_number"] = None
+                # Filter out EXPIRED unless explicitly requested
+                if not include_expired and safe.get("restriction_status") == "EXPIRED":
                     continue
+                leads.append(safe)
+            except Exception as e:
+                log.warning("Lead projection error: %s", e)
+                continue
 
-            return {
-                "count": len(leads),
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "leads": leads,
-            }
-        finally:
-            conn.close()
+        return {
+            "count": len(leads),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "leads": leads,
+        }
 
     return await _run_in_db(_run)
 
 
 # ── POST /api/leads/{id}/unlock — FIFO Ledger + Double-Spend Safe ───
 
+_SOURCE_DOC_COUNT_SQL = (
+    "SELECT (SELECT COUNT(*) FROM html_snapshots WHERE asset_id = ?)"
+    " + (SELECT COUNT(*) FROM evidence_documents WHERE asset_id = ?)"
+)
+
+
+def _source_doc_count(conn: sqlite3.Connection, lead: dict) -> int:
+    """Snapshot + evidence PDF count for the UI evidence lock (0 on any failure)."""
+    try:
+        asset_key = f"FORECLOSURE:CO:{lead.get('county', '').upper()}:{lead.get('case_number', '').upper()}"
+        return conn.execute(_SOURCE_DOC_COUNT_SQL, [asset_key, lead.get("id", "")]).fetchone()[0]
+    except Exception:
+        return 0
+
+
 @app.post("/api/leads/{lead_id}/unlock")
 @limiter.limit("30/minute")
-async def unlock_lead(lead_id: str, request: Request):
+async def unlock_lead(
+    lead_id: str,
+    request: Request,
+    _db: sqlite3.Connection = Depends(_request_db),
+):
     """Unlock a lead using the FIFO unlock ledger.
 
     Gates:
@@ -2416,17 +3549,22 @@ async def unlock_lead(lead_id: str, request: Request):
       FIFO: spend soonest-expiring entries first (NULLs = never-expire last)
       Dispute proof: unlock_spend_journal row per ledger entry consumed
       Compat dual-write: lead_unlocks table (if present)
+    Reads use request.state.conn; the write transaction runs on the pooled
+    writer in DB_EXECUTOR, so concurrent unlocks queue on its lock rather
+    than on SQLite's busy handler.
     """
     import uuid as _uuid_mod
+    conn = request.state.conn
     user = _require_user(request)
     _check_email_verified(user, request)
     ip = _get_client_ip(request)
     user_id = user["user_id"]
+    now_epoch, now_iso = _now_stamps()
 
     # ── Parse optional body (reason_code / ticket_id for admin audit) ─
     _unlock_body: dict = {}
     try:
-        _unlock_body = await request.json()
+        _unlock_body = await _request_json(request)
     except Exception:
         pass
 
@@ -2440,105 +3578,87 @@ async def unlock_lead(lead_id: str, request: Request):
 
     # ── Admin bypass (records unlock for audit, no credit spend) ─
     if _effective_admin(user, request):
-        conn = _get_conn()
-        try:
-            row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-        finally:
-            conn.close()
+        row = conn.execute(f"{_FULL_SELECT} WHERE id = ?", [lead_id]).fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Lead not found.")
+        lead = dict(row)
 
-        conn2 = _get_conn()
-        try:
-            conn2.execute("BEGIN IMMEDIATE")
-            unlock_id = str(_uuid_mod.uuid4())
-            now_epoch = _epoch_now()
-            now_iso = datetime.now(timezone.utc).isoformat()
-            conn2.execute(
-                "INSERT OR IGNORE INTO asset_unlocks "
-                "(id, user_id, asset_id, credits_spent, unlocked_at, ip_address, tier_at_unlock) "
-                "VALUES (?, ?, ?, 0, ?, ?, ?)",
-                [unlock_id, user_id, lead_id, now_epoch, ip, user.get("tier")],
-            )
-            if _HAS_LEAD_UNLOCKS:
-                try:
-                    conn2.execute(
-                        "INSERT OR IGNORE INTO lead_unlocks "
-                        "(user_id, lead_id, unlocked_at, ip_address, plan_tier) "
-                        "VALUES (?, ?, ?, ?, ?)",
-                        [user_id, lead_id, now_iso, ip, user.get("tier")],
-                    )
-                except sqlite3.IntegrityError:
-                    pass
-            _audit_action = "admin_preview"  # default: read-only admin view
-            _reason_code = _unlock_body.get("reason_code", "ADMIN_ACCESS")
-            _ticket_id = _unlock_body.get("ticket_id")
-            _supervisor = _unlock_body.get("supervisor_approval", False)
-            _is_restricted_lead = dict(row).get("restriction_status") == "RESTRICTED"
-
-            if _is_restricted_lead and _supervisor:
-                _audit_action = "admin_force_unlock"
-            elif _reason_code and _reason_code != "ADMIN_ACCESS":
-                _audit_action = "admin_override_unlock"
-            else:
-                _audit_action = "admin_preview"
-
-            _audit_log(conn2, user_id, _audit_action, {
-                "reason_code": _reason_code,
-                "ticket_id": _ticket_id,
-                "supervisor_approval": _supervisor,
-                "case_id": lead_id,
-                "ip": ip,
-            }, ip)
+        def _record_admin_unlock():
+            with _writer() as wconn:
+                # Deferred: first statement is a write, and no credits move here
+                wconn.execute("BEGIN")
+                unlock_id = str(_uuid_mod.uuid4())
+                wconn.execute(
+                    _ASSET_UNLOCK_INSERT_SQL,
+                    [unlock_id, user_id, lead_id, 0, now_epoch, ip, user.get("tier")],
+                )
+                if _HAS_LEAD_UNLOCKS:
+                    try:
+                        wconn.execute(
+                            _LEAD_UNLOCK_INSERT_SQL,
+                            [user_id, lead_id, now_iso, ip, user.get("tier")],
+                        )
+                    except sqlite3.IntegrityError:
+                        pass
+                _audit_action = "admin_preview"  # default: read-only admin view
+                _reason_code = _unlock_body.get("reason_code", "ADMIN_ACCESS")
+                _ticket_id = _unlock_body.get("ticket_id")
+                _supervisor = _unlock_body.get("supervisor_approval", False)
+                _is_restricted_lead = lead.get("restriction_status") == "RESTRICTED"
+
+                if _is_restricted_lead and _supervisor:
+                    _audit_action = "admin_force_unlock"
+                elif _reason_code and _reason_code != "ADMIN_ACCESS":
+                    _audit_action = "admin_override_unlock"
+                else:
+                    _audit_action = "admin_preview"
+
+                _audit_meta = {
+                    "reason_code": _reason_code,
+                    "ticket_id": _ticket_id,
+                    "supervisor_approval": _supervisor,
+                    "case_id": lead_id,
+                    "ip": ip,
+                }
+                _is_override = _audit_action in ("admin_override_unlock", "admin_force_unlock")
 
-            # Also log to admin_override_log for override/force actions
-            if _audit_action in ("admin_override_unlock", "admin_force_unlock"):
-                try:
-                    _admin_override_log(
-                        conn2, user_id, _audit_action,
-                        reason_code=_reason_code or "ADMIN_ACCESS",
-                        target_lead_id=lead_id,
-                    )
-                except Exception:
-                    pass  # Non-fatal — audit_log entry already captured above
+                # Override/force rows are compliance records: written in the
+                # unlock transaction so they commit (or roll back) with it.
+                if _is_override:
+                    _audit_log(wconn, user_id, _audit_action, _audit_meta, ip)
 
-            conn2.execute("COMMIT")
+                    # Also log to admin_override_log for override/force actions
+                    try:
+                        _admin_override_log(
+                            wconn, user_id, _audit_action,
+                            reason_code=_reason_code or "ADMIN_ACCESS",
+                            target_lead_id=lead_id,
+                        )
+                    except Exception:
+                        pass  # Non-fatal — audit_log entry already captured above
+
+                wconn.execute("COMMIT")
+
+                # A plain preview is only an event row — queued once the
+                # unlock has committed, so the transaction holds just its rows.
+                if not _is_override:
+                    _audit_log_deferred(user_id, _audit_action, _audit_meta, ip)
+
+        try:
+            await _run_in_db(_record_admin_unlock)
         except Exception as e:
-            try:
-                conn2.execute("ROLLBACK")
-            except Exception:
-                pass
             log.warning("Admin unlock audit write failed: %s", e)
-        finally:
-            conn2.close()
 
-        _sc2 = _get_conn()
-        try:
-            result = _row_to_full(dict(row), conn=_sc2, unlocked_by_me=True, is_admin=True)
-            # Phase 5: source_doc_count for UI evidence lock
-            _lead_id2 = dict(row).get("id", "")
-            _county2 = dict(row).get("county", "")
-            _case2 = dict(row).get("case_number", "")
-            _asset_key2 = f"FORECLOSURE:CO:{_county2.upper()}:{_case2.upper()}"
-            try:
-                _snap_ct2 = _sc2.execute("SELECT COUNT(*) FROM html_snapshots WHERE asset_id=?", [_asset_key2]).fetchone()[0]
-                _pdf_ct2 = _sc2.execute("SELECT COUNT(*) FROM evidence_documents WHERE asset_id=?", [_lead_id2]).fetchone()[0]
-                result["source_doc_count"] = _snap_ct2 + _pdf_ct2
-            except Exception:
-                result["source_doc_count"] = 0
-        finally:
-            _sc2.close()
+        result = _row_to_full(lead, conn=conn, unlocked_by_me=True, is_admin=True)
+        # Phase 5: source_doc_count for UI evidence lock
+        result["source_doc_count"] = _source_doc_count(conn, lead)
         result["ok"] = True
         result["credits_remaining"] = -1
         result["credits_spent"] = 0
         return result
 
     # ── Fetch lead ───────────────────────────────────────────────
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-    finally:
-        conn.close()
+    row = conn.execute(f"{_FULL_SELECT} WHERE id = ?", [lead_id]).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Lead not found.")
 
@@ -2568,131 +3688,81 @@ async def unlock_lead(lead_id: str, request: Request):
         cost = CREDIT_COSTS.get("rtf_unlock", 3)
     else:
         cost = 1
-    now_epoch = _epoch_now()
-    now_iso = datetime.now(timezone.utc).isoformat()
-
-    conn = _get_conn()
-    credits_after = 0
-    try:
-        conn.execute("BEGIN IMMEDIATE")
-
-        # ── Step 1: INSERT OR IGNORE asset_unlocks — double-spend guard ──
-        unlock_id = str(_uuid_mod.uuid4())
-        cursor = conn.execute(
-            "INSERT OR IGNORE INTO asset_unlocks "
-            "(id, user_id, asset_id, credits_spent, unlocked_at, ip_address, tier_at_unlock) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
-            [unlock_id, user_id, lead_id, cost, now_epoch, ip, user.get("tier")],
-        )
 
-        if cursor.rowcount == 0:
-            # Already unlocked — return full asset, no credit spend
-            balance = _ledger_balance(conn, user_id)
-            conn.execute("COMMIT")
-            result = _row_to_full(lead, conn=conn, unlocked_by_me=True, is_admin=False)
-            # Phase 5: source_doc_count for UI evidence lock
-            try:
-                _lead_id3 = lead.get("id", "")
-                _county3 = lead.get("county", "")
-                _case3 = lead.get("case_number", "")
-                _asset_key3 = f"FORECLOSURE:CO:{_county3.upper()}:{_case3.upper()}"
-                _snap_ct3 = conn.execute("SELECT COUNT(*) FROM html_snapshots WHERE asset_id=?", [_asset_key3]).fetchone()[0]
-                _pdf_ct3 = conn.execute("SELECT COUNT(*) FROM evidence_documents WHERE asset_id=?", [_lead_id3]).fetchone()[0]
-                result["source_doc_count"] = _snap_ct3 + _pdf_ct3
-            except Exception:
-                result["source_doc_count"] = 0
-            result["ok"] = True
-            result["credits_remaining"] = balance
-            result["credits_spent"] = 0
-            return result
+    def _spend():
+        with _writer() as wconn:
+            wconn.execute("BEGIN IMMEDIATE")
 
-        # ── Step 2: FIFO spend — safe pre-checked ──────────────────────
-        balance = _ledger_balance(conn, user_id)
-        if balance < cost:
-            conn.execute("ROLLBACK")
-            raise HTTPException(
-                status_code=402,
-                detail=f"Insufficient credits. Need {cost}, have {balance}. Upgrade your plan.",
+            # ── Step 1: INSERT OR IGNORE asset_unlocks — double-spend guard ──
+            unlock_id = str(_uuid_mod.uuid4())
+            cursor = wconn.execute(
+                _ASSET_UNLOCK_INSERT_SQL,
+                [unlock_id, user_id, lead_id, cost, now_epoch, ip, user.get("tier")],
             )
 
-        debits = _fifo_spend(conn, user_id, cost)
-        if debits is None:
-            conn.execute("ROLLBACK")
-            raise HTTPException(
-                status_code=402,
-                detail=f"Insufficient credits. Need {cost}, have {balance}. Upgrade your plan.",
-            )
+            if cursor.rowcount == 0:
+                # Already unlocked — no credit spend
+                balance = _ledger_balance(wconn, user_id)
+                wconn.execute("COMMIT")
+                return False, balance
 
-        # ── Step 3: Spend journal (dispute-proof) ──────────────────────
-        for d in debits:
-            conn.execute(
-                "INSERT INTO unlock_spend_journal "
-                "(id, unlock_id, ledger_entry_id, credits_consumed) "
-                "VALUES (?, ?, ?, ?)",
-                [str(_uuid_mod.uuid4()), unlock_id, d["entry_id"], d["spent"]],
+            # ── Step 2: FIFO spend — one ledger read yields balance + debits ─
+            debits, balance = _fifo_spend_with_balance(wconn, user_id, cost)
+            if debits is None:
+                wconn.execute("ROLLBACK")
+                raise HTTPException(
+                    status_code=402,
+                    detail=f"Insufficient credits. Need {cost}, have {balance}. Upgrade your plan.",
+                )
+
+            # ── Step 3: Spend journal (dispute-proof) ──────────────────────
+            wconn.executemany(
+                _SPEND_JOURNAL_INSERT_SQL,
+                [(str(_uuid_mod.uuid4()), unlock_id, d["entry_id"], d["spent"]) for d in debits],
             )
 
-        # ── Step 4: Compat dual-write to lead_unlocks ──────────────────
-        if _HAS_LEAD_UNLOCKS:
-            try:
-                conn.execute(
-                    "INSERT OR IGNORE INTO lead_unlocks "
-                    "(user_id, lead_id, unlocked_at, ip_address, plan_tier) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    [user_id, lead_id, now_iso, ip, user.get("tier")],
-                )
-            except sqlite3.IntegrityError:
-                pass
+            # ── Step 4: Compat dual-write to lead_unlocks ──────────────────
+            if _HAS_LEAD_UNLOCKS:
+                try:
+                    wconn.execute(
+                        _LEAD_UNLOCK_INSERT_SQL,
+                        [user_id, lead_id, now_iso, ip, user.get("tier")],
+                    )
+                except sqlite3.IntegrityError:
+                    pass
 
-        # ── Step 5: Transaction record ──────────────────────────────────
-        conn.execute(
-            "INSERT INTO transactions "
-            "(id, user_id, type, amount, credits, balance_after, idempotency_key, created_at) "
-            "VALUES (?, ?, 'unlock', 0, ?, ?, ?, ?)",
-            [str(_uuid_mod.uuid4()), user_id, -cost, balance - cost,
-             f"unlock:{user_id}:{lead_id}", now_iso],
-        )
+            # ── Step 5: Transaction record ──────────────────────────────────
+            wconn.execute(
+                _UNLOCK_TRANSACTION_INSERT_SQL,
+                [str(_uuid_mod.uuid4()), user_id, -cost, balance - cost,
+                 f"unlock:{user_id}:{lead_id}", now_iso],
+            )
 
-        # ── Step 6: Audit log + commit ──────────────────────────────────
-        _audit_log(conn, user_id, "lead_unlock", {
-            "lead_id": lead_id, "cost": cost, "balance_after": balance - cost,
-            "tier": user.get("tier"), "status": status,
-        }, ip)
-        conn.execute("COMMIT")
-        credits_after = balance - cost
+            # ── Step 6: Audit log + commit ──────────────────────────────────
+            _audit_log(wconn, user_id, "lead_unlock", {
+                "lead_id": lead_id, "cost": cost, "balance_after": balance - cost,
+                "tier": user.get("tier"), "status": status,
+            }, ip)
+            wconn.execute("COMMIT")
+            return True, balance - cost
 
+    try:
+        spent, credits_after = await _run_in_db(_spend)
     except HTTPException:
         raise
     except Exception as e:
-        try:
-            conn.execute("ROLLBACK")
-        except Exception:
-            pass
         log.error("Unlock failed: %s", e)
         raise HTTPException(status_code=500, detail="Unlock failed.")
-    finally:
-        conn.close()
 
-    _sc = _get_conn()
-    try:
-        result = _row_to_full(lead, conn=_sc, unlocked_by_me=True, is_admin=False)
-        # Phase 5: source_doc_count for UI evidence lock
-        _lead_uuid = lead.get("id", "")
-        _county = lead.get("county", "")
-        _case = lead.get("case_number", "")
-        _asset_key = f"FORECLOSURE:CO:{_county.upper()}:{_case.upper()}"
-        try:
-            _snap_ct = _sc.execute("SELECT COUNT(*) FROM html_snapshots WHERE asset_id=?", [_asset_key]).fetchone()[0]
-            _pdf_ct = _sc.execute("SELECT COUNT(*) FROM evidence_documents WHERE asset_id=?", [_lead_uuid]).fetchone()[0]
-            result["source_doc_count"] = _snap_ct + _pdf_ct
-        except Exception:
-            result["source_doc_count"] = 0
-    finally:
-        _sc.close()
+    # Already-unlocked leads come back with spent=False and no credit spend
+    result = _row_to_full(lead, conn=conn, unlocked_by_me=True, is_admin=False)
+    # Phase 5: source_doc_count for UI evidence lock
+    result["source_doc_count"] = _source_doc_count(conn, lead)
     result["ok"] = True
     result["credits_remaining"] = credits_after
-    result["credits_spent"] = cost
-    _invalidate_stats_cache()
+    result["credits_spent"] = cost if spent else 0
+    if spent:
+        _invalidate_stats_cache()
     return result
 
 
@@ -2710,31 +3780,29 @@ async def billing_upgrade(request: Request):
     if not _effective_admin(user, request):
         raise HTTPException(status_code=403, detail="Admin only. Tier upgrades happen via Stripe.")
 
-    body = await request.json()
+    body = await _request_json(request)
     target_user_id = body.get("user_id", user["user_id"])
     new_tier = body.get("tier", "").lower()
 
-    from verifuse_v2.server.pricing import TIERS
-    valid_tiers = list(TIERS.keys())
-
-    if new_tier not in valid_tiers:
+    if new_tier not in _TIER_VALID_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid tier. Choose from: {valid_tiers}",
+            detail=f"Invalid tier. Choose from: {list(TIERS)}",
         )
 
-    credits = get_monthly_credits(new_tier)
-    now = datetime.now(timezone.utc).isoformat()
+    credits = _TIER_MONTHLY_CREDITS[new_tier]
+    now = _now_iso_cached()
 
-    conn = _get_conn()
-    try:
-        conn.execute("""
-            UPDATE users SET tier = ?, credits_remaining = ?, credits_reset_at = ?
-            WHERE user_id = ?
-        """, [new_tier, credits, now, target_user_id])
-        conn.commit()
-    finally:
-        conn.close()
+    def _update():
+        with _writer() as conn:
+            conn.execute("""
+                UPDATE users SET tier = ?, credits_remaining = ?, credits_reset_at = ?
+                WHERE user_id = ?
+            """, [new_tier, credits, now, target_user_id])
+            conn.commit()
+
+    await _run_in_db(_update)
+    _invalidate_user_cache(target_user_id)
 
     _log_action(user["user_id"], "admin_tier_upgrade", {"target": target_user_id, "tier": new_tier})
     return {
@@ -2747,169 +3815,169 @@ async def billing_upgrade(request: Request):
 
 # ── GET /api/stats — Public dashboard stats ────────────────────────
 
+# Both public aggregates are cached as encoded JSON, so a hit skips the
+# scan and the serialisation alike.
 _stats_cache: dict = {"data": None, "expires": 0.0}
+_counties_cache: dict = {"data": None, "expires": 0.0}
 _STATS_CACHE_TTL = 30.0
 
 
+_county_rollup_cache: dict = {"data": None, "expires": 0.0}
+
+
 def _invalidate_stats_cache() -> None:
     _stats_cache["expires"] = 0.0
+    _counties_cache["expires"] = 0.0
+    _county_rollup_cache["expires"] = 0.0
+
+
+def _county_rollup(conn: sqlite3.Connection) -> list[dict]:
+    """_COUNTY_ROLLUP_SQL rows, shared by both endpoints for the stats TTL."""
+    now = _time.monotonic()
+    if _county_rollup_cache["data"] is not None and now < _county_rollup_cache["expires"]:
+        return _county_rollup_cache["data"]
+    rows = _fetch_dicts(conn, _COUNTY_ROLLUP_SQL)
+    _county_rollup_cache["data"] = rows
+    _county_rollup_cache["expires"] = _time.monotonic() + _STATS_CACHE_TTL
+    return rows
+
+
+# Every scalar /api/stats figure over leads, as conditional aggregates in one
+# pass (the county / stream GROUP BYs stay separate). Final SQL is rebuilt
+# once at startup, after _EXPIRED_FILTER is known.
+_STATS_TOTALS_SQL_TMPL = f"""
+    SELECT COUNT(*) AS total,
+           COALESCE(SUM({_SURPLUS_EXPR}), 0) AS raw_total,
+           COALESCE(SUM(CASE WHEN data_grade != 'REJECT'
+                              AND {_SURPLUS_EXPR} > 1000
+                             THEN 1 ELSE 0 END), 0) AS with_surplus,
+           COALESCE(SUM(CASE WHEN data_grade = 'GOLD' THEN 1 ELSE 0 END), 0) AS gold,
+           COALESCE(SUM(CASE WHEN data_grade = 'SILVER' THEN 1 ELSE 0 END), 0) AS silver,
+           COALESCE(SUM(CASE WHEN data_grade = 'BRONZE' THEN 1 ELSE 0 END), 0) AS bronze,
+           COALESCE(SUM(CASE WHEN data_grade = 'REJECT' THEN 1 ELSE 0 END), 0) AS reject,
+           COALESCE(SUM(CASE WHEN data_grade != 'REJECT'
+                              AND {_SURPLUS_EXPR} > 0
+                             THEN {_SURPLUS_EXPR} ELSE 0 END), 0) AS claimable,
+           COALESCE(SUM(CASE WHEN data_grade IN ('GOLD', 'SILVER')
+                             THEN {_SURPLUS_EXPR} ELSE 0 END), 0) AS verified,
+           COALESCE(SUM(CASE WHEN data_grade IN ('GOLD', 'SILVER', 'BRONZE')
+                              AND {_SURPLUS_EXPR} > 100{{expired_filter}}
+                             THEN 1 ELSE 0 END), 0) AS vp_cnt,
+           COALESCE(SUM(CASE WHEN data_grade IN ('GOLD', 'SILVER', 'BRONZE')
+                              AND {_SURPLUS_EXPR} > 100{{expired_filter}}
+                             THEN {_SURPLUS_EXPR} ELSE 0 END), 0) AS vp_total,
+           COALESCE(SUM(CASE WHEN processing_status = 'PRE_SALE'
+                              OR (scheduled_sale_date IS NOT NULL AND scheduled_sale_date > date('now'))
+                              OR (sale_date IS NOT NULL AND sale_date > date('now'))
+                             THEN 1 ELSE 0 END), 0) AS pre_sale,
+           COALESCE(SUM(CASE WHEN (processing_status = 'PRE_SALE'
+                              OR (scheduled_sale_date IS NOT NULL AND scheduled_sale_date > date('now'))
+                              OR (sale_date IS NOT NULL AND sale_date > date('now')))
+                              AND opening_bid > 0
+                             THEN opening_bid ELSE 0 END), 0) AS pre_sale_surplus,
+           COALESCE(SUM(CASE WHEN data_grade IN ('GOLD', 'SILVER')
+                              AND updated_at >= datetime('now', '-7 days')
+                             THEN 1 ELSE 0 END), 0) AS new_7d
+    FROM leads
+"""
+_STATS_TOTALS_SQL = _STATS_TOTALS_SQL_TMPL.format(expired_filter="")
 
 
 @app.get("/api/stats")
 async def get_stats():
     now = _time.monotonic()
     if _stats_cache["data"] is not None and now < _stats_cache["expires"]:
-        return _stats_cache["data"]
+        return Response(content=_stats_cache["data"], media_type="application/json")
 
     def _run():
-        conn = _thread_conn()
-        try:
-            total = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
-            # attorney_ready: excludes REJECT — only actionable pipeline leads
-            with_surplus = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade != 'REJECT' AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 1000"
-            ).fetchone()[0]
-            gold_count = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade = 'GOLD'"
-            ).fetchone()[0]
-            # total_claimable_surplus: excludes REJECT — only actionable pipeline
-            total_surplus = conn.execute(
-                "SELECT COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) FROM leads WHERE data_grade != 'REJECT' AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0"
-            ).fetchone()[0]
-            verified_surplus = conn.execute(
-                "SELECT COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) "
-                "FROM leads WHERE data_grade IN ('GOLD', 'SILVER') AND data_grade != 'REJECT'"
-            ).fetchone()[0]
-            counties = conn.execute("""
-                SELECT county, COUNT(*) as cnt,
-                       COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total
-                FROM leads
-                WHERE data_grade != 'REJECT' AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0
-                GROUP BY county ORDER BY total DESC
-            """).fetchall()
+        with _reader() as conn:
+            # attorney_ready / total_claimable_surplus exclude REJECT;
+            # verified pipeline = GOLD+SILVER+BRONZE, surplus > 100, not expired
+            t = conn.execute(_STATS_TOTALS_SQL).fetchone()
+            counties = sorted(
+                (
+                    {"county": r["county"], "cnt": r["graded_count"], "total": r["graded_surplus"]}
+                    for r in _county_rollup(conn) if r["graded_count"]
+                ),
+                key=lambda c: c["total"],
+                reverse=True,
+            )
             # Surplus stream breakdown
-            stream_rows = conn.execute("""
+            stream_rows = conn.execute(f"""
                 SELECT COALESCE(surplus_stream, 'FORECLOSURE_OVERBID') as stream, COUNT(*) as cnt,
-                       COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total
+                       COALESCE(SUM({_SURPLUS_EXPR}), 0) as total
                 FROM leads
-                WHERE data_grade != 'REJECT' AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0
+                WHERE data_grade != 'REJECT' AND {_SURPLUS_EXPR} > 0
                 GROUP BY stream
-            """).fetchall()
+            """)
             stream_breakdown = [dict(r) for r in stream_rows]
 
-            # Verified pipeline: GOLD+SILVER+BRONZE, surplus > 100, not expired
-            vp_row = conn.execute(f"""
-                SELECT COUNT(*) as cnt,
-                       COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total
-                FROM leads
-                WHERE data_grade IN ('GOLD', 'SILVER', 'BRONZE')
-                  AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100
-                  {_EXPIRED_FILTER}
-            """).fetchone()
-
-            # Total raw volume: ALL leads
-            raw_row = conn.execute("""
-                SELECT COUNT(*) as cnt,
-                       COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total
-                FROM leads
-            """).fetchone()
-
-            # Grade breakdown: SILVER, BRONZE, REJECT
-            silver_count = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade = 'SILVER'"
-            ).fetchone()[0]
-            bronze_count = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade = 'BRONZE'"
-            ).fetchone()[0]
-            reject_count = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade = 'REJECT'"
-            ).fetchone()[0]
-
-            # Pre-sale pipeline: upcoming auctions (explicit PRE_SALE status OR future scheduled sale date)
-            pre_sale_count = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE processing_status = 'PRE_SALE' "
-                "OR (scheduled_sale_date IS NOT NULL AND scheduled_sale_date > date('now')) "
-                "OR (sale_date IS NOT NULL AND sale_date > date('now'))"
-            ).fetchone()[0]
-            pre_sale_surplus = conn.execute(
-                "SELECT COALESCE(SUM(COALESCE(opening_bid, 0)), 0) "
-                "FROM leads WHERE (processing_status = 'PRE_SALE' "
-                "OR (scheduled_sale_date IS NOT NULL AND scheduled_sale_date > date('now')) "
-                "OR (sale_date IS NOT NULL AND sale_date > date('now'))) "
-                "AND opening_bid > 0"
-            ).fetchone()[0]
-
             # County list from county_profiles (active counties in platform — for filter UI)
-            county_rows = conn.execute(
-                "SELECT county FROM county_profiles ORDER BY county"
-            ).fetchall()
-            county_list = [r[0].replace("_", " ").title() for r in county_rows] if county_rows else []
+            county_list = [
+                r[0].replace("_", " ").title()
+                for r in conn.execute("SELECT county FROM county_profiles ORDER BY county")
+            ]
 
             # Counties actually covered: active GovSoft config + real GOLD/SILVER/BRONZE leads
-            active_rows = conn.execute("""
-                SELECT DISTINCT l.county FROM leads l
+            counties_covered = conn.execute("""
+                SELECT COUNT(DISTINCT l.county) FROM leads l
                 JOIN govsoft_county_configs gcc ON gcc.county = l.county AND gcc.active = 1
                 WHERE l.data_grade IN ('GOLD','SILVER','BRONZE')
-                ORDER BY l.county
-            """).fetchall()
-            counties_covered = len(active_rows)
-
-            # New leads added in last 7 days (GOLD/SILVER only)
-            new_leads_7d = conn.execute(
-                "SELECT COUNT(*) FROM leads WHERE data_grade IN ('GOLD','SILVER') "
-                "AND updated_at >= datetime('now', '-7 days')"
-            ).fetchone()[0]
-        finally:
-            conn.close()
+            """).fetchone()[0]
 
         return {
-            "total_leads": total,
-            "total_assets": vp_row["cnt"],  # pipeline: GOLD/SILVER/BRONZE, surplus>100
-            "attorney_ready": with_surplus,
-            "with_surplus": with_surplus,
-            "gold_grade": gold_count,
-            "silver_grade": silver_count,
-            "bronze_grade": bronze_count,
-            "reject_grade": reject_count,
+            "total_leads": t["total"],
+            "total_assets": t["vp_cnt"],  # pipeline: GOLD/SILVER/BRONZE, surplus>100
+            "attorney_ready": t["with_surplus"],
+            "with_surplus": t["with_surplus"],
+            "gold_grade": t["gold"],
+            "silver_grade": t["silver"],
+            "bronze_grade": t["bronze"],
+            "reject_grade": t["reject"],
             "county_list": county_list,
             "counties_covered": counties_covered,
-            "new_leads_7d": new_leads_7d,
-            "total_claimable_surplus": round(total_surplus, 2),
-            "verified_surplus": round(verified_surplus, 2),
-            "counties": [dict(r) for r in counties],
+            "new_leads_7d": t["new_7d"],
+            "total_claimable_surplus": round(t["claimable"], 2),
+            "verified_surplus": round(t["verified"], 2),
+            "counties": counties,
             "stream_breakdown": stream_breakdown,
-            "verified_pipeline": vp_row["cnt"],
-            "verified_pipeline_surplus": round(vp_row["total"], 2),
-            "total_raw_volume": raw_row["cnt"],
-            "total_raw_volume_surplus": round(raw_row["total"], 2),
-            "pre_sale_count": pre_sale_count,
-            "pre_sale_pipeline_surplus": round(pre_sale_surplus, 2),
+            "verified_pipeline": t["vp_cnt"],
+            "verified_pipeline_surplus": round(t["vp_total"], 2),
+            "total_raw_volume": t["total"],
+            "total_raw_volume_surplus": round(t["raw_total"], 2),
+            "pre_sale_count": t["pre_sale"],
+            "pre_sale_pipeline_surplus": round(t["pre_sale_surplus"], 2),
         }
 
-    result = await _run_in_db(_run)
-    _stats_cache["data"] = result
+    body = _json_dumps(await _run_in_db(_run))
+    _stats_cache["data"] = body
     _stats_cache["expires"] = _time.monotonic() + _STATS_CACHE_TTL
-    return result
+    return Response(content=body, media_type="application/json")
 
 
 # ── Auth helpers ────────────────────────────────────────────────────
 
+def _new_verify_code() -> str:
+    """Uniform 6-digit code (000000-999999) from the CSPRNG in one call."""
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def _store_verify_code(user_id: str, code: str, sent_at: str, conn=None) -> None:
+    """Persist a verification code — on the caller's conn, else the pooled writer."""
+    if conn is not None:
+        conn.execute(_VERIFY_CODE_UPDATE_SQL, [code, sent_at, user_id])
+        conn.commit()
+    else:
+        with _writer() as _wconn:
+            _wconn.execute(_VERIFY_CODE_UPDATE_SQL, [code, sent_at, user_id])
+            _wconn.commit()
+    _invalidate_user_cache(user_id)
+
+
 def _trigger_verification_email(user_id: str, email: str, conn=None) -> None:
     """Send a 6-digit verification code. Reusable from register + send-verification endpoints."""
-    import secrets as _sec
-    code = "".join(_sec.choice(string.digits) for _ in range(6))
-    now_ts = datetime.now(timezone.utc).isoformat()
-    _conn = conn or _get_conn()
-    _close_after = conn is None
-    try:
-        _conn.execute(
-            "UPDATE users SET email_verify_code = ?, email_verify_sent_at = ? WHERE user_id = ?",
-            [code, now_ts, user_id],
-        )
-        _conn.commit()
-    finally:
-        if _close_after:
-            _conn.close()
+    code = _new_verify_code()
+    _store_verify_code(user_id, code, _now_iso_cached(), conn)
     email_mode = os.environ.get("VERIFUSE_EMAIL_MODE", "log").lower()
     if _IS_DEV and email_mode == "log":
         log.info("[DEV] Verification code for %s: %s", email, code)
@@ -2941,7 +4009,7 @@ def _trigger_verification_email(user_id: str, email: str, conn=None) -> None:
 async def api_register(request: Request):
     from verifuse_v2.server.auth import register_user
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body.")
     email = body.get("email", "").strip().lower()
@@ -3006,6 +4074,7 @@ async def api_register(request: Request):
                 [user["user_id"]],
             )
             conn2.commit()
+            _invalidate_user_cache(user["user_id"])
         finally:
             conn2.close()
     # Auto-send verification email at registration
@@ -3033,7 +4102,7 @@ async def api_register(request: Request):
 async def api_login(request: Request):
     from verifuse_v2.server.auth import login_user
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body.")
     email = body.get("email", "").strip().lower()
@@ -3058,13 +4127,13 @@ async def api_login(request: Request):
 @app.get("/api/auth/me")
 async def api_me(request: Request):
     user = _require_user(request)
-    conn = _get_conn()
-    try:
-        balance = _ledger_balance(conn, user["user_id"])
-    finally:
-        conn.close()
-    from verifuse_v2.server.pricing import get_monthly_credits
-    monthly_grant = get_monthly_credits(user["tier"])
+
+    def _query():
+        with _reader() as conn:
+            return _ledger_balance(conn, user["user_id"])
+
+    balance = await _run_in_db(_query)
+    monthly_grant = _TIER_MONTHLY_CREDITS.get(user["tier"], _DEFAULT_MONTHLY_CREDITS)
     credits_pct = round(balance / max(monthly_grant, 1) * 100, 1)
     return {
         "user_id": user["user_id"],
@@ -3092,20 +4161,21 @@ async def api_me(request: Request):
 async def send_verification(request: Request):
     """Send a 6-digit verification code to the user's email."""
     user = _require_user(request)
+    now_dt = datetime.now(timezone.utc)
 
     # 60-second resend cooldown
-    _cconn = _get_conn()
-    try:
-        _cts = _cconn.execute(
-            "SELECT email_verify_sent_at FROM users WHERE user_id = ?",
-            [user["user_id"]],
-        ).fetchone()
-    finally:
-        _cconn.close()
+    def _last_sent():
+        with _reader() as _cconn:
+            return _cconn.execute(
+                "SELECT email_verify_sent_at FROM users WHERE user_id = ?",
+                [user["user_id"]],
+            ).fetchone()
+
+    _cts = await _run_in_db(_last_sent)
     if _cts and _cts["email_verify_sent_at"]:
         try:
             _sent = datetime.fromisoformat(_cts["email_verify_sent_at"].replace("Z", "+00:00"))
-            _elapsed = (datetime.now(timezone.utc) - _sent).total_seconds()
+            _elapsed = (now_dt - _sent).total_seconds()
             if _elapsed < 60:
                 raise HTTPException(429, detail=f"Please wait {int(60 - _elapsed)} seconds before resending.")
         except HTTPException:
@@ -3113,9 +4183,8 @@ async def send_verification(request: Request):
         except Exception:
             pass
 
-    import secrets as _sec2
-    code = "".join(_sec2.choice(string.digits) for _ in range(6))
-    now = datetime.now(timezone.utc).isoformat()
+    code = _new_verify_code()
+    now = _now_iso_cached()
 
     # DEV-ONLY: log the code when SMTP is not configured (email mode = log).
     # NEVER logs in production — _IS_DEV is False unless VERIFUSE_ENV=development.
@@ -3125,15 +4194,10 @@ async def send_verification(request: Request):
         # without a configured handler in uvicorn's log setup)
         print(f"[DEV] Verification code for {user['email']}: {code}", flush=True)
 
-    conn = _get_conn()
-    try:
-        conn.execute(
-            "UPDATE users SET email_verify_code = ?, email_verify_sent_at = ? WHERE user_id = ?",
-            [code, now, user["user_id"]],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    def _store():
+        _store_verify_code(user["user_id"], code, now)
+
+    await _run_in_db(_store)
 
     email_mode = os.environ.get("VERIFUSE_EMAIL_MODE", "log").lower()
     _send_email(
@@ -3158,45 +4222,54 @@ async def send_verification(request: Request):
 async def verify_email(request: Request):
     """Verify email with 6-digit code. Code expires after 10 minutes."""
     user = _require_user(request)
-    body = await request.json()
+    body = await _request_json(request)
     code = body.get("code", "").strip()
 
     if not code:
         raise HTTPException(status_code=400, detail="Verification code required.")
 
-    conn = _get_conn()
-    try:
-        row = conn.execute(
-            "SELECT email_verify_code, email_verify_sent_at FROM users WHERE user_id = ?",
-            [user["user_id"]],
-        ).fetchone()
+    user_id = user["user_id"]
+    cutoff = (datetime.now(timezone.utc) - timedelta(minutes=10)).isoformat()
+
+    def _verify():
+        with _writer() as conn:
+            # Hot path: matching, unexpired code verifies in one statement
+            if not conn.execute(_VERIFY_EMAIL_UPDATE_SQL, [user_id, code, cutoff]).rowcount:
+                # Nothing matched — work out why for the 400 (and accept a
+                # sent_at the string comparison could not judge)
+                row = conn.execute(
+                    "SELECT email_verify_code, email_verify_sent_at FROM users WHERE user_id = ?",
+                    [user_id],
+                ).fetchone()
 
-        if not row or not row[0]:
-            raise HTTPException(status_code=400, detail="No verification code pending. Request a new one.")
+                if not row or not row[0]:
+                    raise HTTPException(status_code=400, detail="No verification code pending. Request a new one.")
 
-        stored_code = row[0]
-        sent_at = row[1]
+                stored_code = row[0]
+                sent_at = row[1]
 
-        # Check expiry (10 minutes)
-        if sent_at:
-            try:
-                sent_dt = datetime.fromisoformat(sent_at)
-                if datetime.now(timezone.utc) - sent_dt > timedelta(minutes=10):
-                    raise HTTPException(status_code=400, detail="Code expired. Request a new one.")
-            except (ValueError, TypeError):
-                pass
+                # Check expiry (10 minutes)
+                if sent_at:
+                    try:
+                        sent_dt = datetime.fromisoformat(sent_at)
+                        if datetime.now(timezone.utc) - sent_dt > timedelta(minutes=10):
+                            raise HTTPException(status_code=400, detail="Code expired. Request a new one.")
+                    except (ValueError, TypeError):
+                        pass
 
-        if code != stored_code:
-            raise HTTPException(status_code=400, detail="Invalid code.")
+                if code != stored_code:
+                    raise HTTPException(status_code=400, detail="Invalid code.")
 
-        # Success — verify and clear
-        conn.execute(
-            "UPDATE users SET email_verified = 1, email_verify_code = NULL, email_verify_sent_at = NULL WHERE user_id = ?",
-            [user["user_id"]],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+                # Success — verify and clear
+                conn.execute(
+                    "UPDATE users SET email_verified = 1, email_verify_code = NULL, "
+                    "email_verify_sent_at = NULL WHERE user_id = ?",
+                    [user_id],
+                )
+            conn.commit()
+
+    await _run_in_db(_verify)
+    _invalidate_user_cache(user_id)
 
     return {"ok": True, "email_verified": True}
 
@@ -3208,7 +4281,7 @@ async def verify_email(request: Request):
 async def forgot_password(request: Request):
     """Send password reset link. Returns ok=True regardless (no email enumeration)."""
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body.")
     email = body.get("email", "").strip().lower()
@@ -3217,7 +4290,7 @@ async def forgot_password(request: Request):
 
     import secrets as _secrets
     token = _secrets.token_urlsafe(32)
-    now_ts = datetime.now(timezone.utc).isoformat()
+    now_ts = _now_iso_cached()
     conn = _get_conn()
     try:
         row = conn.execute("SELECT user_id FROM users WHERE email = ?", [email]).fetchone()
@@ -3227,6 +4300,7 @@ async def forgot_password(request: Request):
                 [token, now_ts, row["user_id"]],
             )
             conn.commit()
+            _invalidate_user_cache(row["user_id"])
             reset_url = f"https://verifuse.tech/reset-password?token={token}"
             pw_html = _build_html_email(
                 "Password Reset Request",
@@ -3266,7 +4340,7 @@ async def forgot_password(request: Request):
 async def reset_password(request: Request):
     """Reset password using token from email link. Token expires in 1 hour."""
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body.")
     token = body.get("token", "").strip()
@@ -3310,6 +4384,7 @@ async def reset_password(request: Request):
             [new_hash, row["user_id"]],
         )
         conn.commit()
+        _invalidate_user_cache(row["user_id"])
     finally:
         conn.close()
     return {"ok": True}
@@ -3321,7 +4396,7 @@ async def change_password(request: Request):
     """Change password for authenticated user. Requires current password."""
     user = _require_user(request)
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body.")
     current_pw = body.get("current_password", "")
@@ -3346,6 +4421,7 @@ async def change_password(request: Request):
             [new_hash, user["user_id"]],
         )
         conn.commit()
+        _invalidate_user_cache(user["user_id"])
     finally:
         conn.close()
     return {"ok": True}
@@ -3357,142 +4433,140 @@ async def change_password(request: Request):
 
 @app.get("/api/lead/{lead_id}")
 @limiter.limit("100/minute")
-async def get_lead_detail(lead_id: str, request: Request):
+async def get_lead_detail(
+    lead_id: str,
+    request: Request,
+    _db: sqlite3.Connection = Depends(_request_db),
+):
     """Return a single lead as SafeAsset. Frontend calls GET /api/lead/{id}."""
     user = _get_user_from_request(request)
     is_eff_admin = user and _effective_admin(user, request)
     user_id = user["user_id"] if user else None
     tier = user.get("tier", "scout") if user else None
-    daily_limit = (get_daily_limit(tier) or 100) if tier else 100
+    daily_limit = _TIER_DAILY_LIMIT.get(tier, _DEFAULT_DAILY_LIMIT) if tier else 100
 
     def _run():
-        conn = _thread_conn()
-        try:
-            row = conn.execute(
-                f"SELECT *, {_claim_deadline_expr} FROM leads WHERE id = ?", [lead_id]
-            ).fetchone()
-            if not row:
-                return None
-
-            result = _row_to_safe(dict(row))
+        conn = request.state.conn
+        row = conn.execute(
+            f"{_FULL_SELECT} WHERE id = ?", [lead_id]
+        ).fetchone()
+        if not row:
+            return None
 
-            # ── Equity resolution fields (Gate 7) ────────────────────────────
-            registry_asset_id = result.get("registry_asset_id")
-            if registry_asset_id:
-                try:
-                    eq_row = conn.execute(
-                        """SELECT gross_surplus_cents, net_owner_equity_cents, classification
-                           FROM equity_resolution WHERE asset_id = ?""",
-                        [registry_asset_id],
-                    ).fetchone()
-                    if eq_row:
-                        result["gross_surplus_cents"]    = eq_row["gross_surplus_cents"]
-                        result["net_owner_equity_cents"] = eq_row["net_owner_equity_cents"]
-                        result["classification"]         = eq_row["classification"]
-                except Exception:
-                    pass  # Equity data is supplemental
+        result = _row_to_safe(dict(row))
 
-            # ── Admin auto-unlock: return full PII data without click ────────
-            if is_eff_admin:
-                full = _row_to_full(dict(row), conn=conn, unlocked_by_me=True, is_admin=True)
+        # ── Equity resolution fields (Gate 7) ────────────────────────────
+        registry_asset_id = result.get("registry_asset_id")
+        if registry_asset_id:
+            try:
+                eq_row = conn.execute(
+                    """SELECT gross_surplus_cents, net_owner_equity_cents, classification
+                       FROM equity_resolution WHERE asset_id = ?""",
+                    [registry_asset_id],
+                ).fetchone()
+                if eq_row:
+                    result["gross_surplus_cents"]    = eq_row["gross_surplus_cents"]
+                    result["net_owner_equity_cents"] = eq_row["net_owner_equity_cents"]
+                    result["classification"]         = eq_row["classification"]
+            except Exception:
+                pass  # Equity data is supplemental
+
+        # ── Admin auto-unlock: return full PII data without click ────────
+        if is_eff_admin:
+            full = _row_to_full(dict(row), conn=conn, unlocked_by_me=True, is_admin=True)
+            result.update(full)
+            result["unlocked_by_me"] = True
+            is_unlocked = True
+        else:
+            # ── Check unlock status ───────────────────────────────────────────
+            is_unlocked = False
+            if user_id:
+                u_row = conn.execute(_LEAD_UNLOCK_EXISTS_SQL, [user_id, lead_id]).fetchone()
+                is_unlocked = bool(u_row)
+            result["unlocked_by_me"] = is_unlocked
+            if is_unlocked:
+                full = _row_to_full(dict(row), conn=conn, unlocked_by_me=True, is_admin=False)
                 result.update(full)
-                result["unlocked_by_me"] = True
-                is_unlocked = True
-            else:
-                # ── Check unlock status ───────────────────────────────────────────
-                is_unlocked = False
-                if user_id:
-                    u_row = conn.execute(
-                        "SELECT 1 FROM lead_unlocks WHERE user_id = ? AND lead_id = ?",
-                        [user_id, lead_id]
-                    ).fetchone()
-                    is_unlocked = bool(u_row)
-                result["unlocked_by_me"] = is_unlocked
-                if is_unlocked:
-                    full = _row_to_full(dict(row), conn=conn, unlocked_by_me=True, is_admin=False)
-                    result.update(full)
-
-            # ── Forensic audit data (Phase 4 — unlocked leads only) ──────────
-            # surplus_math_audit: math proof behind the GOLD grade
-            # equity_resolution.notes: provenance citation (snapshot_id / doc_id)
-            if is_unlocked and registry_asset_id:
-                try:
-                    audit_row = conn.execute(
-                        """SELECT html_overbid, successful_bid, total_indebtedness,
-                                  computed_surplus, voucher_overbid, voucher_doc_id,
-                                  match_html_math, match_voucher,
-                                  data_grade AS audit_grade, notes AS audit_notes,
-                                  snapshot_id, doc_id
-                           FROM surplus_math_audit
-                           WHERE asset_id = ?
-                           ORDER BY audit_ts DESC LIMIT 1""",
-                        [registry_asset_id],
-                    ).fetchone()
-                    if audit_row:
-                        result["surplus_math_audit"] = dict(audit_row)
-                except Exception:
-                    pass  # Supplemental — never block the lead response
 
-                try:
-                    eq_notes_row = conn.execute(
-                        "SELECT notes FROM equity_resolution WHERE asset_id = ?",
-                        [registry_asset_id],
-                    ).fetchone()
-                    if eq_notes_row and eq_notes_row["notes"]:
-                        result["equity_resolution_notes"] = eq_notes_row["notes"]
-                except Exception:
-                    pass  # Supplemental — never block the lead response
+        # ── Forensic audit data (Phase 4 — unlocked leads only) ──────────
+        # surplus_math_audit: math proof behind the GOLD grade
+        # equity_resolution.notes: provenance citation (snapshot_id / doc_id)
+        if is_unlocked and registry_asset_id:
+            try:
+                audit_row = conn.execute(
+                    """SELECT html_overbid, successful_bid, total_indebtedness,
+                              computed_surplus, voucher_overbid, voucher_doc_id,
+                              match_html_math, match_voucher,
+                              data_grade AS audit_grade, notes AS audit_notes,
+                              snapshot_id, doc_id
+                       FROM surplus_math_audit
+                       WHERE asset_id = ?
+                       ORDER BY audit_ts DESC LIMIT 1""",
+                    [registry_asset_id],
+                ).fetchone()
+                if audit_row:
+                    result["surplus_math_audit"] = dict(audit_row)
+            except Exception:
+                pass  # Supplemental — never block the lead response
 
-            # ── Junior lien records (always included when available) ──────────
-            # Surfaced to all authenticated users — lien existence is intelligence, not PII.
-            if registry_asset_id:
-                try:
-                    lien_rows = conn.execute(
-                        """SELECT lien_type, lienholder_name, priority, amount_cents, is_open
-                           FROM lien_records
-                           WHERE asset_id = ?
-                           ORDER BY is_open DESC, priority ASC""",
-                        [registry_asset_id],
-                    ).fetchall()
-                    result["junior_liens"] = [dict(r) for r in lien_rows]
-                except Exception:
-                    result["junior_liens"] = []
+            try:
+                eq_notes_row = conn.execute(
+                    "SELECT notes FROM equity_resolution WHERE asset_id = ?",
+                    [registry_asset_id],
+                ).fetchone()
+                if eq_notes_row and eq_notes_row["notes"]:
+                    result["equity_resolution_notes"] = eq_notes_row["notes"]
+            except Exception:
+                pass  # Supplemental — never block the lead response
 
-            # ── Daily view rate limiting (BEGIN IMMEDIATE) ────────────────────
-            if user_id and not is_unlocked and not is_eff_admin:
-                today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                try:
-                    conn.execute("BEGIN IMMEDIATE")
-                    existing = conn.execute(
-                        "SELECT count(*) as n FROM user_daily_lead_views "
-                        "WHERE user_id=? AND day=? AND lead_id=?",
+        # ── Junior lien records (always included when available) ──────────
+        # Surfaced to all authenticated users — lien existence is intelligence, not PII.
+        if registry_asset_id:
+            try:
+                lien_rows = conn.execute(
+                    """SELECT lien_type, lienholder_name, priority, amount_cents, is_open
+                       FROM lien_records
+                       WHERE asset_id = ?
+                       ORDER BY is_open DESC, priority ASC""",
+                    [registry_asset_id],
+                ).fetchall()
+                result["junior_liens"] = [dict(r) for r in lien_rows]
+            except Exception:
+                result["junior_liens"] = []
+
+        # ── Daily view rate limiting (BEGIN IMMEDIATE) ────────────────────
+        if user_id and not is_unlocked and not is_eff_admin:
+            today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                existing = conn.execute(
+                    "SELECT count(*) as n FROM user_daily_lead_views "
+                    "WHERE user_id=? AND day=? AND lead_id=?",
+                    [user_id, today_str, lead_id]
+                ).fetchone()["n"]
+                if existing == 0:
+                    conn.execute(
+                        "INSERT INTO user_daily_lead_views (user_id, day, lead_id) VALUES (?,?,?)",
                         [user_id, today_str, lead_id]
-                    ).fetchone()["n"]
-                    if existing == 0:
-                        conn.execute(
-                            "INSERT INTO user_daily_lead_views (user_id, day, lead_id) VALUES (?,?,?)",
-                            [user_id, today_str, lead_id]
-                        )
-                    conn.execute("COMMIT")
-                except Exception:
-                    conn.execute("ROLLBACK")
-                    raise
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
 
-                count_row = conn.execute(
-                    "SELECT COUNT(*) FROM user_daily_lead_views WHERE user_id = ? AND day = ?",
-                    [user_id, today_str],
-                ).fetchone()
-                view_count = count_row[0] if count_row else 0
-                if view_count > daily_limit:
-                    return ("RATE_LIMIT", daily_limit, tier)
+            count_row = conn.execute(
+                "SELECT COUNT(*) FROM user_daily_lead_views WHERE user_id = ? AND day = ?",
+                [user_id, today_str],
+            ).fetchone()
+            view_count = count_row[0] if count_row else 0
+            if view_count > daily_limit:
+                return ("RATE_LIMIT", daily_limit, tier)
 
-            # Mask PII for non-unlocked, non-admin users
-            if not is_unlocked and not is_eff_admin:
-                result["case_number"] = None
+        # Mask PII for non-unlocked, non-admin users
+        if not is_unlocked and not is_eff_admin:
+            result["case_number"] = None
 
-            return result
-        finally:
-            conn.close()
+        return result
 
     result = await _run_in_db(_run)
     if result is None:
@@ -3510,7 +4584,11 @@ async def get_lead_detail(lead_id: str, request: Request):
 
 @app.post("/api/unlock/{lead_id}")
 @limiter.limit("10/minute")
-async def unlock_lead_compat(lead_id: str, request: Request):
+async def unlock_lead_compat(
+    lead_id: str,
+    request: Request,
+    _db: sqlite3.Connection = Depends(_request_db),
+):
     """Frontend calls POST /api/unlock/{id}. Delegates to unlock logic."""
     return await unlock_lead(lead_id, request)
 
@@ -3519,7 +4597,11 @@ async def unlock_lead_compat(lead_id: str, request: Request):
 
 @app.post("/api/unlock-restricted/{lead_id}")
 @limiter.limit("10/minute")
-async def unlock_restricted_lead(lead_id: str, request: Request):
+async def unlock_restricted_lead(
+    lead_id: str,
+    request: Request,
+    _db: sqlite3.Connection = Depends(_request_db),
+):
     """Unlock a RESTRICTED lead with disclaimer acceptance.
 
     Requires verified attorney + OPERATOR/SOVEREIGN tier.
@@ -3527,7 +4609,7 @@ async def unlock_restricted_lead(lead_id: str, request: Request):
     """
     user = _require_user(request)
     _check_email_verified(user, request)
-    body = await request.json()
+    body = await _request_json(request)
     if not body.get("disclaimer_accepted"):
         raise HTTPException(
             status_code=400,
@@ -3558,37 +4640,33 @@ async def unlock_restricted_lead(lead_id: str, request: Request):
 @app.get("/api/dossier/{lead_id}")
 async def get_dossier(lead_id: str, request: Request):
     """Generate and serve a text dossier for an unlocked lead."""
-    from fastapi.responses import FileResponse
 
     user = _require_user(request)
 
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-    finally:
-        conn.close()
+    check_unlock = not _effective_admin(user, request)
+
+    def _query():
+        with _reader() as conn:
+            row = conn.execute(_DOSSIER_TEXT_SQL, [lead_id]).fetchone()
+            if not row or not check_unlock:
+                return row, True
+            unlock = conn.execute(
+                _LEAD_UNLOCK_EXISTS_SQL, [user["user_id"], lead_id],
+            ).fetchone()
+        return row, unlock is not None
 
+    row, unlocked = await _run_in_db(_query)
     if not row:
         raise HTTPException(status_code=404, detail="Lead not found.")
 
-    lead = dict(row)
-
     # Check if user has unlocked this lead (or is admin)
-    if not _effective_admin(user, request):
-        conn = _get_conn()
-        try:
-            unlock = conn.execute(
-                "SELECT 1 FROM lead_unlocks WHERE user_id = ? AND lead_id = ?",
-                [user["user_id"], lead_id],
-            ).fetchone()
-        finally:
-            conn.close()
-        if not unlock:
-            raise HTTPException(
-                status_code=403,
-                detail="You must unlock this lead before downloading the dossier.",
-            )
+    if not unlocked:
+        raise HTTPException(
+            status_code=403,
+            detail="You must unlock this lead before downloading the dossier.",
+        )
 
+    lead = dict(row)
     surplus = _safe_float(lead.get("surplus_amount")) or 0.0
     bid = _safe_float(lead.get("winning_bid")) or 0.0
 
@@ -3614,11 +4692,8 @@ async def get_dossier(lead_id: str, request: Request):
         "  Verify all figures with the County Public Trustee.",
         "=" * 60,
     ]
-    content = "\n".join(lines)
-
-    from fastapi.responses import Response as _Resp
-    return _Resp(
-        content=content,
+    return Response(
+        content="\n".join(lines).encode(),
         media_type="text/plain",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
@@ -3638,7 +4713,7 @@ async def billing_checkout(request: Request):
         raise HTTPException(status_code=503, detail="Billing not configured. Contact admin.")
 
     user = _require_user(request)
-    body = await request.json()
+    body = await _request_json(request)
     tier = body.get("tier", "").lower()
     billing_period = body.get("billing_period", "monthly").lower()
     if billing_period not in ("monthly", "annual"):
@@ -3675,6 +4750,9 @@ _ONE_TIME_SKUS = {
     "filing_pack":      {"env_key": "FILING_PACK",       "credits": 3,  "name": "Filing Pack"},
     "premium_dossier":  {"env_key": "PREMIUM_DOSSIER",   "credits": 5,  "name": "Premium Dossier"},
 }
+_ONE_TIME_PRICE_IDS = {
+    sku: os.environ.get(f"{_price_prefix}{meta['env_key']}", "") for sku, meta in _ONE_TIME_SKUS.items()
+}
 
 @app.post("/api/billing/one-time")
 @limiter.limit("10/minute")
@@ -3683,19 +4761,17 @@ async def billing_one_time(request: Request):
     if not STRIPE_SECRET_KEY:
         raise HTTPException(status_code=503, detail="Billing not configured.")
     user = _require_user(request)
-    body = await request.json()
+    body = await _request_json(request)
     sku = body.get("sku", "").lower()
     meta = _ONE_TIME_SKUS.get(sku)
     if not meta:
         raise HTTPException(status_code=400, detail=f"Unknown SKU '{sku}'. Choose: {list(_ONE_TIME_SKUS.keys())}")
 
-    price_id = os.environ.get(f"{_price_prefix}{meta['env_key']}", "")
+    price_id = _ONE_TIME_PRICE_IDS[sku]
     if not price_id:
         raise HTTPException(status_code=503, detail=f"{meta['name']} not configured in Stripe.")
 
     try:
-        import stripe as _stripe
-        _stripe.api_key = STRIPE_SECRET_KEY
         session = _stripe.checkout.Session.create(
             mode="payment",
             payment_method_types=["card"],
@@ -3708,8 +4784,8 @@ async def billing_one_time(request: Request):
                 "credits": str(meta["credits"]),
             },
             line_items=[{"price": price_id, "quantity": 1}],
-            success_url=f"{os.environ.get('VERIFUSE_BASE_URL', 'https://verifuse.tech')}/account?credits=1",
-            cancel_url=f"{os.environ.get('VERIFUSE_BASE_URL', 'https://verifuse.tech')}/pricing",
+            success_url=_CREDITS_SUCCESS_URL,
+            cancel_url=_PRICING_URL,
         )
         return {"checkout_url": session.url}
     except Exception as e:
@@ -3727,14 +4803,12 @@ async def billing_starter(request: Request):
 
     user = _require_user(request)
 
-    starter_price_id = os.environ.get(f"{_price_prefix}STARTER", "")
+    starter_price_id = _ONE_TIME_PRICE_IDS["starter"]
     if not starter_price_id or starter_price_id == "price_PLACEHOLDER":
         raise HTTPException(status_code=503, detail="Starter pack not configured.")
 
     try:
-        import stripe
-        stripe.api_key = STRIPE_SECRET_KEY
-        session = stripe.checkout.Session.create(
+        session = _stripe.checkout.Session.create(
             mode="payment",
             payment_method_types=["card"],
             customer_email=user["email"],
@@ -3746,8 +4820,8 @@ async def billing_starter(request: Request):
                 "credits": str(STARTER_PACK["credits"]),
             },
             line_items=[{"price": starter_price_id, "quantity": 1}],
-            success_url=f"{os.environ.get('VERIFUSE_BASE_URL', 'https://verifuse.tech')}/account?credits=1",
-            cancel_url=f"{os.environ.get('VERIFUSE_BASE_URL', 'https://verifuse.tech')}/pricing",
+            success_url=_CREDITS_SUCCESS_URL,
+            cancel_url=_PRICING_URL,
         )
         return {"checkout_url": session.url}
     except Exception as e:
@@ -3780,7 +4854,7 @@ async def billing_status(request: Request):
             ).fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="User not found.")
-        monthly_grant = get_monthly_credits(row["tier"])
+        monthly_grant = _TIER_MONTHLY_CREDITS.get(row["tier"], _DEFAULT_MONTHLY_CREDITS)
         # Use FIFO ledger balance (source of truth) not legacy users.credits_remaining
         ledger_bal = _ledger_balance(conn, user["user_id"])
         return {
@@ -3841,12 +4915,9 @@ async def billing_portal(request: Request):
             detail="No active subscription found. Purchase a plan to manage billing.",
         )
     try:
-        import stripe as _stripe
-        _stripe.api_key = STRIPE_SECRET_KEY
-        base_url = os.environ.get("VERIFUSE_BASE_URL", "https://verifuse.tech")
         session = _stripe.billing_portal.Session.create(
             customer=row["stripe_customer_id"],
-            return_url=f"{base_url}/account",
+            return_url=_ACCOUNT_URL,
         )
         return {"portal_url": session.url}
     except Exception as e:
@@ -3873,8 +4944,6 @@ async def billing_invoices(request: Request):
     if not row or not row["stripe_customer_id"]:
         return {"invoices": []}
     try:
-        import stripe as _stripe
-        _stripe.api_key = STRIPE_SECRET_KEY
         invoices = _stripe.Invoice.list(customer=row["stripe_customer_id"], limit=10)
         result = []
         for inv in invoices.data:
@@ -3902,7 +4971,7 @@ async def billing_invoices(request: Request):
 async def update_account(request: Request):
     """Update user profile: full_name, firm_name, bar_number."""
     user = _require_user(request)
-    body = await request.json()
+    body = await _request_json(request)
     allowed = {"full_name", "firm_name", "bar_number", "bar_state", "firm_address"}
     updates = {k: v for k, v in body.items() if k in allowed and isinstance(v, str)}
     if not updates:
@@ -3913,6 +4982,7 @@ async def update_account(request: Request):
         params = list(updates.values()) + [user["user_id"]]
         conn.execute(f"UPDATE users SET {set_clause} WHERE user_id = ?", params)
         conn.commit()
+        _invalidate_user_cache(user["user_id"])
         _audit_log(conn, user["user_id"], "profile_update", {"fields": list(updates.keys())})
         row = conn.execute(
             "SELECT full_name, firm_name, bar_number, bar_state, firm_address, email FROM users WHERE user_id = ?",
@@ -3940,6 +5010,7 @@ async def account_generate_api_key(request: Request):
             [key_hash, now_str, user["user_id"]],
         )
         conn.commit()
+        _invalidate_user_cache(user["user_id"])
         _audit_log(conn, user["user_id"], "api_key_generated", {"self_service": True})
         return {"api_key": raw_key, "created_at": now_str, "note": "Store this key securely — it will not be shown again."}
     finally:
@@ -3972,6 +5043,7 @@ async def account_revoke_api_key(request: Request):
             [user["user_id"]],
         )
         conn.commit()
+        _invalidate_user_cache(user["user_id"])
         _audit_log(conn, user["user_id"], "api_key_revoked", {"self_service": True})
         return {"status": "revoked"}
     finally:
@@ -3980,6 +5052,31 @@ async def account_revoke_api_key(request: Request):
 
 # ── POST /api/webhook — Stripe webhook (belt + suspenders) ──────────
 
+_STRIPE_SIG_TOLERANCE = 300  # seconds; same default as the Stripe SDK
+_STRIPE_WEBHOOK_KEY = STRIPE_WEBHOOK_SECRET.encode() if STRIPE_WEBHOOK_SECRET else b""
+
+
+def _verify_stripe_signature(payload: bytes, sig_header: str) -> bool:
+    """Check a Stripe-Signature header (t=..., v1=...) against the raw body."""
+    ts = ""
+    candidates = []
+    for part in sig_header.split(","):
+        key, _, value = part.strip().partition("=")
+        if key == "t":
+            ts = value
+        elif key == "v1":
+            candidates.append(value)
+    if not ts or not candidates:
+        return False
+    try:
+        if abs(_time.time() - int(ts)) > _STRIPE_SIG_TOLERANCE:
+            return False
+    except ValueError:
+        return False
+    expected = hmac.new(_STRIPE_WEBHOOK_KEY, ts.encode() + b"." + payload, hashlib.sha256).hexdigest()
+    return any(hmac.compare_digest(expected, c) for c in candidates)
+
+
 @app.post("/api/webhook")
 async def stripe_webhook(request: Request):
     """Stripe webhook handler with idempotency and strict validation.
@@ -3993,59 +5090,53 @@ async def stripe_webhook(request: Request):
     sig = request.headers.get("stripe-signature", "")
 
     # Verify signature
-    if STRIPE_WEBHOOK_SECRET:
-        try:
-            import stripe
-            event = stripe.Webhook.construct_event(payload, sig, STRIPE_WEBHOOK_SECRET)
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid signature.")
-    else:
-        event = json.loads(payload)
+    if STRIPE_WEBHOOK_SECRET and not _verify_stripe_signature(payload, sig):
+        raise HTTPException(status_code=400, detail="Invalid signature.")
+    try:
+        event = _json_loads(payload)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid payload.")
 
     event_id = event.get("id", "")
     event_type = event.get("type", "")
     data_obj = event.get("data", {}).get("object", {})
 
-    # Idempotency: check if we've already processed this event
-    conn = _get_conn()
-    try:
-        existing = conn.execute(
-            "SELECT 1 FROM stripe_events WHERE event_id = ?", [event_id]
-        ).fetchone()
-        if existing:
-            return {"status": "already_processed"}
-    finally:
-        conn.close()
-
-    # Run handler BEFORE marking as processed — if handler crashes, Stripe will retry
-    try:
-        if event_type == "checkout.session.completed":
-            _handle_checkout_session(data_obj)
-        elif event_type == "invoice.payment_succeeded":
-            _handle_invoice_payment(data_obj)
-        elif event_type == "customer.subscription.deleted":
-            _handle_subscription_cancelled(data_obj)
-        else:
-            log.debug("Unhandled Stripe event: %s", event_type)
-    except Exception as exc:
-        log.error("Stripe handler failed for %s %s: %s", event_type, event_id, exc, exc_info=True)
-        raise HTTPException(status_code=500, detail="Webhook handler error — will retry")
+    # Idempotency: claim the event with INSERT OR IGNORE in the same
+    # transaction as the handler's writes. A duplicate delivery inserts
+    # nothing; a handler crash rolls the claim back so Stripe's retry runs.
+    # Handlers write on this connection and leave the commit to us; the
+    # whole event is one BEGIN IMMEDIATE transaction, so the write lock is
+    # taken up front and everything lands in a single WAL commit.
+    def _apply() -> bool:
+        with _writer() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if not conn.execute(_STRIPE_EVENT_INSERT_SQL, [event_id, event_type, _sql_now()]).rowcount:
+                conn.rollback()
+                return False
+            try:
+                if event_type == "checkout.session.completed":
+                    _handle_checkout_session(data_obj, conn)
+                elif event_type == "invoice.payment_succeeded":
+                    _handle_invoice_payment(data_obj, conn)
+                elif event_type == "customer.subscription.deleted":
+                    _handle_subscription_cancelled(data_obj, conn)
+                else:
+                    log.debug("Unhandled Stripe event: %s", event_type)
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                log.error("Stripe handler failed for %s %s: %s", event_type, event_id, exc, exc_info=True)
+                raise HTTPException(status_code=500, detail="Webhook handler error — will retry")
+            return True
 
-    # Mark as processed only after successful handling
-    conn = _get_conn()
-    try:
-        conn.execute(
-            "INSERT OR IGNORE INTO stripe_events (event_id, type, received_at) VALUES (?, ?, datetime('now'))",
-            [event_id, event_type],
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    if not await _run_in_db(_apply):
+        return {"status": "already_processed"}
+    _invalidate_user_cache()  # handlers key users by customer/metadata, not one id
 
     return {"status": "ok"}
 
 
-def _handle_checkout_session(session: dict) -> None:
+def _handle_checkout_session(session: dict, conn: sqlite3.Connection) -> None:
     """Handle checkout.session.completed — one-time pack crediting and subscription activation."""
     metadata = session.get("metadata", {})
     sku = metadata.get("sku", "")
@@ -4088,27 +5179,22 @@ def _handle_checkout_session(session: dict) -> None:
         credits = pack["credits"]
         expires_ts = _epoch_now() + pack["expiry_days"] * 86400
 
-        conn = _get_conn()
         try:
-            try:
-                conn.execute(
-                    "INSERT INTO unlock_ledger_entries "
-                    "(id, user_id, source, qty_total, qty_remaining, purchased_ts, expires_ts, stripe_event_id) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    [str(_uuid_mod.uuid4()), user_id, pack["source"], credits, credits,
-                     _epoch_now(), expires_ts, session_id],
-                )
-            except sqlite3.IntegrityError:
-                log.info("Pack %s already credited (stripe_event_id dup): %s", sku, session_id)
-                return
-            _audit_log(conn, user_id, f"{pack['source']}_credited", {
-                "sku": sku, "credits": credits, "amount_total": amount_total,
-                "session_id": session_id, "expires_ts": expires_ts,
-            })
-            conn.commit()
-            log.info("Pack credited: user=%s sku=%s credits=%d expires=%d", user_id, sku, credits, expires_ts)
-        finally:
-            conn.close()
+            conn.execute(
+                "INSERT INTO unlock_ledger_entries "
+                "(id, user_id, source, qty_total, qty_remaining, purchased_ts, expires_ts, stripe_event_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [str(_uuid_mod.uuid4()), user_id, pack["source"], credits, credits,
+                 _epoch_now(), expires_ts, session_id],
+            )
+        except sqlite3.IntegrityError:
+            log.info("Pack %s already credited (stripe_event_id dup): %s", sku, session_id)
+            return
+        _audit_log(conn, user_id, f"{pack['source']}_credited", {
+            "sku": sku, "credits": credits, "amount_total": amount_total,
+            "session_id": session_id, "expires_ts": expires_ts,
+        })
+        log.info("Pack credited: user=%s sku=%s credits=%d expires=%d", user_id, sku, credits, expires_ts)
     else:
         # Subscription checkout — record customer/subscription IDs only.
         # Credits are granted atomically by the invoice.payment_succeeded event.
@@ -4130,25 +5216,31 @@ def _handle_checkout_session(session: dict) -> None:
             log.warning("Subscription checkout: invalid tier=%r for user_id=%s", tier, user_id)
             return
 
-        conn = _get_conn()
-        try:
-            rows_updated = conn.execute(
-                "UPDATE users SET stripe_customer_id = ?, stripe_subscription_id = ?, "
-                "subscription_status = 'active', tier = ?, billing_period = ? WHERE user_id = ?",
-                [customer_id, subscription_id, tier, billing_period, user_id],
-            ).rowcount
-            if rows_updated == 0:
-                log.error("Subscription checkout: UPDATE matched 0 rows for user_id=%s", user_id)
-            _audit_log(conn, user_id, "subscription_activated", {
-                "tier": tier, "billing_period": billing_period, "customer_id": customer_id,
-            })
-            conn.commit()
-            log.info("Subscription activated: user=%s tier=%s (credits via invoice event)", user_id, tier)
-        finally:
-            conn.close()
+        rows_updated = conn.execute(
+            "UPDATE users SET stripe_customer_id = ?, stripe_subscription_id = ?, "
+            "subscription_status = 'active', tier = ?, billing_period = ? WHERE user_id = ?",
+            [customer_id, subscription_id, tier, billing_period, user_id],
+        ).rowcount
+        if rows_updated == 0:
+            log.error("Subscription checkout: UPDATE matched 0 rows for user_id=%s", user_id)
+        _audit_log(conn, user_id, "subscription_activated", {
+            "tier": tier, "billing_period": billing_period, "customer_id": customer_id,
+        })
+        log.info("Subscription activated: user=%s tier=%s (credits via invoice event)", user_id, tier)
+
+
+def _is_valid_sub_line(line: dict) -> bool:
+    """Invoice line billed at a known subscription price, non-proration, amount > 0."""
+    info = _PRICE_MAP.get(line.get("price", {}).get("id", ""))
+    return (
+        info is not None
+        and info.kind == "subscription"
+        and not line.get("proration", False)
+        and line.get("amount", 0) > 0
+    )
 
 
-def _handle_invoice_payment(invoice: dict) -> None:
+def _handle_invoice_payment(invoice: dict, conn: sqlite3.Connection) -> None:
     """Handle invoice.payment_succeeded — subscription cycle crediting.
 
     STRICTEST validation: all checks must pass before crediting.
@@ -4166,6 +5258,7 @@ def _handle_invoice_payment(invoice: dict) -> None:
         return
     customer_id = invoice.get("customer", "")
     subscription_id = invoice.get("subscription", "")
+    invoice_id = invoice.get("id", "")
     if not customer_id or not subscription_id:
         return
     currency = (invoice.get("currency") or "").lower()
@@ -4174,172 +5267,152 @@ def _handle_invoice_payment(invoice: dict) -> None:
         return
 
     # Map invoice → user
-    conn = _get_conn()
-    try:
-        user_row = conn.execute(
-            "SELECT user_id, stripe_subscription_id, tier FROM users WHERE stripe_customer_id = ?",
-            [customer_id],
-        ).fetchone()
-        if not user_row:
-            _audit_log(conn, "", "unknown_customer", {"customer_id": customer_id})
-            conn.commit()
-            log.warning("Invoice: unknown customer %s", customer_id)
-            return
-
-        user_id = user_row["user_id"]
-        existing_sub = user_row["stripe_subscription_id"]
+    user_row = conn.execute(_USER_BY_CUSTOMER_SQL, [customer_id]).fetchone()
+    if not user_row:
+        _audit_log(conn, "", "unknown_customer", {"customer_id": customer_id})
+        log.warning("Invoice: unknown customer %s", customer_id)
+        return
 
-        # Subscription ID validation
-        if existing_sub and existing_sub != subscription_id:
-            _audit_log(conn, user_id, "subscription_mismatch", {
-                "expected": existing_sub, "got": subscription_id,
-            })
-            conn.commit()
-            log.warning("Invoice: subscription mismatch for user %s", user_id)
-            return
-        if not existing_sub:
-            conn.execute(
-                "UPDATE users SET stripe_subscription_id = ? WHERE user_id = ?",
-                [subscription_id, user_id],
-            )
+    user_id = user_row["user_id"]
+    existing_sub = user_row["stripe_subscription_id"]
 
-        # Line-item extraction — find valid subscription line
-        lines = invoice.get("lines", {}).get("data", [])
-        valid_line = None
-        for line in lines:
-            price_id = line.get("price", {}).get("id", "")
-            if price_id not in _PRICE_MAP:
-                continue
-            if _PRICE_MAP[price_id]["kind"] != "subscription":
-                continue
-            if line.get("proration", False):
-                continue
-            if line.get("amount", 0) <= 0:
-                continue
-            valid_line = line
-            break
+    # Subscription ID validation
+    if existing_sub and existing_sub != subscription_id:
+        _audit_log(conn, user_id, "subscription_mismatch", {
+            "expected": existing_sub, "got": subscription_id,
+        })
+        log.warning("Invoice: subscription mismatch for user %s", user_id)
+        return
+    if not existing_sub:
+        conn.execute(
+            "UPDATE users SET stripe_subscription_id = ? WHERE user_id = ?",
+            [subscription_id, user_id],
+        )
 
-        if not valid_line:
-            _audit_log(conn, user_id, "no_valid_subscription_line", {
-                "line_count": len(lines),
-            })
-            conn.commit()
-            log.warning("Invoice: no valid subscription line for user %s", user_id)
-            return
+    # Line-item extraction — find valid subscription line
+    lines = invoice.get("lines", {}).get("data", [])
+    valid_line = next(filter(_is_valid_sub_line, lines), None)
 
-        price_id = valid_line["price"]["id"]
-        price_info = _PRICE_MAP[price_id]
-        billing_reason = invoice.get("billing_reason", "")
+    if not valid_line:
+        _audit_log(conn, user_id, "no_valid_subscription_line", {
+            "line_count": len(lines),
+        })
+        log.warning("Invoice: no valid subscription line for user %s", user_id)
+        return
 
-        import uuid as _uuid_mod
-        new_tier = price_info["tier"]
-        monthly = price_info["monthly_credits"]
-
-        if billing_reason == "subscription_update":
-            # Tier sync only — NO credits; handled separately from invoice
-            # TIER_RANK guard: never allow Stripe to downgrade a user
-            _TIER_RANK = {"recon": 0, "associate": 1, "partner": 2, "sovereign": 3}
-            cur_row = conn.execute(
-                "SELECT tier FROM users WHERE user_id = ?", [user_id]
-            ).fetchone()
-            current_tier = (cur_row["tier"] if cur_row else None) or "recon"
-            if _TIER_RANK.get(new_tier, 0) >= _TIER_RANK.get(current_tier, 0):
-                conn.execute(
-                    "UPDATE users SET tier = ?, subscription_status = 'active' WHERE user_id = ?",
-                    [new_tier, user_id],
-                )
-                _audit_log(conn, user_id, "subscription_tier_sync", {"tier": new_tier})
-            else:
-                _audit_log(conn, user_id, "subscription_downgrade_blocked",
-                           {"attempted": new_tier, "current": current_tier})
-        elif billing_reason in ("subscription_cycle", "subscription_create"):
-            # Determine period end (subscription expiry)
-            # invoice.lines[0].period.end is the most reliable source
-            period_end_ts = None
-            for line in lines:
-                period = line.get("period", {})
-                pe = period.get("end")
-                if pe:
-                    try:
-                        period_end_ts = int(pe)
-                    except (ValueError, TypeError):
-                        pass
-                    break
+    price_info = _PRICE_MAP[valid_line["price"]["id"]]
+    billing_reason = invoice.get("billing_reason", "")
 
-            rollover = 0
-            rollover_entries = []
-
-            # Rollover: Month 1 only (subscription_create)
-            if billing_reason == "subscription_create":
-                now_ts = _epoch_now()
-                cutoff_ts = now_ts - 7 * 86400
-                starter_rows = conn.execute(
-                    "SELECT id, qty_remaining FROM unlock_ledger_entries "
-                    "WHERE user_id = ? AND source = 'starter' AND qty_remaining > 0 "
-                    "AND purchased_ts >= ? AND (expires_ts IS NULL OR expires_ts > ?)",
-                    [user_id, cutoff_ts, now_ts],
-                ).fetchall()
-                for s in starter_rows:
-                    rollover += s["qty_remaining"]
-                    rollover_entries.append(s["id"])
+    import uuid as _uuid_mod
+    new_tier = price_info.tier
+    monthly = price_info.monthly_credits
+
+    if billing_reason == "subscription_update":
+        # Tier sync only — NO credits; handled separately from invoice
+        # TIER_RANK guard: never allow Stripe to downgrade a user
+        _TIER_RANK = {"recon": 0, "associate": 1, "partner": 2, "sovereign": 3}
+        cur_row = conn.execute(
+            "SELECT tier FROM users WHERE user_id = ?", [user_id]
+        ).fetchone()
+        current_tier = (cur_row["tier"] if cur_row else None) or "recon"
+        if _TIER_RANK.get(new_tier, 0) >= _TIER_RANK.get(current_tier, 0):
+            conn.execute(
+                "UPDATE users SET tier = ?, subscription_status = 'active' WHERE user_id = ?",
+                [new_tier, user_id],
+            )
+            _audit_log(conn, user_id, "subscription_tier_sync", {"tier": new_tier})
+        else:
+            _audit_log(conn, user_id, "subscription_downgrade_blocked",
+                       {"attempted": new_tier, "current": current_tier})
+    elif billing_reason in ("subscription_cycle", "subscription_create"):
+        # Determine period end (subscription expiry)
+        # invoice.lines[0].period.end is the most reliable source
+        period_end_ts = None
+        for line in lines:
+            period = line.get("period", {})
+            pe = period.get("end")
+            if pe:
+                try:
+                    period_end_ts = int(pe)
+                except (ValueError, TypeError):
+                    pass
+                break
 
-            # First-month welcome bonus (subscription_create only)
-            welcome_bonus = FIRST_MONTH_BONUS.get(new_tier, 0) if billing_reason == "subscription_create" else 0
-            total_credits = monthly + rollover + welcome_bonus
+        rollover = 0
+        rollover_entries = []
 
-            # INSERT subscription ledger entry (idempotent via stripe_event_id)
-            try:
-                conn.execute(
-                    "INSERT INTO unlock_ledger_entries "
-                    "(id, user_id, source, qty_total, qty_remaining, purchased_ts, expires_ts, "
-                    "stripe_event_id, tier_at_purchase) "
-                    "VALUES (?, ?, 'subscription', ?, ?, ?, ?, ?, ?)",
-                    [str(_uuid_mod.uuid4()), user_id, total_credits, total_credits,
-                     _epoch_now(), period_end_ts, event_id, new_tier],
-                )
-            except sqlite3.IntegrityError:
-                log.info("Invoice already processed (stripe_event_id dup): %s", event_id)
-                conn.commit()
-                return
+        # Rollover: Month 1 only (subscription_create)
+        if billing_reason == "subscription_create":
+            now_ts = _epoch_now()
+            cutoff_ts = now_ts - 7 * 86400
+            starter_rows = conn.execute(
+                "SELECT id, qty_remaining FROM unlock_ledger_entries "
+                "WHERE user_id = ? AND source = 'starter' AND qty_remaining > 0 "
+                "AND purchased_ts >= ? AND (expires_ts IS NULL OR expires_ts > ?)",
+                [user_id, cutoff_ts, now_ts],
+            ).fetchall()
+            for s in starter_rows:
+                rollover += s["qty_remaining"]
+                rollover_entries.append(s["id"])
 
-            # Zero out rolled-over starter entries
-            if rollover_entries:
-                for entry_id in rollover_entries:
-                    conn.execute(
-                        "UPDATE unlock_ledger_entries SET qty_remaining = 0 WHERE id = ?",
-                        [entry_id],
-                    )
-                _audit_log(conn, user_id, "starter_rollover", {
-                    "rollover_credits": rollover, "entry_ids": rollover_entries,
-                })
+        # First-month welcome bonus (subscription_create only)
+        welcome_bonus = FIRST_MONTH_BONUS.get(new_tier, 0) if billing_reason == "subscription_create" else 0
+        total_credits = monthly + rollover + welcome_bonus
 
-            # Update users.tier + subscription_status
+        # INSERT subscription ledger entry (idempotent via stripe_event_id)
+        try:
             conn.execute(
-                "UPDATE users SET tier = ?, subscription_status = 'active' WHERE user_id = ?",
-                [new_tier, user_id],
+                "INSERT INTO unlock_ledger_entries "
+                "(id, user_id, source, qty_total, qty_remaining, purchased_ts, expires_ts, "
+                "stripe_event_id, tier_at_purchase) "
+                "VALUES (?, ?, 'subscription', ?, ?, ?, ?, ?, ?)",
+                [str(_uuid_mod.uuid4()), user_id, total_credits, total_credits,
+                 _epoch_now(), period_end_ts, invoice_id, new_tier],
+            )
+        except sqlite3.IntegrityError:
+            log.info("Invoice already processed (stripe_event_id dup): %s", invoice_id)
+            return
+
+        # Zero out rolled-over starter entries
+        if rollover_entries:
+            conn.executemany(
+                "UPDATE unlock_ledger_entries SET qty_remaining = 0 WHERE id = ?",
+                [(entry_id,) for entry_id in rollover_entries],
             )
-            _audit_log(conn, user_id, "subscription_credits_granted", {
-                "tier": new_tier, "credits": monthly, "rollover": rollover,
-                "welcome_bonus": welcome_bonus, "total": total_credits, "reason": billing_reason,
+            _audit_log(conn, user_id, "starter_rollover", {
+                "rollover_credits": rollover, "entry_ids": rollover_entries,
             })
-            log.info("Credits granted: user=%s tier=%s monthly=%d rollover=%d welcome_bonus=%d total=%d reason=%s",
-                     user_id, new_tier, monthly, rollover, welcome_bonus, total_credits, billing_reason)
-        else:
-            log.debug("Invoice: unhandled billing_reason=%s for user %s", billing_reason, user_id)
 
-        conn.commit()
-    finally:
-        conn.close()
+        # Update users.tier + subscription_status
+        conn.execute(
+            "UPDATE users SET tier = ?, subscription_status = 'active' WHERE user_id = ?",
+            [new_tier, user_id],
+        )
+        _audit_log(conn, user_id, "subscription_credits_granted", {
+            "tier": new_tier, "credits": monthly, "rollover": rollover,
+            "welcome_bonus": welcome_bonus, "total": total_credits, "reason": billing_reason,
+        })
+        log.info("Credits granted: user=%s tier=%s monthly=%d rollover=%d welcome_bonus=%d total=%d reason=%s",
+                 user_id, new_tier, monthly, rollover, welcome_bonus, total_credits, billing_reason)
+    else:
+        log.debug("Invoice: unhandled billing_reason=%s for user %s", billing_reason, user_id)
 
 
-def _handle_subscription_cancelled(subscription: dict) -> None:
+
+def _handle_subscription_cancelled(subscription: dict, conn: sqlite3.Connection) -> None:
     """Handle customer.subscription.deleted — cancel subscription."""
     customer_id = subscription.get("customer", "")
     if not customer_id:
         return
 
-    conn = _get_conn()
-    try:
+    if _SQLITE_HAS_RETURNING:
+        rows = conn.execute(
+            "UPDATE users SET subscription_status = 'canceled' WHERE stripe_customer_id = ? "
+            "RETURNING user_id",
+            [customer_id],
+        ).fetchall()
+        user_row = rows[0] if rows else None
+    else:
         conn.execute(
             "UPDATE users SET subscription_status = 'canceled' WHERE stripe_customer_id = ?",
             [customer_id],
@@ -4347,63 +5420,66 @@ def _handle_subscription_cancelled(subscription: dict) -> None:
         user_row = conn.execute(
             "SELECT user_id FROM users WHERE stripe_customer_id = ?", [customer_id]
         ).fetchone()
-        if user_row:
-            _audit_log(conn, user_row["user_id"], "subscription_cancelled", {
-                "customer_id": customer_id,
-            })
-        conn.commit()
-        log.info("Subscription cancelled: customer=%s", customer_id)
-    finally:
-        conn.close()
+    if user_row:
+        _audit_log(conn, user_row["user_id"], "subscription_cancelled", {
+            "customer_id": customer_id,
+        })
+    log.info("Subscription cancelled: customer=%s", customer_id)
 
 
 # ── GET /api/counties — County breakdown ───────────────────────────
 
 @app.get("/api/counties")
 async def get_counties():
-    conn = _get_conn()
-    try:
-        rows = conn.execute("""
-            SELECT county, COUNT(*) as lead_count,
-                   COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total_surplus,
-                   COALESCE(AVG(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as avg_surplus,
-                   COALESCE(MAX(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as max_surplus
-            FROM leads
-            WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0
-            GROUP BY county ORDER BY total_surplus DESC
-        """).fetchall()
-    finally:
-        conn.close()
+    now = _time.monotonic()
+    if _counties_cache["data"] is not None and now < _counties_cache["expires"]:
+        return Response(content=_counties_cache["data"], media_type="application/json")
 
-    return {
-        "count": len(rows),
-        "counties": [dict(r) for r in rows],
-    }
+    def _query():
+        with _reader() as conn:
+            return [
+                {k: r[k] for k in ("county", "lead_count", "total_surplus", "avg_surplus", "max_surplus")}
+                for r in _county_rollup(conn)
+            ]
+
+    counties = await _run_in_db(_query)
+    body = _json_dumps({
+        "count": len(counties),
+        "counties": counties,
+    })
+    _counties_cache["data"] = body
+    _counties_cache["expires"] = _time.monotonic() + _STATS_CACHE_TTL
+    return Response(content=body, media_type="application/json")
 
 
 # ── GET /api/inventory_health — Vault status ──────────────────────
+# One pass over leads: all four counters as conditional aggregates.
+# Completeness = leads with surplus > 0 and a non-blank owner_name.
+# Final SQL is rebuilt once at startup, after _EXPIRED_FILTER is known.
+
+_INVENTORY_HEALTH_SQL_TMPL = (
+    "SELECT COUNT(*), "
+    f"COALESCE(SUM(CASE WHEN {_SURPLUS_EXPR} > 100 "
+    "AND data_grade != 'REJECT'{expired_filter} THEN 1 ELSE 0 END), 0), "
+    "COALESCE(SUM(CASE WHEN sale_date >= date('now', '-7 days') THEN 1 ELSE 0 END), 0), "
+    f"COALESCE(SUM(CASE WHEN {_SURPLUS_EXPR} > 0 "
+    "AND owner_name IS NOT NULL AND TRIM(owner_name) != '' THEN 1 ELSE 0 END), 0) "
+    "FROM leads"
+)
+_INVENTORY_HEALTH_SQL = _INVENTORY_HEALTH_SQL_TMPL.format(expired_filter="")
 
 @app.get("/api/inventory_health")
 async def inventory_health():
     """Public inventory health summary for dashboard."""
-    conn = _get_conn()
-    try:
-        total = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
-        active = conn.execute(
-            "SELECT COUNT(*) FROM leads WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 100 "
-            f"AND data_grade != 'REJECT' {_EXPIRED_FILTER}"
-        ).fetchone()[0]
-        new_7d = conn.execute(
-            "SELECT COUNT(*) FROM leads WHERE sale_date >= date('now', '-7 days')"
-        ).fetchone()[0]
-        # Completeness: leads with surplus > 0 and non-null owner_name
-        complete = conn.execute(
-            "SELECT COUNT(*) FROM leads WHERE COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0 "
-            "AND owner_name IS NOT NULL AND TRIM(owner_name) != ''"
-        ).fetchone()[0]
-        completeness_pct = round(complete / total * 100, 1) if total > 0 else 0
-    finally:
-        conn.close()
+    # One conditional-aggregate pass over leads on one reader. Fanning four
+    # COUNT(*)s out across the pool would scan the table four times and
+    # hold four readers for a number one scan already produces.
+    def _query():
+        with _reader() as conn:
+            return tuple(conn.execute(_INVENTORY_HEALTH_SQL).fetchone())
+
+    total, active, new_7d, complete = await _run_in_db(_query)
+    completeness_pct = round(complete / total * 100, 1) if total > 0 else 0
     return {
         "active_leads": active,
         "total_leads": total,
@@ -4414,90 +5490,90 @@ async def inventory_health():
 
 # ── Admin endpoints ──────────────────────────────────────────────────
 
-@app.get("/api/admin/leads")
+@app.get("/api/admin/leads", dependencies=[Depends(_require_admin_or_api_key)])
 async def admin_leads(
-    request: Request,
     limit: int = Query(100, ge=1, le=1000),
     grade: str = Query("", alias="grade"),
     county: str = Query("", alias="county"),
     surplus_stream: str = Query("", alias="surplus_stream"),
 ):
     """Get all leads with raw data (admin only). Supports JWT admin or API key auth."""
-    _require_admin_or_api_key(request)
-    conn = _get_conn()
-    try:
-        filters = []
-        params: list = []
-        if grade:
-            filters.append("data_grade = ?")
-            params.append(grade.upper())
-        if county:
-            filters.append("lower(county) = lower(?)")
-            params.append(county)
-        if surplus_stream:
-            filters.append("surplus_stream = ?")
-            params.append(surplus_stream.upper())
-        where = ("WHERE " + " AND ".join(filters)) if filters else ""
-        params.append(limit)
-        rows = conn.execute(
-            f"SELECT * FROM leads {where} "
-            "ORDER BY COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) DESC LIMIT ?",
-            params,
-        ).fetchall()
-    finally:
-        conn.close()
-    return {"count": len(rows), "leads": [dict(r) for r in rows]}
+    filters = []
+    params: list = []
+    if grade:
+        filters.append("data_grade = ?")
+        params.append(grade.upper())
+    if county:
+        filters.append("lower(county) = lower(?)")
+        params.append(county)
+    if surplus_stream:
+        filters.append("surplus_stream = ?")
+        params.append(surplus_stream.upper())
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
+    params.append(limit)
 
+    def _query():
+        with _reader() as conn:
+            return _fetch_dicts(
+                conn,
+                f"SELECT * FROM leads {where} "
+                f"ORDER BY {_SURPLUS_EXPR} DESC LIMIT ?",
+                params,
+            )
+
+    leads = await _run_in_db(_query)
+    return _raw_json({"count": len(leads), "leads": leads})
 
-@app.get("/api/admin/quarantine")
-async def admin_quarantine(request: Request):
+
+@app.get("/api/admin/quarantine", dependencies=[Depends(_require_api_key)])
+async def admin_quarantine():
     """Get all quarantined leads (admin only)."""
-    _require_api_key(request)
-    conn = _get_conn()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM leads_quarantine ORDER BY quarantined_at DESC"
-        ).fetchall()
-    except Exception:
-        return {"count": 0, "quarantined": []}
-    finally:
-        conn.close()
-    return {"count": len(rows), "quarantined": [dict(r) for r in rows]}
 
+    def _query():
+        with _reader() as conn:
+            try:
+                return _fetch_dicts(
+                    conn, "SELECT * FROM leads_quarantine ORDER BY quarantined_at DESC"
+                )
+            except Exception:
+                return []
+
+    quarantined = await _run_in_db(_query)
+    return _raw_json({"count": len(quarantined), "quarantined": quarantined})
 
-@app.get("/api/admin/users")
+
+@app.get("/api/admin/users", dependencies=[Depends(_require_admin_or_api_key)])
 async def admin_users(
-    request: Request,
     attorney_status: str = Query("", alias="attorney_status"),
 ):
     """Get all users (admin only). Supports JWT admin or API key auth."""
-    _require_admin_or_api_key(request)
-    conn = _get_conn()
-    try:
-        where = ""
-        params: list = []
-        if attorney_status:
-            where = "WHERE upper(attorney_status) = upper(?)"
-            params.append(attorney_status)
-        rows = conn.execute(
-            f"SELECT u.user_id, u.email, u.full_name, u.firm_name, u.bar_number, u.bar_state, "
-            f"u.tier, u.attorney_status, u.role, "
-            f"u.is_admin, u.is_active, u.email_verified, u.created_at, u.last_login_at, "
-            f"COALESCE((SELECT SUM(le.qty_remaining) FROM unlock_ledger_entries le "
-            f"WHERE le.user_id = u.user_id "
-            f"AND (le.expires_ts IS NULL OR le.expires_ts > strftime('%s','now'))), 0) as credits_remaining "
-            f"FROM users u {where}",
-            params,
-        ).fetchall()
-    finally:
-        conn.close()
-    return {"count": len(rows), "users": [dict(r) for r in rows]}
+    where = ""
+    params: list = []
+    if attorney_status:
+        where = "WHERE upper(attorney_status) = upper(?)"
+        params.append(attorney_status)
+
+    def _query():
+        with _reader() as conn:
+            return _fetch_dicts(
+                conn,
+                f"SELECT u.user_id, u.email, u.full_name, u.firm_name, u.bar_number, u.bar_state, "
+                f"u.tier, u.attorney_status, u.role, "
+                f"u.is_admin, u.is_active, u.email_verified, u.created_at, u.last_login_at, "
+                f"COALESCE((SELECT SUM(le.qty_remaining) FROM unlock_ledger_entries le "
+                f"WHERE le.user_id = u.user_id "
+                f"AND (le.expires_ts IS NULL OR le.expires_ts > strftime('%s','now'))), 0) as credits_remaining "
+                f"FROM users u {where}",
+                params,
+            )
 
+    users = await _run_in_db(_query)
+    return _raw_json({"count": len(users), "users": users})
 
-@app.get("/api/admin/coverage")
-async def admin_coverage(request: Request):
+
+@app.get("/api/admin/coverage", dependencies=[Depends(_require_admin_or_api_key)])
+async def admin_coverage():
     """Scraper coverage report (admin only). Returns JSON array."""
-    _require_admin_or_api_key(request)
     from verifuse_v2.scripts.coverage_report import generate_report
     report = generate_report()
     return {"count": len(report), "counties": report}
@@ -4519,19 +5595,14 @@ async def admin_system_stats(request: Request):
         except Exception:
             pass
 
-        # WAL info
-        wal_pages = 0
-        try:
-            wal_info = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
-            wal_pages = wal_info[1] if wal_info else 0
-        except Exception:
-            pass
+        # WAL info — cached by the background loop; no checkpoint per request
+        wal_pages = _wal_state["wal_pages"]
 
         # Leads scoreboard
-        scoreboard_rows = conn.execute("""
+        scoreboard_rows = conn.execute(f"""
             SELECT data_grade,
                    COUNT(*) as lead_count,
-                   COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total_surplus
+                   COALESCE(SUM({_SURPLUS_EXPR}), 0) as total_surplus
             FROM leads
             GROUP BY data_grade
             ORDER BY CASE data_grade
@@ -4553,8 +5624,8 @@ async def admin_system_stats(request: Request):
 
         # Verified pipeline (GOLD+SILVER, surplus > 0)
         vp_row = conn.execute(
-            "SELECT COUNT(*) as cnt, COALESCE(SUM(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0)), 0) as total "
-            "FROM leads WHERE data_grade IN ('GOLD','SILVER') AND COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) > 0"
+            f"SELECT COUNT(*) as cnt, COALESCE(SUM({_SURPLUS_EXPR}), 0) as total "
+            f"FROM leads WHERE data_grade IN ('GOLD','SILVER') AND {_SURPLUS_EXPR} > 0"
         ).fetchone()
 
         # Recent audit log
@@ -5139,7 +6210,7 @@ async def admin_lead_audit(lead_id: str, request: Request):
     conn = _get_conn()
     try:
         # Lead row (all fields)
-        lead_row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
+        lead_row = conn.execute(_LEAD_BY_ID_SQL, [lead_id]).fetchone()
         if not lead_row:
             conn.close()
             raise HTTPException(status_code=404, detail="Lead not found.")
@@ -5275,25 +6346,28 @@ async def admin_lead_audit(lead_id: str, request: Request):
 async def attorney_verify(request: Request):
     """Submit attorney verification (bar number + state). Sets status to 'pending'."""
     user = _require_user(request)
-    body = await request.json()
+    body = await _request_json(request)
     bar_number = (body.get("bar_number") or "").strip()
     bar_state = (body.get("bar_state") or "CO").strip().upper()
 
     if not bar_number:
         raise HTTPException(status_code=400, detail="Bar number required.")
 
-    conn = _get_conn()
-    try:
-        conn.execute(
-            "UPDATE users SET bar_number = ?, bar_state = ?, attorney_status = 'PENDING' WHERE user_id = ?",
-            [bar_number, bar_state, user["user_id"]],
-        )
-        _audit_log(conn, user["user_id"], "attorney_verify_submitted", {
-            "bar_number": bar_number, "bar_state": bar_state,
-        }, _get_client_ip(request))
-        conn.commit()
-    finally:
-        conn.close()
+    ip = _get_client_ip(request)
+
+    def _submit():
+        with _writer() as conn:
+            conn.execute(
+                "UPDATE users SET bar_number = ?, bar_state = ?, attorney_status = 'PENDING' WHERE user_id = ?",
+                [bar_number, bar_state, user["user_id"]],
+            )
+            _audit_log(conn, user["user_id"], "attorney_verify_submitted", {
+                "bar_number": bar_number, "bar_state": bar_state,
+            }, ip)
+            conn.commit()
+
+    await _run_in_db(_submit)
+    _invalidate_user_cache(user["user_id"])
     return {"ok": True, "attorney_status": "PENDING"}
 
 
@@ -5332,42 +6406,37 @@ async def admin_attorney_lookup(request: Request):
 
 
 @app.post("/api/admin/attorney/approve")
-async def admin_attorney_approve(request: Request):
+async def admin_attorney_approve(request: Request, admin: dict = Depends(_require_admin)):
     """Admin: approve attorney verification. Sets status to 'VERIFIED'."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json()
+    body = await _request_json(request)
     user_id = body.get("user_id", "")
     verification_url = body.get("verification_url", "")
 
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id required.")
 
-    conn = _get_conn()
-    try:
-        conn.execute(
-            "UPDATE users SET attorney_status = 'VERIFIED', verified_attorney = 1, "
-            "role = 'approved_attorney', "
-            "bar_verified_at = datetime('now'), verification_url = ? WHERE user_id = ?",
-            [verification_url, user_id],
-        )
-        _audit_log(conn, user_id, "attorney_approved", {
-            "approved_by": admin["user_id"],
-        })
-        conn.commit()
-    finally:
-        conn.close()
+    def _approve():
+        with _writer() as conn:
+            conn.execute(
+                "UPDATE users SET attorney_status = 'VERIFIED', verified_attorney = 1, "
+                "role = 'approved_attorney', "
+                "bar_verified_at = ?, verification_url = ? WHERE user_id = ?",
+                [_sql_now(), verification_url, user_id],
+            )
+            _audit_log(conn, user_id, "attorney_approved", {
+                "approved_by": admin["user_id"],
+            })
+            conn.commit()
+
+    await _run_in_db(_approve)
+    _invalidate_user_cache(user_id)
     return {"ok": True, "attorney_status": "VERIFIED", "role": "approved_attorney"}
 
 
-@app.post("/api/admin/attorney/reject")
-async def admin_attorney_reject(request: Request):
-    """Admin: reject attorney verification. reason_code required."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json()
+@app.post("/api/admin/attorney/reject")
+async def admin_attorney_reject(request: Request, admin: dict = Depends(_require_admin)):
+    """Admin: reject attorney verification. reason_code required."""
+    body = await _request_json(request)
     user_id = body.get("user_id", "")
     reason_code = str(body.get("reason_code", body.get("reason", ""))).strip()
 
@@ -5387,6 +6456,7 @@ async def admin_attorney_reject(request: Request):
             "reason": reason_code,
         })
         conn.commit()
+        _invalidate_user_cache(user_id)
     finally:
         conn.close()
     return {"ok": True, "attorney_status": "REJECTED"}
@@ -5395,12 +6465,9 @@ async def admin_attorney_reject(request: Request):
 # ── Admin: User Management Actions ──────────────────────────────────────────
 
 @app.post("/api/admin/users/{user_id}/deactivate")
-async def admin_deactivate_user(user_id: str, request: Request):
+async def admin_deactivate_user(user_id: str, request: Request, admin: dict = Depends(_require_admin)):
     """Admin: deactivate a user account (prevents login)."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json() if request.headers.get("content-type", "").startswith("application/json") else {}
+    body = await _request_json(request) if request.headers.get("content-type", "").startswith("application/json") else {}
     reason_code = str(body.get("reason_code", body.get("reason", ""))).strip() if body else ""
     conn = _get_conn()
     try:
@@ -5414,17 +6481,15 @@ async def admin_deactivate_user(user_id: str, request: Request):
         conn.execute("UPDATE users SET is_active = 0 WHERE user_id = ?", [user_id])
         _audit_log(conn, user_id, "user_deactivated", {"by": admin["user_id"], "email": row["email"]})
         conn.commit()
+        _invalidate_user_cache(user_id)
     finally:
         conn.close()
     return {"ok": True, "is_active": False}
 
 
 @app.post("/api/admin/users/{user_id}/activate")
-async def admin_activate_user(user_id: str, request: Request):
+async def admin_activate_user(user_id: str, request: Request, admin: dict = Depends(_require_admin)):
     """Admin: reactivate a deactivated user account."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
     conn = _get_conn()
     try:
         row = conn.execute("SELECT email FROM users WHERE user_id = ?", [user_id]).fetchone()
@@ -5433,18 +6498,16 @@ async def admin_activate_user(user_id: str, request: Request):
         conn.execute("UPDATE users SET is_active = 1 WHERE user_id = ?", [user_id])
         _audit_log(conn, user_id, "user_activated", {"by": admin["user_id"], "email": row["email"]})
         conn.commit()
+        _invalidate_user_cache(user_id)
     finally:
         conn.close()
     return {"ok": True, "is_active": True}
 
 
 @app.post("/api/admin/users/{user_id}/adjust-credits")
-async def admin_adjust_credits(user_id: str, request: Request):
+async def admin_adjust_credits(user_id: str, request: Request, admin: dict = Depends(_require_admin)):
     """Admin: add or subtract credits from a user's wallet (delta can be negative)."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json()
+    body = await _request_json(request)
     delta = int(body.get("delta", 0))
     note = str(body.get("note", "Admin adjustment"))[:200]
     reason_code = str(body.get("reason_code", note)).strip()
@@ -5479,10 +6542,7 @@ async def admin_adjust_credits(user_id: str, request: Request):
                 if remove <= 0:
                     break
                 take = min(e["qty_remaining"], remove)
-                conn.execute(
-                    "UPDATE unlock_ledger_entries SET qty_remaining = qty_remaining - ? WHERE id = ?",
-                    [take, e["id"]],
-                )
+                conn.execute(_LEDGER_DEBIT_SQL, [take, e["id"]])
                 remove -= take
         _admin_override_log(conn, admin["user_id"], "adjust_credits", reason_code or "admin_action",
                             target_user_id=user_id,
@@ -5498,12 +6558,9 @@ async def admin_adjust_credits(user_id: str, request: Request):
 
 
 @app.post("/api/admin/users/{user_id}/set-role")
-async def admin_set_role(user_id: str, request: Request):
+async def admin_set_role(user_id: str, request: Request, admin: dict = Depends(_require_admin)):
     """Admin: change a user's role (public / approved_attorney / admin)."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json()
+    body = await _request_json(request)
     new_role = str(body.get("role", "")).strip()
     reason_code = str(body.get("reason_code", body.get("reason", ""))).strip()
     allowed = ("public", "approved_attorney", "admin")
@@ -5521,18 +6578,16 @@ async def admin_set_role(user_id: str, request: Request):
             "by": admin["user_id"], "new_role": new_role, "email": row["email"],
         })
         conn.commit()
+        _invalidate_user_cache(user_id)
     finally:
         conn.close()
     return {"ok": True, "role": new_role}
 
 
 @app.post("/api/admin/leads/{lead_id}/set-grade")
-async def admin_set_lead_grade(lead_id: str, request: Request):
+async def admin_set_lead_grade(lead_id: str, request: Request, admin: dict = Depends(_require_admin)):
     """Admin: manually override a lead's data_grade. reason_code required."""
-    admin = _require_user(request)
-    if not _is_admin(admin):
-        raise HTTPException(status_code=403, detail="Admin only.")
-    body = await request.json()
+    body = await _request_json(request)
     new_grade = str(body.get("grade", "")).strip().upper()
     allowed_grades = ("GOLD", "SILVER", "BRONZE", "REJECT")
     if new_grade not in allowed_grades:
@@ -5567,36 +6622,16 @@ def _check_lead_unlocked(user: dict, lead_id: str, doc_type: str = "UNKNOWN", re
             ip = request.client.host
 
     if _effective_admin(user, request):
-        try:
-            conn = _get_conn()
-            conn.execute("""
-                INSERT INTO download_audit (user_id, lead_id, doc_type, granted, ip_address)
-                VALUES (?, ?, ?, 1, ?)
-            """, [user["user_id"], lead_id, doc_type, ip])
-            conn.commit()
-            conn.close()
-        except Exception:
-            pass
-        return
-
-    conn = _get_conn()
-    try:
-        unlock = conn.execute(
-            "SELECT 1 FROM lead_unlocks WHERE user_id = ? AND lead_id = ?",
-            [user["user_id"], lead_id],
-        ).fetchone()
+        unlock = True
+    else:
+        # Called from async handlers: _reader() could park the loop on a slot
+        with _nowait_reader() as conn:
+            unlock = conn.execute(
+                _LEAD_UNLOCK_EXISTS_SQL, [user["user_id"], lead_id],
+            ).fetchone()
 
-        granted = 1 if unlock else 0
-        try:
-            conn.execute("""
-                INSERT INTO download_audit (user_id, lead_id, doc_type, granted, ip_address)
-                VALUES (?, ?, ?, ?, ?)
-            """, [user["user_id"], lead_id, doc_type, granted, ip])
-            conn.commit()
-        except Exception:
-            pass
-    finally:
-        conn.close()
+    granted = 1 if unlock else 0
+    _write_behind.put((_DOWNLOAD_AUDIT_INSERT_SQL, (user["user_id"], lead_id, doc_type, granted, ip, _sql_now())))
 
     if not unlock:
         raise HTTPException(
@@ -5608,31 +6643,29 @@ def _check_lead_unlocked(user: dict, lead_id: str, doc_type: str = "UNKNOWN", re
 @app.get("/api/dossier/{lead_id}/docx")
 async def get_dossier_docx(lead_id: str, request: Request):
     """Generate and serve a Word .docx dossier for an unlocked lead."""
-    from fastapi.responses import FileResponse
-    from verifuse_v2.attorney.dossier_docx import generate_dossier
 
     user = _require_user(request)
     _check_lead_unlocked(user, lead_id, doc_type="DOSSIER_DOCX", request=request)
 
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-    finally:
-        conn.close()
-    if not row:
+    def _exists():
+        with _reader() as conn:
+            return conn.execute("SELECT 1 FROM leads WHERE id = ?", [lead_id]).fetchone()
+
+    if not await _run_in_db(_exists):
         raise HTTPException(status_code=404, detail="Lead not found.")
 
-    try:
-        filepath = generate_dossier(VERIFUSE_DB_PATH, lead_id)
-    except Exception as e:
-        log.error("Dossier generation failed: %s", e)
-        raise HTTPException(status_code=500, detail="Dossier generation failed.")
+    # Rendered in memory (no PII on disk) in a worker process
+    async with _doc_slot():
+        loop = asyncio.get_running_loop()
+        try:
+            fname, content = await loop.run_in_executor(DOC_EXECUTOR, render_dossier, VERIFUSE_DB_PATH, lead_id)
+        except Exception as e:
+            log.error("Dossier generation failed: %s", e)
+            raise HTTPException(status_code=500, detail="Dossier generation failed.")
 
-    fname = Path(filepath).name
-    return FileResponse(
-        filepath,
+    return Response(
+        content=content,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=fname,
         headers={
             "Content-Disposition": f'attachment; filename="{fname}"',
             "Cache-Control": "no-store",
@@ -5648,10 +6681,41 @@ async def get_dossier_pdf(lead_id: str, request: Request):
     return await get_dossier(lead_id, request)
 
 
+def _sample_dossier_fields(lead: dict) -> tuple:
+    """The five display strings a sample dossier shows for a lead.
+
+    Numeric columns arrive pre-coerced to REAL by _SAMPLE_DOSSIER_SQL.
+    """
+    return (
+        ("County", lead.get("county") or "N/A"),
+        ("Sale Date", (lead.get("sale_date") or "N/A")[:7]),
+        ("Data Grade", lead.get("data_grade") or "N/A"),
+        ("Confidence Score", f"{lead['confidence_score'] * 100:.0f}%"),
+        ("Estimated Surplus", f"${lead['estimated_surplus']:,.2f}"),
+    )
+
+
 def _generate_sample_dossier_pdf(lead: dict) -> bytes:
     """Generate a non-PII sample dossier PDF using fpdf2. Helvetica core font only."""
-    from fpdf import FPDF
+    return _render_sample_dossier_pdf(_sample_dossier_fields(lead))
+
 
+_SAMPLE_REDACTED_FIELDS = (
+    "Owner Name", "Property Address", "Case Number",
+    "Winning Bid", "Total Indebtedness", "Recorder Link",
+)
+_SAMPLE_REDACTED_LABELS = "\n".join(f + ":" for f in _SAMPLE_REDACTED_FIELDS)
+_SAMPLE_REDACTED_VALUES = "\n".join("[LOCKED - UNLOCK TO REVEAL]" for _ in _SAMPLE_REDACTED_FIELDS)
+
+
+@functools.cache
+def _sample_dossier_skeleton(labels: tuple) -> tuple:
+    """Everything on the sample page except the per-lead values column.
+
+    Returns (blob, y) — an unfinished FPDF, pickled, and the y of the values
+    column. Labels, redactions, CTA and disclaimer never change; unpickling
+    a fresh copy is several times cheaper than deepcopy of the live object.
+    """
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -5678,22 +6742,12 @@ def _generate_sample_dossier_pdf(lead: dict) -> bytes:
     pdf.line(10, pdf.get_y(), 200, pdf.get_y())
     pdf.ln(4)
 
-    pdf.set_font("Helvetica", "", 10)
-    pdf.set_text_color(226, 232, 240)
-    fields = [
-        ("County", lead.get("county") or "N/A"),
-        ("Sale Date", (lead.get("sale_date") or "N/A")[:7]),
-        ("Data Grade", lead.get("data_grade") or "N/A"),
-        ("Confidence Score", f"{(_safe_float(lead.get('confidence_score')) or 0) * 100:.0f}%"),
-        ("Estimated Surplus", f"${_safe_float(lead.get('estimated_surplus')) or 0:,.2f}"),
-    ]
-    for label, value in fields:
-        pdf.set_font("Helvetica", "B", 10)
-        pdf.set_text_color(148, 163, 184)
-        pdf.cell(55, 7, label + ":")
-        pdf.set_font("Helvetica", "", 10)
-        pdf.set_text_color(226, 232, 240)
-        pdf.cell(0, 7, value, ln=True)
+    # Label / value columns as one multi_cell each — same 7mm row grid as
+    # per-row cell() pairs, without toggling font and colour on every row.
+    values_y = pdf.get_y()
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.set_text_color(148, 163, 184)
+    pdf.multi_cell(55, 7, "\n".join(label + ":" for label in labels))
 
     pdf.ln(10)
 
@@ -5707,15 +6761,11 @@ def _generate_sample_dossier_pdf(lead: dict) -> bytes:
 
     pdf.set_font("Helvetica", "", 10)
     pdf.set_text_color(148, 163, 184)
-    redacted = [
-        "Owner Name", "Property Address", "Case Number",
-        "Winning Bid", "Total Indebtedness", "Recorder Link",
-    ]
-    for field in redacted:
-        pdf.cell(55, 7, field + ":")
-        pdf.set_text_color(100, 116, 139)
-        pdf.cell(0, 7, "[LOCKED - UNLOCK TO REVEAL]", ln=True)
-        pdf.set_text_color(148, 163, 184)
+    y0 = pdf.get_y()
+    pdf.multi_cell(55, 7, _SAMPLE_REDACTED_LABELS)
+    pdf.set_xy(pdf.l_margin + 55, y0)
+    pdf.set_text_color(100, 116, 139)
+    pdf.multi_cell(0, 7, _SAMPLE_REDACTED_VALUES)
 
     pdf.ln(10)
 
@@ -5736,17 +6786,56 @@ def _generate_sample_dossier_pdf(lead: dict) -> bytes:
         "foreclosure sale data and does not constitute legal advice. "
         "C.R.S. 38-38-111 restrictions apply. Consult a licensed Colorado attorney."
     )
+    return pickle.dumps(pdf, protocol=pickle.HIGHEST_PROTOCOL), values_y
+
+
+# The five rendered strings are the only per-lead input, and many preview
+# keys share them (same county / month / grade / rounded figures) — cache
+# the finished bytes by that tuple.
+@functools.lru_cache(maxsize=1024)
+def _render_sample_dossier_pdf(fields: tuple) -> bytes:
+    skeleton, values_y = _sample_dossier_skeleton(tuple(label for label, _ in fields))
+    pdf = pickle.loads(skeleton)
+    pdf.set_xy(pdf.l_margin + 55, values_y)
+    pdf.set_font("Helvetica", "", 10)
+    pdf.set_text_color(226, 232, 240)
+    pdf.multi_cell(0, 7, "\n".join(value for _, value in fields))
+
+    # fpdf2 returns a bytearray; freeze it once — the result is cached and shared.
+    return bytes(pdf.output())
+
+
+# Final SQL is rebuilt once at startup, after _claim_deadline_expr is known.
+_SAMPLE_DOSSIER_SQL_TMPL = (
+    "SELECT county, sale_date, data_grade, "
+    "COALESCE(CAST(confidence_score AS REAL), 0.0) AS confidence_score, "
+    f"ROUND({_SURPLUS_EXPR}, 2) as estimated_surplus, "
+    "{claim_deadline_expr} "
+    "FROM leads WHERE id = ?"
+)
+_SAMPLE_DOSSIER_SQL = _SAMPLE_DOSSIER_SQL_TMPL.format(claim_deadline_expr=_claim_deadline_expr)
+
+
+def _warm_sample_dossier_cache(lead_ids) -> int:
+    """Pre-render sample dossiers for preview-eligible leads. Returns renders done.
 
-    raw_out = pdf.output(dest="S")
-    pdf_bytes = raw_out if isinstance(raw_out, (bytes, bytearray)) else raw_out.encode("latin-1")
-    return bytes(pdf_bytes)
+    Only fills the render cache — the route still re-reads and re-checks
+    the lead on every request.
+    """
+    with _reader() as conn:
+        rows = [conn.execute(_SAMPLE_DOSSIER_SQL, [i]).fetchone() for i in lead_ids]
+    today = datetime.now(timezone.utc).date()
+    distinct = {_sample_dossier_fields(dict(r)) for r in rows if r and is_preview_eligible(dict(r), today)}
+    limit = _render_sample_dossier_pdf.cache_parameters()["maxsize"]
+    for fields in itertools.islice(distinct, limit):
+        _render_sample_dossier_pdf(fields)
+    return min(len(distinct), limit)
 
 
 @app.get("/api/dossier/sample/{preview_key}")
 @limiter.limit("30/minute")
 async def get_sample_dossier(preview_key: str, request: Request):
     """Non-PII sample dossier as PDF. No auth. O(1) lookup."""
-    from fastapi.responses import Response
 
     # SECURITY ORACLE: Unified 404 — do not reveal which lookup step failed
     _NOT_FOUND = HTTPException(status_code=404, detail="Not found.")
@@ -5755,16 +6844,11 @@ async def get_sample_dossier(preview_key: str, request: Request):
     if lead_id is None:
         raise _NOT_FOUND
 
-    conn = _get_conn()
-    try:
-        row = conn.execute(
-            f"SELECT county, sale_date, data_grade, confidence_score, "
-            f"ROUND(COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0), 2) as estimated_surplus, "
-            f"{_claim_deadline_expr} "
-            f"FROM leads WHERE id = ?", [lead_id]
-        ).fetchone()
-    finally:
-        conn.close()
+    def _query():
+        with _reader() as conn:
+            return conn.execute(_SAMPLE_DOSSIER_SQL, [lead_id]).fetchone()
+
+    row = await _run_in_db(_query)
 
     if not row:
         raise _NOT_FOUND
@@ -5773,25 +6857,32 @@ async def get_sample_dossier(preview_key: str, request: Request):
     if not is_preview_eligible(dict(row)):
         raise _NOT_FOUND
 
-    pdf_bytes = _generate_sample_dossier_pdf(dict(row))
+    # Weak validator over what the PDF shows — stable across renders and
+    # restarts (the bytes themselves carry a creation timestamp). no-cache,
+    # not max-age: the browser keeps the copy but revalidates every time,
+    # so the eligibility re-check above still gates each fetch.
+    fields = _sample_dossier_fields(dict(row))
+    etag = _weak_etag(fields)
+    headers = {
+        "Content-Disposition": f'attachment; filename="sample_dossier_{preview_key[:8]}.pdf"',
+        "Access-Control-Expose-Headers": "Content-Disposition, ETag",
+        "Cache-Control": "private, no-cache",
+        "X-Content-Type-Options": "nosniff",
+        "ETag": etag,
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
 
     return Response(
-        content=pdf_bytes,
+        content=_render_sample_dossier_pdf(fields),
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="sample_dossier_{preview_key[:8]}.pdf"',
-            "Access-Control-Expose-Headers": "Content-Disposition",
-            "Cache-Control": "no-store",
-            "X-Content-Type-Options": "nosniff",
-        },
+        headers=headers,
     )
 
 
 @app.post("/api/letter/{lead_id}")
 async def generate_letter_endpoint(lead_id: str, request: Request):
     """Generate a Rule 7.3 solicitation letter. Requires VERIFIED attorney."""
-    from fastapi.responses import FileResponse
-    from verifuse_v2.legal.mail_room import generate_letter
 
     user = _require_user(request)
     if not _is_verified_attorney(user) and not _effective_admin(user, request):
@@ -5810,29 +6901,30 @@ async def generate_letter_endpoint(lead_id: str, request: Request):
             raise HTTPException(status_code=403, detail="Firm address required for letter generation.")
     _check_lead_unlocked(user, lead_id, doc_type="LETTER", request=request)
 
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-    finally:
-        conn.close()
+    def _query():
+        with _reader() as conn:
+            return conn.execute(_FILING_GATE_SQL, [lead_id]).fetchone()
+
+    row = await _run_in_db(_query)
     if not row:
         raise HTTPException(status_code=404, detail="Lead not found.")
 
     _assert_ready_to_file(dict(row))
 
-    try:
-        filepath = generate_letter(VERIFUSE_DB_PATH, lead_id, user["user_id"])
-    except Exception as e:
-        log.error("Letter generation failed: %s", e)
-        raise HTTPException(status_code=500, detail="Letter generation failed.")
+    async with _doc_slot():
+        try:
+            filepath = await asyncio.get_running_loop().run_in_executor(
+                DOC_EXECUTOR, generate_letter, VERIFUSE_DB_PATH, lead_id, user["user_id"],
+            )
+        except Exception as e:
+            log.error("Letter generation failed: %s", e)
+            raise HTTPException(status_code=500, detail="Letter generation failed.")
 
-    fname = Path(filepath).name
-    return FileResponse(
+    return _serve_file(
         filepath,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=fname,
+        os.path.basename(filepath),
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         headers={
-            "Content-Disposition": f'attachment; filename="{fname}"',
             "Cache-Control": "no-store",
             "X-Content-Type-Options": "nosniff",
             "Access-Control-Expose-Headers": "Content-Disposition",
@@ -5843,8 +6935,6 @@ async def generate_letter_endpoint(lead_id: str, request: Request):
 @app.get("/api/case-packet/{lead_id}")
 async def get_case_packet(lead_id: str, request: Request):
     """Download HTML case packet. Requires VERIFIED attorney + GOLD/SILVER lead."""
-    from fastapi.responses import Response
-    from verifuse_v2.attorney.case_packet import generate_case_packet
 
     user = _require_user(request)
     if not _is_verified_attorney(user) and not _effective_admin(user, request):
@@ -5854,34 +6944,49 @@ async def get_case_packet(lead_id: str, request: Request):
         )
     _check_lead_unlocked(user, lead_id, doc_type="CASE_PACKET", request=request)
 
-    conn = _get_conn()
-    try:
-        _pkt_row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-    finally:
-        conn.close()
+    def _query():
+        with _reader() as conn:
+            return conn.execute(_FILING_GATE_SQL, [lead_id]).fetchone()
+
+    _pkt_row = await _run_in_db(_query)
     if not _pkt_row:
         raise HTTPException(status_code=404, detail="Lead not found.")
     _assert_ready_to_file(dict(_pkt_row))
 
-    try:
-        filepath = generate_case_packet(VERIFUSE_DB_PATH, lead_id)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        log.error("Case packet generation failed: %s", e)
-        raise HTTPException(status_code=500, detail="Case packet generation failed.")
+    async with _doc_slot():
+        try:
+            filepath = await asyncio.get_running_loop().run_in_executor(
+                DOC_EXECUTOR, generate_case_packet, VERIFUSE_DB_PATH, lead_id,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            log.error("Case packet generation failed: %s", e)
+            raise HTTPException(status_code=500, detail="Case packet generation failed.")
 
-    html_content = Path(filepath).read_text(encoding="utf-8")
-    fname = f"case_packet_{lead_id[:12]}.html"
-    return Response(
-        content=html_content,
-        media_type="text/html",
-        headers={
-            "Content-Disposition": f'attachment; filename="{fname}"',
-            "Cache-Control": "no-store",
-            "X-Content-Type-Options": "nosniff",
-            "Access-Control-Expose-Headers": "Content-Disposition",
-        },
+    headers = {
+        "Cache-Control": "no-store",
+        "X-Content-Type-Options": "nosniff",
+        "Access-Control-Expose-Headers": "Content-Disposition",
+    }
+    # The generator writes a gzip twin — send it as-is rather than have
+    # GZipMiddleware recompress the page on the event loop. Not on the
+    # X-Accel path: nginx drops Content-Encoding from the upstream response
+    # there and picks the .gz itself (gzip_static in the internal location).
+    if (
+        _accepts_gzip(request)
+        and os.path.exists(filepath + ".gz")
+        and not _xaccel_uri(filepath)
+    ):
+        filepath += ".gz"
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+
+    # Streamed from disk (or handed to nginx) — never read into memory here
+    return _serve_file(
+        filepath,
+        f"case_packet_{lead_id[:12]}.html",
+        "text/html",
+        headers=headers,
     )
 
 
@@ -5941,8 +7046,7 @@ async def get_presale_leads(
     _require_user(request)
 
     def _run():
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             base_where = (" WHERE (processing_status = 'PRE_SALE'"
                          " OR (scheduled_sale_date IS NOT NULL AND scheduled_sale_date > date('now'))"
                          " OR (sale_date IS NOT NULL AND sale_date > date('now')))")
@@ -6008,8 +7112,6 @@ async def get_presale_leads(
                     LIMIT ? OFFSET ?""",
                 params + [limit, offset],
             ).fetchall()
-        finally:
-            conn.close()
 
         def _enrich_lead(r: dict) -> dict:
             completeness = _compute_lead_completeness(r)
@@ -6047,29 +7149,32 @@ async def get_attorney_ready_leads(
     offset: int = Query(0, ge=0),
 ):
     """List leads where attorney_packet_ready=1."""
-    conn = _get_conn()
-    try:
-        total = conn.execute(
-            "SELECT COUNT(*) FROM leads WHERE attorney_packet_ready = 1"
-        ).fetchone()[0]
+    def _query():
+        with _reader() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM leads WHERE attorney_packet_ready = 1"
+            ).fetchone()[0]
 
-        rows = conn.execute("""
-            SELECT * FROM leads
-            WHERE attorney_packet_ready = 1
-            ORDER BY COALESCE(estimated_surplus, surplus_amount, overbid_amount, 0) DESC
-            LIMIT ? OFFSET ?
-        """, [limit, offset]).fetchall()
-    finally:
-        conn.close()
+            rows = _fetch_dicts(
+                conn,
+                f"{_SAFE_SELECT} WHERE attorney_packet_ready = 1 "
+                f"ORDER BY {_SURPLUS_EXPR} DESC "
+                "LIMIT ? OFFSET ?",
+                [limit, offset],
+            )
+        return total, rows
 
-    leads = [_row_to_safe(dict(r)) for r in rows]
-    return {
+    total, rows = await _run_in_db(_query)
+
+    today = datetime.now(timezone.utc).date()
+    leads = [_row_to_safe(r, today) for r in rows]
+    return _raw_json({
         "count": len(leads),
         "total": total,
         "limit": limit,
         "offset": offset,
         "leads": leads,
-    }
+    })
 
 
 # ── POST /api/leads/{id}/attorney-ready — Set attorney_packet_ready ──
@@ -6079,46 +7184,50 @@ async def set_attorney_ready(lead_id: str, request: Request):
     """Mark a lead as attorney_packet_ready=1. Requires provenance + completeness."""
     _require_api_key(request)
 
-    conn = _get_conn()
-    try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Lead not found.")
+    def _mark():
+        with _writer() as conn:
+            # Hot path: gate + update in one statement
+            if conn.execute(_ATTORNEY_READY_UPDATE_SQL, [lead_id]).rowcount:
+                conn.commit()
+                return
+            # Cold path: nothing updated — work out why for the 400
+            row = conn.execute(_LEAD_BY_ID_SQL, [lead_id]).fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Lead not found.")
 
-        lead = dict(row)
+            # Provenance check
+            provenance_count = conn.execute(
+                "SELECT COUNT(*) FROM lead_provenance WHERE lead_id = ?", [lead_id]
+            ).fetchone()[0]
 
-        # Provenance check
-        provenance_count = conn.execute(
-            "SELECT COUNT(*) FROM lead_provenance WHERE lead_id = ?", [lead_id]
-        ).fetchone()[0]
+            surplus = row["estimated_surplus"] or row["surplus_amount"] or 0
+            errors = []
+            if not row["county"]:
+                errors.append("missing county")
+            if not row["case_number"]:
+                errors.append("missing case_number")
+            if not row["owner_name"]:
+                errors.append("missing owner_name")
+            if not row["sale_date"]:
+                errors.append("missing sale_date")
+            if not (surplus and float(surplus) > 0):
+                errors.append("estimated_surplus must be > 0")
+            if provenance_count == 0:
+                errors.append("no rows in lead_provenance (SHA256 provenance required)")
+
+            if errors:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Lead not attorney-ready: {', '.join(errors)}",
+                )
 
-        surplus = lead.get("estimated_surplus") or lead.get("surplus_amount") or 0
-        errors = []
-        if not lead.get("county"):
-            errors.append("missing county")
-        if not lead.get("case_number"):
-            errors.append("missing case_number")
-        if not lead.get("owner_name"):
-            errors.append("missing owner_name")
-        if not lead.get("sale_date"):
-            errors.append("missing sale_date")
-        if not (surplus and float(surplus) > 0):
-            errors.append("estimated_surplus must be > 0")
-        if provenance_count == 0:
-            errors.append("no rows in lead_provenance (SHA256 provenance required)")
-
-        if errors:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Lead not attorney-ready: {', '.join(errors)}",
+            # Eligible after all (value shapes the SQL gate doesn't mirror)
+            conn.execute(
+                "UPDATE leads SET attorney_packet_ready = 1 WHERE id = ?", [lead_id]
             )
+            conn.commit()
 
-        conn.execute(
-            "UPDATE leads SET attorney_packet_ready = 1 WHERE id = ?", [lead_id]
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    await _run_in_db(_mark)
 
     return {"status": "ok", "lead_id": lead_id, "attorney_packet_ready": True}
 
@@ -6195,7 +7304,6 @@ async def list_asset_evidence(asset_id: str, request: Request):
 @limiter.limit("30/minute")
 async def download_evidence_doc(doc_id: str, request: Request):
     """Securely stream a vault evidence document to an authorized attorney (unlock-gated)."""
-    from fastapi.responses import FileResponse
 
     user = _get_user_from_request(request)
     if not user:
@@ -6264,7 +7372,7 @@ async def download_evidence_doc(doc_id: str, request: Request):
         raise HTTPException(status_code=404, detail="File not found on disk.")
 
     mime = row["content_type"] or "application/octet-stream"
-    return FileResponse(str(resolved), filename=row["filename"], media_type=mime)
+    return _serve_file(resolved, row["filename"] or resolved.name, mime)
 
 
 # ── POST /api/assets/{asset_id}/heir-letter — Heir Notification PDF ──────────
@@ -6371,21 +7479,18 @@ async def generate_heir_letter(asset_id: str, request: Request):
             try:
                 conn.execute("BEGIN IMMEDIATE")
 
-                debits = _fifo_spend(conn, user_id, COST)
+                debits, balance_before = _fifo_spend_with_balance(conn, user_id, COST)
                 if debits is None:
                     conn.execute("ROLLBACK")
                     return False, 0
 
-                balance_after = _ledger_balance(conn, user_id)
+                balance_after = balance_before - COST
 
                 # Billing audit — one journal row per ledger entry touched
-                for d in debits:
-                    conn.execute(
-                        "INSERT INTO unlock_spend_journal "
-                        "(id, unlock_id, ledger_entry_id, credits_consumed) "
-                        "VALUES (?, ?, ?, ?)",
-                        [str(_u.uuid4()), txn_ref, d["entry_id"], d["spent"]],
-                    )
+                conn.executemany(
+                    _SPEND_JOURNAL_INSERT_SQL,
+                    [(str(_u.uuid4()), txn_ref, d["entry_id"], d["spent"]) for d in debits],
+                )
 
                 # Transactions table — single row for the purchase event
                 conn.execute(
@@ -6504,8 +7609,7 @@ async def search_leads(request: Request, q: str = "", limit: int = Query(20, ge=
         return []
 
     def _search(q=q, limit=limit):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             term = f"%{q.strip()}%"
             rows = conn.execute("""
                 SELECT id as asset_id, case_number, property_address, county,
@@ -6519,8 +7623,6 @@ async def search_leads(request: Request, q: str = "", limit: int = Query(20, ge=
                 LIMIT ?
             """, [term, term, term, q.strip().lower(), limit]).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            conn.close()
 
     return await _run_in_db(_search)
 
@@ -6533,8 +7635,7 @@ async def get_lead_timeline(asset_id: str, request: Request):
     user = _require_user(request)
 
     def _timeline(asset_id=asset_id):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             events = []
             # pipeline_events
             if _table_exists_conn(conn, "pipeline_events"):
@@ -6567,8 +7668,6 @@ async def get_lead_timeline(asset_id: str, request: Request):
                     })
             events.sort(key=lambda x: x.get("ts") or "")
             return events
-        finally:
-            conn.close()
 
     return await _run_in_db(_timeline)
 
@@ -6579,8 +7678,7 @@ async def get_lead_timeline(asset_id: str, request: Request):
 async def get_coverage_map():
     """Return county array for CO coverage choropleth. No auth required."""
     def _map():
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             rows = conn.execute("""
                 SELECT
                     cp.county as county_slug,
@@ -6628,8 +7726,6 @@ async def get_coverage_map():
                     "access_method": r["access_method"] or r["platform_type"] or "unknown",
                 })
             return result
-        finally:
-            conn.close()
 
     return await _run_in_db(_map)
 
@@ -6653,6 +7749,7 @@ async def generate_api_key(user_id: str, request: Request):
                 [key_hash, now_str, user_id]
             )
             conn.commit()
+            _invalidate_user_cache(user_id)
         finally:
             conn.close()
 
@@ -6670,8 +7767,7 @@ async def get_api_key_status(user_id: str, request: Request):
     _require_admin_or_api_key(request)
 
     def _status(user_id=user_id):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             row = conn.execute(
                 "SELECT api_key_hash, api_key_created_at FROM users WHERE user_id = ?",
                 [user_id]
@@ -6679,8 +7775,6 @@ async def get_api_key_status(user_id: str, request: Request):
             if not row:
                 raise HTTPException(status_code=404, detail="User not found")
             return {"has_key": bool(row["api_key_hash"]), "created_at": row["api_key_created_at"]}
-        finally:
-            conn.close()
 
     return await _run_in_db(_status)
 
@@ -6698,6 +7792,7 @@ async def revoke_api_key(user_id: str, request: Request):
                 [user_id]
             )
             conn.commit()
+            _invalidate_user_cache(user_id)
         finally:
             conn.close()
 
@@ -6714,8 +7809,7 @@ async def list_my_cases(request: Request):
     user_id = user["user_id"]
 
     def _list(user_id=user_id):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             rows = conn.execute("""
                 SELECT ac.id, ac.asset_id, ac.stage, ac.outcome_type, ac.notes,
                        ac.created_at, ac.updated_at,
@@ -6727,8 +7821,6 @@ async def list_my_cases(request: Request):
                 ORDER BY ac.updated_at DESC
             """, [user_id]).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            conn.close()
 
     return await _run_in_db(_list)
 
@@ -6852,7 +7944,7 @@ async def record_case_outcome(case_id: str, request: Request):
     user = _require_user(request)
     user_id = user["user_id"]
     try:
-        body = await request.json()
+        body = await _request_json(request)
     except Exception:
         body = {}
 
@@ -6882,8 +7974,7 @@ async def get_title_stack(asset_id: str, request: Request):
     user = _require_user(request)
 
     def _stack(asset_id=asset_id):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             rows = conn.execute("""
                 SELECT id, lien_type, lienholder_name, priority, amount_cents, is_open, source
                 FROM lien_records WHERE asset_id = ?
@@ -6899,8 +7990,6 @@ async def get_title_stack(asset_id: str, request: Request):
             else:
                 risk = "HIGH"
             return {"liens": liens, "risk_score": risk, "total_open_cents": total_open}
-        finally:
-            conn.close()
 
     return await _run_in_db(_stack)
 
@@ -6914,15 +8003,12 @@ async def list_territories(request: Request):
     user_id = user["user_id"]
 
     def _list(user_id=user_id):
-        conn = _thread_conn()
-        try:
+        with _reader() as conn:
             rows = conn.execute(
                 "SELECT * FROM attorney_territories WHERE user_id = ? ORDER BY locked_at DESC",
                 [user_id]
             ).fetchall()
             return [dict(r) for r in rows]
-        finally:
-            conn.close()
 
     return await _run_in_db(_list)
 
@@ -7043,14 +8129,9 @@ async def generate_court_filing(asset_id: str, request: Request):
         _cf_conn = _get_conn()
         try:
             _cf_conn.execute("BEGIN IMMEDIATE")
-            _cf_debits = _fifo_spend(_cf_conn, user_id, _cost)
+            _cf_debits, _bal = _fifo_spend_with_balance(_cf_conn, user_id, _cost)
             if not _cf_debits:
                 _cf_conn.execute("ROLLBACK")
-                _bal_conn = _get_conn()
-                try:
-                    _bal = _ledger_balance(_bal_conn, user_id)
-                finally:
-                    _bal_conn.close()
                 raise HTTPException(
                     status_code=402,
                     detail=f"Court Filing Packet requires {_cost} credits. You have {_bal} credit{'s' if _bal != 1 else ''}. Purchase a credit pack on the Pricing page.",
@@ -7837,40 +8918,42 @@ async def get_tax_deed_surplus(
 @app.get("/api/intelligence/county-outcomes")
 async def county_outcomes(county: str = Query(None), request: Request = None):
     """County-level filing outcome intelligence from case_outcomes table."""
-    conn = _get_conn()
-    try:
-        # Check if case_outcomes table exists
-        has_table = conn.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='case_outcomes'"
-        ).fetchone()
-        if not has_table:
-            return {"county": county, "total_filed": 0, "win_rate": 0.0, "avg_recovery_days": None,
-                    "avg_amount_recovered": None, "message": "Outcome data collection not yet started"}
-        where = "WHERE county = ?" if county else ""
-        params = [county] if county else []
-        row = conn.execute(
-            f"SELECT COUNT(*) as total, "
-            f"SUM(CASE WHEN result='won' OR result='settled' THEN 1 ELSE 0 END) as wins, "
-            f"AVG(time_to_recovery_days) as avg_days, "
-            f"AVG(amount_recovered_cents) as avg_amount "
-            f"FROM case_outcomes {where}",
-            params
-        ).fetchone()
-        if not row or not row["total"]:
-            return {"county": county, "total_filed": 0, "win_rate": 0.0, "avg_recovery_days": None,
-                    "avg_amount_recovered": None}
-        total = row["total"] or 0
-        wins = row["wins"] or 0
-        return {
-            "county": county,
-            "total_filed": total,
-            "win_rate": round(wins / total, 2) if total > 0 else 0.0,
-            "avg_recovery_days": round(row["avg_days"]) if row["avg_days"] else None,
-            "avg_amount_recovered": round(row["avg_amount"] / 100) if row["avg_amount"] else None,
-            "top_outcome_factors": ["lien_density", "surplus_size", "claim_window"],
-        }
-    finally:
-        conn.close()
+    def _query():
+        with _reader() as conn:
+            # Check if case_outcomes table exists
+            has_table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='case_outcomes'"
+            ).fetchone()
+            if not has_table:
+                return False, None
+            where = "WHERE county = ?" if county else ""
+            params = [county] if county else []
+            return True, conn.execute(
+                f"SELECT COUNT(*) as total, "
+                f"SUM(CASE WHEN result='won' OR result='settled' THEN 1 ELSE 0 END) as wins, "
+                f"AVG(time_to_recovery_days) as avg_days, "
+                f"AVG(amount_recovered_cents) as avg_amount "
+                f"FROM case_outcomes {where}",
+                params
+            ).fetchone()
+
+    has_table, row = await _run_in_db(_query)
+    if not has_table:
+        return {"county": county, "total_filed": 0, "win_rate": 0.0, "avg_recovery_days": None,
+                "avg_amount_recovered": None, "message": "Outcome data collection not yet started"}
+    if not row or not row["total"]:
+        return {"county": county, "total_filed": 0, "win_rate": 0.0, "avg_recovery_days": None,
+                "avg_amount_recovered": None}
+    total = row["total"] or 0
+    wins = row["wins"] or 0
+    return {
+        "county": county,
+        "total_filed": total,
+        "win_rate": round(wins / total, 2) if total > 0 else 0.0,
+        "avg_recovery_days": round(row["avg_days"]) if row["avg_days"] else None,
+        "avg_amount_recovered": round(row["avg_amount"] / 100) if row["avg_amount"] else None,
+        "top_outcome_factors": ["lien_density", "surplus_size", "claim_window"],
+    }
 
 
 # ── C3: Owner Contact Intelligence ──────────────────────────────────
@@ -7932,7 +9015,7 @@ async def get_owner_contact(lead_id: str, request: Request):
     # Fetch contact data
     conn = _get_conn()
     try:
-        row = conn.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone()
+        row = conn.execute(_LEAD_BY_ID_SQL, [lead_id]).fetchone()
         if not row:
             raise HTTPException(404, detail="Lead not found.")
         row = dict(row)
@@ -7989,17 +9072,19 @@ async def get_owner_contact(lead_id: str, request: Request):
 async def evidence_preview(lead_id: str, request: Request):
     """Return document metadata (no file content) — no unlock required, just registered user."""
     user = _require_user(request)
-    conn = _get_conn()
-    try:
-        docs = conn.execute(
-            """SELECT id, doc_family, filename, recording_number, doc_type,
-                      bytes AS file_size_bytes, retrieved_ts AS created_at
-               FROM evidence_documents WHERE asset_id=? ORDER BY retrieved_ts DESC""",
-            [lead_id],
-        ).fetchall()
-        return {"docs": [dict(d) for d in docs], "count": len(docs)}
-    finally:
-        conn.close()
+
+    def _query():
+        with _reader() as conn:
+            return _fetch_dicts(
+                conn,
+                """SELECT id, doc_family, filename, recording_number, doc_type,
+                          bytes AS file_size_bytes, retrieved_ts AS created_at
+                   FROM evidence_documents WHERE asset_id=? ORDER BY retrieved_ts DESC""",
+                [lead_id],
+            )
+
+    docs = await _run_in_db(_query)
+    return {"docs": docs, "count": len(docs)}
 
 
 # ── C4: Market Velocity Intelligence ────────────────────────────────
@@ -8007,37 +9092,38 @@ async def evidence_preview(lead_id: str, request: Request):
 @app.get("/api/intelligence/market-velocity")
 async def market_velocity(request: Request):
     """Real-time pipeline velocity metrics."""
-    conn = _get_conn()
-    try:
-        # Average days GOLD leads sit before first unlock
-        velocity_rows = conn.execute(
-            "SELECT l.county, "
-            "COUNT(DISTINCT l.id) as gold_count, "
-            "AVG(JULIANDAY('now') - JULIANDAY(l.updated_at)) as avg_days_gold "
-            "FROM leads l "
-            "WHERE l.data_grade = 'GOLD' "
-            "GROUP BY l.county "
-            "ORDER BY gold_count DESC "
-            "LIMIT 20"
-        ).fetchall()
-        county_metrics = []
-        for r in velocity_rows:
-            county_metrics.append({
-                "county": r["county"],
-                "gold_count": r["gold_count"],
-                "avg_days_as_gold": round(r["avg_days_gold"] or 0, 1),
-            })
-        # Most urgent county (highest urgency = most gold leads + shortest claim window)
-        urgency_row = conn.execute(
-            "SELECT county, COUNT(*) as cnt FROM leads "
-            "WHERE data_grade = 'GOLD' AND claim_deadline IS NOT NULL "
-            "AND claim_deadline > date('now') AND claim_deadline < date('now', '+90 days') "
-            "GROUP BY county ORDER BY cnt DESC LIMIT 1"
-        ).fetchone()
-        return {
-            "county_velocity": county_metrics,
-            "most_urgent_county": urgency_row["county"] if urgency_row else None,
-            "most_urgent_count": urgency_row["cnt"] if urgency_row else 0,
-        }
-    finally:
-        conn.close()
+    def _query():
+        with _reader() as conn:
+            # Average days GOLD leads sit before first unlock
+            velocity_rows = conn.execute(
+                "SELECT l.county, "
+                "COUNT(DISTINCT l.id) as gold_count, "
+                "AVG(JULIANDAY('now') - JULIANDAY(l.updated_at)) as avg_days_gold "
+                "FROM leads l "
+                "WHERE l.data_grade = 'GOLD' "
+                "GROUP BY l.county "
+                "ORDER BY gold_count DESC "
+                "LIMIT 20"
+            ).fetchall()
+            # Most urgent county (highest urgency = most gold leads + shortest claim window)
+            urgency_row = conn.execute(
+                "SELECT county, COUNT(*) as cnt FROM leads "
+                "WHERE data_grade = 'GOLD' AND claim_deadline IS NOT NULL "
+                "AND claim_deadline > date('now') AND claim_deadline < date('now', '+90 days') "
+                "GROUP BY county ORDER BY cnt DESC LIMIT 1"
+            ).fetchone()
+        return velocity_rows, urgency_row
+
+    velocity_rows, urgency_row = await _run_in_db(_query)
+    county_metrics = []
+    for r in velocity_rows:
+        county_metrics.append({
+            "county": r["county"],
+            "gold_count": r["gold_count"],
+            "avg_days_as_gold": round(r["avg_days_gold"] or 0, 1),
+        })
+    return {
+        "county_velocity": county_metrics,
+        "most_urgent_county": urgency_row["county"] if urgency_row else None,
+        "most_urgent_count": urgency_row["cnt"] if urgency_row else 0,
+    }
@@ -0,0 +1,160 @@
+"""
+VeriFuse — shared pytest fixtures for the in-process API tests.
+
+The API module reads VERIFUSE_DB_PATH once at import, so one throwaway
+database (schema.sql + the SQL migrations + the slice of the scraper-owned
+tables the routes touch) backs the whole session. Tests create their own
+rows with unique ids instead of resetting it.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from verifuse_v2.migrations.run_migrations import MIGRATIONS_DIR, _pre_migration_hooks, apply_sql_file  # noqa: E402
+
+API_KEY = "test-api-key"
+PARTNER_PRICE = "price_test_partner"
+
+_MIGRATIONS = (
+    "db/schema.sql",
+    "migrations/002_omega_hardening.sql",
+    "migrations/003_vnext_foundation.sql",
+    "migrations/021_user_auth_stamp.sql",
+)
+# Migrations over the scraper-owned tables: applied after _TEST_DDL, each
+# through the runner's pre-hooks (column additions live there)
+_LEADS_MIGRATIONS = ("022_lead_expiry_flag.sql",)
+# The slice of the scraper-owned tables the routes under test touch
+_TEST_DDL = """
+CREATE TABLE leads (
+    id TEXT PRIMARY KEY,
+    case_number TEXT,
+    county TEXT,
+    owner_name TEXT,
+    property_address TEXT,
+    sale_date TEXT,
+    claim_deadline TEXT,
+    estimated_surplus REAL,
+    surplus_amount REAL,
+    overbid_amount REAL,
+    data_grade TEXT,
+    verification_state TEXT,
+    attorney_packet_ready INTEGER DEFAULT 0
+);
+CREATE TABLE lead_provenance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lead_id TEXT NOT NULL,
+    source_pdf_sha256 TEXT,
+    retrieved_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE TABLE download_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    lead_id TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    granted INTEGER NOT NULL DEFAULT 1,
+    timestamp TEXT NOT NULL DEFAULT (datetime('now')),
+    ip_address TEXT
+);
+ALTER TABLE users ADD COLUMN subscription_status TEXT;
+ALTER TABLE users ADD COLUMN billing_period TEXT;
+"""
+
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("verifuse") / "verifuse_v2.db"
+    conn = sqlite3.connect(path)
+    for script in _MIGRATIONS:
+        conn.executescript((PROJECT_ROOT / "verifuse_v2" / script).read_text())
+    conn.executescript(_TEST_DDL)
+    for name in _LEADS_MIGRATIONS:
+        _pre_migration_hooks(name, conn)
+        apply_sql_file(conn, MIGRATIONS_DIR / name)
+    conn.close()
+    return path
+
+
+@pytest.fixture(scope="session")
+def api(db_path):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("VERIFUSE_DB_PATH", str(db_path))
+        mp.setenv("VERIFUSE_JWT_SECRET", "test-jwt-secret")
+        mp.setenv("VERIFUSE_API_KEY", API_KEY)
+        mp.setenv("STRIPE_MODE", "test")
+        mp.setenv("STRIPE_TEST_PRICE_PARTNER", PARTNER_PRICE)
+        mp.delenv("STRIPE_WEBHOOK_SECRET", raising=False)
+        mp.delenv("VERIFUSE_XACCEL_MAP", raising=False)
+        yield importlib.import_module("verifuse_v2.server.api")
+
+
+@pytest.fixture(scope="session")
+def client(api):
+    from fastapi.testclient import TestClient
+
+    with TestClient(api.app) as c:
+        yield c
+
+
+@pytest.fixture
+def db(db_path, client):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+def _insert(db, table: str, row: dict) -> None:
+    db.execute(
+        f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+        list(row.values()),
+    )
+    db.commit()
+
+
+@pytest.fixture
+def add_user(db):
+    """Insert a users row; returns its user_id."""
+    def _add(**cols) -> str:
+        row = {
+            "user_id": str(uuid.uuid4()),
+            "password_hash": "x",
+            "tier": "recon",
+            "created_at": "2025-01-01T00:00:00Z",
+            **cols,
+        }
+        row.setdefault("email", f"{row['user_id']}@example.com")
+        _insert(db, "users", row)
+        return row["user_id"]
+    return _add
+
+
+@pytest.fixture
+def add_lead(db):
+    """Insert a complete GOLD lead (override any column); returns its id."""
+    def _add(**cols) -> str:
+        row = {
+            "id": str(uuid.uuid4()),
+            "case_number": "2025CV000001",
+            "county": "Denver",
+            "owner_name": "Jane R. Martinez",
+            "property_address": "4720 E Colfax Ave, Denver, CO 80220",
+            "sale_date": "2025-06-15",
+            "estimated_surplus": 47250.0,
+            "data_grade": "GOLD",
+            **cols,
+        }
+        _insert(db, "leads", row)
+        return row["id"]
+    return _add
@@ -0,0 +1,69 @@
+"""
+VeriFuse — Attorney-ready gate tests
+====================================
+POST /api/leads/{id}/attorney-ready marks a lead with one gated UPDATE;
+only when that matches nothing does the diagnostic path re-read the lead
+to explain the 400:
+
+  complete lead + provenance   → 200, attorney_packet_ready = 1
+  incomplete, no provenance    → 400 listing every missing piece
+  complete, no provenance      → 400 (provenance alone), flag untouched
+  unknown id                   → 404
+
+Run: python -m pytest -q verifuse_v2/tests/test_attorney_ready.py
+"""
+
+from __future__ import annotations
+
+from conftest import API_KEY
+
+
+def _mark_ready(client, lead_id: str):
+    return client.post(f"/api/leads/{lead_id}/attorney-ready", headers={"x-verifuse-api-key": API_KEY})
+
+
+def _ready_flag(db, lead_id: str) -> int:
+    return db.execute("SELECT attorney_packet_ready FROM leads WHERE id = ?", [lead_id]).fetchone()[0]
+
+
+def test_sql_gate_marks_complete_lead(client, db, add_lead):
+    lead_id = add_lead()
+    db.execute("INSERT INTO lead_provenance (lead_id, source_pdf_sha256) VALUES (?, 'ab')", [lead_id])
+    db.commit()
+
+    r = _mark_ready(client, lead_id)
+    assert r.status_code == 200
+    assert r.json()["attorney_packet_ready"] is True
+    assert _ready_flag(db, lead_id) == 1
+
+
+def test_diagnostic_path_explains_rejection(client, db, add_lead):
+    lead_id = add_lead(owner_name="", estimated_surplus=0, surplus_amount=None)
+
+    r = _mark_ready(client, lead_id)
+    assert r.status_code == 400
+    detail = r.json()["error"]["message"]
+    assert "missing owner_name" in detail
+    assert "estimated_surplus must be > 0" in detail
+    assert "no rows in lead_provenance" in detail
+    assert _ready_flag(db, lead_id) == 0
+
+
+def test_requires_provenance(client, db, add_lead):
+    lead_id = add_lead()
+
+    r = _mark_ready(client, lead_id)
+    assert r.status_code == 400
+    assert r.json()["error"]["message"] == (
+        "Lead not attorney-ready: no rows in lead_provenance (SHA256 provenance required)"
+    )
+    assert _ready_flag(db, lead_id) == 0
+
+
+def test_unknown_lead_is_404(client):
+    assert _mark_ready(client, "no-such-lead").status_code == 404
+
+
+def test_requires_api_key(client, add_lead):
+    lead_id = add_lead()
+    assert client.post(f"/api/leads/{lead_id}/attorney-ready").status_code == 403
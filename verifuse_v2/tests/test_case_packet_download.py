@@ -0,0 +1,107 @@
+"""
+VeriFuse — Case packet download tests
+=====================================
+GET /api/case-packet/{lead_id} serves the generator's precompressed .gz
+twin as-is when the client accepts gzip (q-values honoured), and never
+lets GZipMiddleware compress it a second time. Under a VERIFUSE_XACCEL_MAP
+root it hands nginx the plain file instead (gzip_static picks the twin).
+
+Run: python -m pytest -q verifuse_v2/tests/test_case_packet_download.py
+"""
+
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+
+def _request(headers: dict):
+    from starlette.requests import Request
+
+    return Request({
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip", True),
+    ("x-gzip", True),
+    ("GZIP;Q=0.5", True),
+    ("deflate, gzip;q=0.1", True),
+    ("*;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0, identity", False),
+    ("*, gzip;q=0", False),
+    ("gzip;q=nope", False),
+    ("identity", False),
+    ("", False),
+])
+def test_accepts_gzip_honours_q_values(api, accept, expected):
+    assert api._accepts_gzip(_request({"Accept-Encoding": accept})) is expected
+
+
+@pytest.fixture
+def case_packet(api, add_user, add_lead, tmp_path, monkeypatch):
+    """Admin-readable lead whose packet generator writes an HTML file and its .gz twin."""
+    from verifuse_v2.server.auth import create_token
+
+    user_id = add_user(is_admin=1)
+    lead_id = add_lead(surplus_amount=47250.0, overbid_amount=47250.0)
+    html = "<html><body>" + "<p>Case packet</p>" * 200 + "</body></html>"
+
+    def _generate(db_path, lid):
+        path = tmp_path / f"case_packet_{lid}.html"
+        path.write_text(html)
+        with gzip.open(f"{path}.gz", "wt") as f:
+            f.write(html)
+        return str(path)
+
+    monkeypatch.setattr(api, "generate_case_packet", _generate)
+    monkeypatch.setattr(api, "DOC_EXECUTOR", None)  # default thread pool
+    token = create_token(user_id, f"{user_id}@example.com", "recon", role="admin", is_admin=True)
+    return {
+        "url": f"/api/case-packet/{lead_id}",
+        "auth": {"Authorization": f"Bearer {token}"},
+        "html": html,
+        "dir": tmp_path,
+    }
+
+
+def test_serves_gzip_twin_once(client, case_packet):
+    r = client.get(case_packet["url"], headers={**case_packet["auth"], "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    # Decodes once to the page: GZipMiddleware did not compress it again
+    assert r.text == case_packet["html"]
+
+
+def test_identity_when_gzip_refused(client, case_packet):
+    r = client.get(case_packet["url"], headers={**case_packet["auth"], "Accept-Encoding": "gzip;q=0, identity"})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert r.text == case_packet["html"]
+
+
+def test_xaccel_hands_nginx_the_plain_file(api, client, case_packet, monkeypatch):
+    monkeypatch.setattr(api, "_XACCEL_MAP", api._parse_xaccel_map(f"{case_packet['dir']}=/_protected/packets/"))
+
+    r = client.get(case_packet["url"], headers={**case_packet["auth"], "Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["x-accel-redirect"].startswith("/_protected/packets/case_packet_")
+    assert r.headers["x-accel-redirect"].endswith(".html")
+    assert "content-encoding" not in r.headers
+    assert r.content == b""
+
+
+def test_unmapped_file_streams_without_xaccel(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "_XACCEL_MAP", api._parse_xaccel_map("/nonexistent/root=/_protected/data/"))
+    path = tmp_path / "dossier.docx"
+    path.write_bytes(b"docx")
+
+    assert api._xaccel_uri(path) is None
+    r = api._serve_file(path, "dossier.docx", "application/octet-stream")
+    assert "x-accel-redirect" not in r.headers
+    assert r.headers["content-disposition"] == 'attachment; filename="dossier.docx"'
@@ -0,0 +1,65 @@
+"""
+VeriFuse — Lead expiry flag tests
+=================================
+Migration 022 keeps leads.is_expired in step with claim_deadline so the
+list filters are a column predicate; the API's hourly sweep flags deadlines
+the calendar rolled past:
+
+  insert / deadline update   → trigger sets the flag (blank deadline = 0)
+  direct flag write          → corrected back to what the deadline says
+  calendar passes a deadline → sweep flags it
+  /api/leads                 → past-deadline leads hidden by default
+
+Run: python -m pytest -q verifuse_v2/tests/test_lead_expiry.py
+"""
+
+from __future__ import annotations
+
+import uuid
+
+
+def _is_expired(db, lead_id: str) -> int:
+    return db.execute("SELECT is_expired FROM leads WHERE id = ?", [lead_id]).fetchone()[0]
+
+
+def test_triggers_track_claim_deadline(api, db, add_lead):
+    past = add_lead(claim_deadline="2001-01-01")
+    future = add_lead(claim_deadline="2999-01-01")
+    blank = add_lead(claim_deadline="  ")
+    assert (_is_expired(db, past), _is_expired(db, future), _is_expired(db, blank)) == (1, 0, 0)
+
+    db.execute("UPDATE leads SET claim_deadline = '2002-02-02' WHERE id = ?", [future])
+    assert _is_expired(db, future) == 1
+    db.execute("UPDATE leads SET claim_deadline = ' 2999-05-05 ' WHERE id = ?", [future])
+    assert _is_expired(db, future) == 0
+    # A direct write is corrected back to what the deadline says
+    db.execute("UPDATE leads SET is_expired = 0 WHERE id = ?", [past])
+    assert _is_expired(db, past) == 1
+    db.commit()
+    assert "is_expired = 0" in api._EXPIRED_FILTER
+
+
+def test_sweep_flags_deadlines_the_calendar_passed(api, db, add_lead):
+    lead_id = add_lead(claim_deadline="2999-01-01")
+    # Simulate the date rolling past the deadline without a trigger firing;
+    # DDL is transactional, so the rollback restores the trigger
+    db.execute("BEGIN")
+    db.execute("DROP TRIGGER trg_leads_is_expired_upd")
+    db.execute("UPDATE leads SET claim_deadline = '2001-01-01' WHERE id = ?", [lead_id])
+    assert _is_expired(db, lead_id) == 0
+    assert api._sweep_expired_leads(db) >= 1
+    assert _is_expired(db, lead_id) == 1
+    db.rollback()
+    assert db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_leads_is_expired_upd'"
+    ).fetchone()
+
+
+def test_lead_list_hides_past_deadlines(client, add_lead):
+    county = f"Test-{uuid.uuid4().hex[:8]}"
+    live = add_lead(county=county, claim_deadline="2999-01-01")
+    add_lead(county=county, claim_deadline="2001-01-01")
+
+    r = client.get("/api/leads", params={"county": county})
+    assert r.status_code == 200
+    assert [lead["asset_id"] for lead in r.json()["leads"]] == [live]
@@ -0,0 +1,60 @@
+"""
+VeriFuse — Attorney-tool unlock gate tests
+==========================================
+_check_lead_unlocked runs inline in the async docx / letter / case-packet
+handlers, so its lead_unlocks probe borrows a request connection without
+waiting (never a _reader() slot that could park the event loop):
+
+  unlocked lead   → passes, granted=1 audited
+  locked lead     → 403, granted=0 audited
+
+Both run with _reader() stubbed to fail, so any slot wait shows up.
+
+Run: python -m pytest -q verifuse_v2/tests/test_lead_unlock_gate.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def no_reader_slots(api, monkeypatch):
+    @contextlib.contextmanager
+    def _exhausted():
+        raise AssertionError("unlock probe waited on a _reader() slot")
+        yield
+
+    monkeypatch.setattr(api, "_reader", _exhausted)
+
+
+def _audit(api, db, user_id: str, lead_id: str):
+    api._flush_write_behind()
+    return db.execute(
+        "SELECT doc_type, granted FROM download_audit WHERE user_id = ? AND lead_id = ?",
+        [user_id, lead_id],
+    ).fetchall()
+
+
+def test_unlocked_lead_passes(api, db, add_user, add_lead, no_reader_slots):
+    user_id, lead_id = add_user(), add_lead()
+    db.execute(
+        "INSERT INTO lead_unlocks (user_id, lead_id, unlocked_at) VALUES (?, ?, '2025-01-01T00:00:00Z')",
+        [user_id, lead_id],
+    )
+    db.commit()
+
+    api._check_lead_unlocked({"user_id": user_id}, lead_id, doc_type="DOSSIER_DOCX")
+    assert [tuple(r) for r in _audit(api, db, user_id, lead_id)] == [("DOSSIER_DOCX", 1)]
+
+
+def test_locked_lead_is_403(api, db, add_user, add_lead, no_reader_slots):
+    user_id, lead_id = add_user(), add_lead()
+
+    with pytest.raises(HTTPException) as exc:
+        api._check_lead_unlocked({"user_id": user_id}, lead_id, doc_type="CASE_PACKET")
+    assert exc.value.status_code == 403
+    assert [tuple(r) for r in _audit(api, db, user_id, lead_id)] == [("CASE_PACKET", 0)]
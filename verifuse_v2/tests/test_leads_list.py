@@ -0,0 +1,62 @@
+"""
+VeriFuse — Lead list unlock flag tests
+======================================
+GET /api/leads folds the caller's unlock flag into the list SELECT. Only a
+signed-in caller (with lead_unlocks present) pays for the per-row EXISTS;
+anonymous callers get a constant 0:
+
+  anonymous          → unlocked_by_me false, case number masked
+  unlocked by caller → unlocked_by_me true, case number shown
+  unlocked by other  → unlocked_by_me false, case number masked
+
+Run: python -m pytest -q verifuse_v2/tests/test_leads_list.py
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def county_lead(db, add_user, add_lead):
+    """One lead in its own county, unlocked by `owner` only."""
+    county = f"Test-{uuid.uuid4().hex[:8]}"
+    lead_id = add_lead(county=county)
+    owner = add_user()
+    db.execute(
+        "INSERT INTO lead_unlocks (user_id, lead_id, unlocked_at) VALUES (?, ?, '2025-01-01T00:00:00Z')",
+        [owner, lead_id],
+    )
+    db.commit()
+    return {"county": county, "lead_id": lead_id, "owner": owner}
+
+
+def _list(client, county: str, user_id: str = None) -> list:
+    headers = {}
+    if user_id:
+        from verifuse_v2.server.auth import create_token
+
+        headers["Authorization"] = f"Bearer {create_token(user_id, f'{user_id}@example.com', 'recon')}"
+    r = client.get("/api/leads", params={"county": county}, headers=headers)
+    assert r.status_code == 200
+    return r.json()["leads"]
+
+
+def test_anonymous_list_is_locked(client, county_lead):
+    [lead] = _list(client, county_lead["county"])
+    assert lead["unlocked_by_me"] is False
+    assert lead["case_number"] is None
+
+
+def test_owner_sees_unlock(client, county_lead):
+    [lead] = _list(client, county_lead["county"], county_lead["owner"])
+    assert lead["unlocked_by_me"] is True
+    assert lead["case_number"] == "2025CV000001"
+
+
+def test_other_user_stays_locked(client, add_user, county_lead):
+    [lead] = _list(client, county_lead["county"], add_user())
+    assert lead["unlocked_by_me"] is False
+    assert lead["case_number"] is None
@@ -0,0 +1,49 @@
+"""
+VeriFuse — Preview surplus band parity tests
+============================================
+/api/preview bands surplus in SQL (_PREVIEW_SELECT) while surplus_band()
+is the Python twin; both are built from _SURPLUS_BANDS and must agree on
+every boundary and on COALESCE's first-non-NULL pick (a stored 0 wins).
+
+Run: python -m pytest -q verifuse_v2/tests/test_preview_bands.py
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+
+@pytest.mark.parametrize("estimated, surplus, overbid", [
+    (None, None, None),
+    (0.0, 60_000.0, None),
+    (None, 60_000.0, 900_000.0),
+    (None, None, 200_000.0),
+    (49_999.99, None, None),
+    (49_999.994, None, None),
+    (50_000.0, None, None),
+    (149_999.99, None, None),
+    (150_000.0, None, None),
+    (499_999.99, None, None),
+    (500_000.0, None, None),
+    (12_345_678.9, None, None),
+])
+def test_sql_band_matches_surplus_band(api, estimated, surplus, overbid):
+    conn = sqlite3.connect(":memory:")
+    try:
+        [sql_band] = conn.execute(
+            f"SELECT {api._SURPLUS_BAND_SQL} FROM "
+            "(SELECT ? AS estimated_surplus, ? AS surplus_amount, ? AS overbid_amount) AS leads",
+            [estimated, surplus, overbid],
+        ).fetchone()
+    finally:
+        conn.close()
+    dollars = next((v for v in (estimated, surplus, overbid) if v is not None), 0.0)
+    assert sql_band == api.surplus_band(int(round(dollars * 100)))
+
+
+def test_preview_select_uses_shared_bands(api, client):
+    for _, label in api._SURPLUS_BANDS:
+        assert f"'{label}'" in api._PREVIEW_SELECT
+    assert f"ELSE '{api._SURPLUS_BAND_TOP}'" in api._PREVIEW_SELECT
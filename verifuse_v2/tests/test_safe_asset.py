@@ -0,0 +1,29 @@
+"""
+VeriFuse — SafeAsset projection contract tests
+==============================================
+_row_to_safe() builds its dict literal instead of dumping a SafeAsset per
+row, so the dict must stay exactly the model's shape: the same keys, and
+values the model round-trips unchanged (no coercion left to pydantic).
+
+Run: python -m pytest -q verifuse_v2/tests/test_safe_asset.py
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture(params=["full", "sparse"])
+def lead_row(request, db, add_lead) -> dict:
+    if request.param == "sparse":
+        return {"id": "sparse-lead"}
+    lead_id = add_lead(claim_deadline="2999-01-01", surplus_amount=47250.0, verification_state="RAW")
+    return dict(db.execute("SELECT * FROM leads WHERE id = ?", [lead_id]).fetchone())
+
+
+def test_row_to_safe_matches_safe_asset(api, lead_row):
+    d = api._row_to_safe(lead_row, date(2026, 1, 15))
+    assert set(d) == set(api.SafeAsset.model_fields)
+    assert api.SafeAsset(**d).model_dump() == d
@@ -0,0 +1,80 @@
+"""
+VeriFuse — Stripe-Signature verification tests
+==============================================
+_verify_stripe_signature checks t=<ts>,v1=<hex HMAC-SHA256 of "ts.body">
+locally (same scheme and tolerance as the Stripe SDK):
+
+  valid signature            → accepted
+  tampered body              → rejected
+  t= outside the tolerance   → rejected (replay window)
+  several v1= (secret roll)  → accepted if any one matches
+  malformed header           → rejected, never raises
+
+Run: python -m pytest -q verifuse_v2/tests/test_stripe_signature.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import time
+
+import pytest
+
+_SECRET = b"whsec_test_secret"
+_BODY = b'{"id": "evt_sig", "type": "invoice.payment_succeeded"}'
+
+
+@pytest.fixture
+def verify(api, monkeypatch):
+    monkeypatch.setattr(api, "_STRIPE_WEBHOOK_KEY", _SECRET)
+    return api._verify_stripe_signature
+
+
+def _sign(body: bytes, ts: int, secret: bytes = _SECRET) -> str:
+    return hmac.new(secret, f"{ts}.".encode() + body, hashlib.sha256).hexdigest()
+
+
+def test_valid_signature(verify):
+    ts = int(time.time())
+    assert verify(_BODY, f"t={ts},v1={_sign(_BODY, ts)}")
+
+
+def test_tampered_body(verify):
+    ts = int(time.time())
+    assert not verify(_BODY.replace(b"evt_sig", b"evt_forged"), f"t={ts},v1={_sign(_BODY, ts)}")
+
+
+def test_stale_timestamp(api, verify):
+    ts = int(time.time()) - api._STRIPE_SIG_TOLERANCE - 60
+    assert not verify(_BODY, f"t={ts},v1={_sign(_BODY, ts)}")
+    future = int(time.time()) + api._STRIPE_SIG_TOLERANCE + 60
+    assert not verify(_BODY, f"t={future},v1={_sign(_BODY, future)}")
+
+
+def test_any_of_several_v1_values(verify):
+    ts = int(time.time())
+    old_sig = _sign(_BODY, ts, b"whsec_rolled_out")
+    assert verify(_BODY, f"t={ts},v1={old_sig},v1={_sign(_BODY, ts)},v0=deadbeef")
+    assert not verify(_BODY, f"t={ts},v1={old_sig},v1=00")
+
+
+@pytest.mark.parametrize("header", [
+    "",
+    "garbage",
+    "t=,v1=abc",
+    "v1={sig}",
+    "t={ts}",
+    "t=notanumber,v1={sig}",
+    "t={ts},v0={sig}",
+    "t={ts},v1={sig}x",
+])
+def test_malformed_headers(verify, header):
+    ts = int(time.time())
+    assert not verify(_BODY, header.format(ts=ts, sig=_sign(_BODY, ts)))
+
+
+def test_webhook_rejects_bad_signature(api, client, verify, monkeypatch):
+    monkeypatch.setattr(api, "STRIPE_WEBHOOK_SECRET", _SECRET.decode())
+    r = client.post("/api/webhook", content=_BODY, headers={"stripe-signature": f"t={int(time.time())},v1=00"})
+    assert r.status_code == 400
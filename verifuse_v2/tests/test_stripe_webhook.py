@@ -0,0 +1,121 @@
+"""
+VeriFuse — Stripe webhook transaction tests
+===========================================
+POST /api/webhook claims the event and runs its handler in one
+BEGIN IMMEDIATE transaction on the pooled writer:
+
+  duplicate delivery            → already_processed, handler not re-run
+  handler raises after writing  → 500, claim + writes rolled back, retry applies
+  subscription_create invoice   → starter credits rolled into the grant
+
+Run: python -m pytest -q verifuse_v2/tests/test_stripe_webhook.py
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+
+from conftest import PARTNER_PRICE
+
+
+def _event(event_type: str, obj: dict) -> str:
+    return json.dumps({
+        "id": f"evt_{uuid.uuid4().hex}",
+        "type": event_type,
+        "data": {"object": obj},
+    })
+
+
+def _subscription_status(db, user_id: str) -> str:
+    return db.execute(
+        "SELECT subscription_status FROM users WHERE user_id = ?", [user_id]
+    ).fetchone()[0]
+
+
+def test_duplicate_event_is_processed_once(client, db, add_user):
+    user_id = add_user(stripe_customer_id="cus_dup", subscription_status="active")
+    body = _event("customer.subscription.deleted", {"customer": "cus_dup"})
+
+    assert client.post("/api/webhook", content=body).json() == {"status": "ok"}
+    assert client.post("/api/webhook", content=body).json() == {"status": "already_processed"}
+
+    event_id = json.loads(body)["id"]
+    assert db.execute("SELECT COUNT(*) FROM stripe_events WHERE event_id = ?", [event_id]).fetchone()[0] == 1
+    assert db.execute(
+        "SELECT COUNT(*) FROM audit_log WHERE user_id = ? AND action = 'subscription_cancelled'", [user_id]
+    ).fetchone()[0] == 1
+
+
+def test_handler_error_rolls_back_event_claim(api, client, db, add_user, monkeypatch):
+    user_id = add_user(stripe_customer_id="cus_err", subscription_status="active")
+    body = _event("customer.subscription.deleted", {"customer": "cus_err"})
+    event_id = json.loads(body)["id"]
+    handler = api._handle_subscription_cancelled
+
+    def _fail_after_write(subscription, conn):
+        handler(subscription, conn)
+        raise RuntimeError("handler crashed after writing")
+
+    monkeypatch.setattr(api, "_handle_subscription_cancelled", _fail_after_write)
+    assert client.post("/api/webhook", content=body).status_code == 500
+
+    # Neither the event claim nor the handler's writes survive
+    assert db.execute("SELECT COUNT(*) FROM stripe_events WHERE event_id = ?", [event_id]).fetchone()[0] == 0
+    assert _subscription_status(db, user_id) == "active"
+
+    # Stripe's retry runs the handler for real
+    monkeypatch.setattr(api, "_handle_subscription_cancelled", handler)
+    assert client.post("/api/webhook", content=body).json() == {"status": "ok"}
+    assert _subscription_status(db, user_id) == "canceled"
+
+
+def test_subscription_create_rolls_over_starter_credits(api, client, db, add_user):
+    user_id = add_user(stripe_customer_id="cus_roll")
+    now = int(time.time())
+    starter_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+    db.executemany(
+        "INSERT INTO unlock_ledger_entries "
+        "(id, user_id, source, qty_total, qty_remaining, purchased_ts, expires_ts) "
+        "VALUES (?, ?, 'starter', 5, ?, ?, ?)",
+        [(starter_ids[0], user_id, 3, now - 3600, now + 86400),
+         (starter_ids[1], user_id, 2, now - 7200, now + 86400)],
+    )
+    db.commit()
+    invoice = {
+        "id": f"in_{uuid.uuid4().hex}",
+        "paid": True,
+        "status": "paid",
+        "amount_paid": 9900,
+        "amount_due": 9900,
+        "currency": "usd",
+        "customer": "cus_roll",
+        "subscription": "sub_roll",
+        "billing_reason": "subscription_create",
+        "lines": {"data": [{
+            "price": {"id": PARTNER_PRICE},
+            "amount": 9900,
+            "period": {"end": now + 30 * 86400},
+        }]},
+    }
+
+    r = client.post("/api/webhook", content=_event("invoice.payment_succeeded", invoice))
+    assert r.json() == {"status": "ok"}
+
+    remaining = db.execute(
+        "SELECT qty_remaining FROM unlock_ledger_entries WHERE id IN (?, ?)", starter_ids
+    ).fetchall()
+    assert [row[0] for row in remaining] == [0, 0]
+    monthly = api._PRICE_MAP[PARTNER_PRICE].monthly_credits
+    bonus = api.FIRST_MONTH_BONUS.get("partner", 0)
+    grant = db.execute(
+        "SELECT qty_total, stripe_event_id FROM unlock_ledger_entries "
+        "WHERE user_id = ? AND source = 'subscription'", [user_id]
+    ).fetchone()
+    assert grant["qty_total"] == monthly + 5 + bonus
+    assert grant["stripe_event_id"] == invoice["id"]
+    rollover = db.execute(
+        "SELECT meta_json FROM audit_log WHERE user_id = ? AND action = 'starter_rollover'", [user_id]
+    ).fetchone()
+    assert sorted(json.loads(rollover[0])["entry_ids"]) == sorted(starter_ids)
@@ -0,0 +1,70 @@
+"""
+VeriFuse — Verified-token cache tests
+=====================================
+_token_subject caches a bearer token's verified subject so repeat requests
+skip the HS256 check:
+
+  cached entry   → never outlives the token's own exp
+  invalid token  → None, and never cached (bad signature or expired)
+  full cache     → least recently used token evicted first
+
+Run: python -m pytest -q verifuse_v2/tests/test_token_cache.py
+"""
+
+from __future__ import annotations
+
+import collections
+import time
+
+import jwt
+import pytest
+
+
+@pytest.fixture
+def cache(api, monkeypatch):
+    fresh = collections.OrderedDict()
+    monkeypatch.setattr(api, "_token_cache", fresh)
+    return fresh
+
+
+def _token(sub: str, exp_in: float = 3600, secret: str = "test-jwt-secret") -> str:
+    return jwt.encode({"sub": sub, "exp": int(time.time() + exp_in)}, secret, algorithm="HS256")
+
+
+def test_entry_capped_at_token_exp(api, cache):
+    token = _token("user-soon", exp_in=5)
+    assert api._token_subject(token) == "user-soon"
+    valid_until, sub = cache[token]
+    assert sub == "user-soon"
+    assert valid_until == jwt.decode(token, options={"verify_signature": False})["exp"]
+    assert valid_until < time.time() + api._TOKEN_CACHE_TTL
+
+
+def test_long_lived_token_uses_cache_ttl(api, cache):
+    token = _token("user-long")
+    before = time.time()
+    api._token_subject(token)
+    assert cache[token][0] <= time.time() + api._TOKEN_CACHE_TTL
+    assert cache[token][0] >= before + api._TOKEN_CACHE_TTL
+
+
+@pytest.mark.parametrize("token", [
+    _token("user-forged", secret="wrong-secret"),
+    _token("user-expired", exp_in=-60),
+    "not-a-jwt",
+])
+def test_invalid_token_never_cached(api, cache, token):
+    assert api._token_subject(token) is None
+    assert api._token_subject(token) is None
+    assert token not in cache
+
+
+def test_lru_eviction(api, cache, monkeypatch):
+    monkeypatch.setattr(api, "_TOKEN_CACHE_MAX", 2)
+    a, b, c = _token("a"), _token("b"), _token("c")
+    api._token_subject(a)
+    api._token_subject(b)
+    api._token_subject(a)  # hit: a becomes most recently used
+
+    api._token_subject(c)
+    assert list(cache) == [a, c]
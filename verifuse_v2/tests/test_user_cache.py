@@ -0,0 +1,55 @@
+"""
+VeriFuse — Cross-worker user cache invalidation tests
+=====================================================
+_load_user caches users rows per process. Migration 021's triggers bump
+user_auth_stamp.n when an access-control column changes (or a user is
+deleted) in ANY process; the next probe drops the whole cache:
+
+  deactivate via another connection → next request 403, not a cached 200
+  non-auth column change            → stamp unchanged
+
+Run: python -m pytest -q verifuse_v2/tests/test_user_cache.py
+"""
+
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture
+def auth(api, add_user, monkeypatch):
+    from verifuse_v2.server.auth import create_token
+
+    monkeypatch.setattr(api, "_USER_STAMP_PROBE_INTERVAL", 0.0)
+    user_id = add_user(is_active=1)
+    token = create_token(user_id, f"{user_id}@example.com", "recon")
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+def _stamp(db) -> int:
+    return db.execute("SELECT n FROM user_auth_stamp WHERE id = 1").fetchone()[0]
+
+
+def test_deactivation_in_another_process_drops_cache(client, db, auth):
+    user_id, headers = auth
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    # Written outside the API process, so no _invalidate_user_cache call
+    db.execute("UPDATE users SET is_active = 0 WHERE user_id = ?", [user_id])
+    db.commit()
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 403
+
+
+def test_only_auth_columns_bump_stamp(db, add_user):
+    user_id = add_user()
+    before = _stamp(db)
+
+    db.execute("UPDATE users SET full_name = 'Renamed' WHERE user_id = ?", [user_id])
+    db.commit()
+    assert _stamp(db) == before
+
+    db.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", [user_id])
+    db.execute("DELETE FROM users WHERE user_id = ?", [user_id])
+    db.commit()
+    assert _stamp(db) == before + 2
@@ -0,0 +1,59 @@
+"""
+VeriFuse — Write-behind queue tests
+===================================
+_flush_write_behind drains the queue and runs one executemany per
+statement, each under its own SAVEPOINT inside one writer transaction:
+a failing batch is rolled back and dropped, the others still commit.
+verification_state write-backs are queued once per lead until flushed.
+
+Run: python -m pytest -q verifuse_v2/tests/test_write_behind.py
+"""
+
+from __future__ import annotations
+
+import queue
+import uuid
+
+
+def test_flush_drops_only_the_failing_batch(api, db):
+    action = f"flush_{uuid.uuid4().hex[:8]}"
+    for _ in range(3):
+        api._audit_log_deferred("flush-user", action, {"n": 1})
+    api._write_behind.put(("INSERT INTO no_such_table (x) VALUES (?)", (1,)))
+    api._write_behind.put((api._DOWNLOAD_AUDIT_INSERT_SQL, ("flush-user", "lead-x", action, 1, "", api._sql_now())))
+
+    api._flush_write_behind()
+
+    assert db.execute("SELECT COUNT(*) FROM audit_log WHERE action = ?", [action]).fetchone()[0] == 3
+    assert db.execute("SELECT COUNT(*) FROM download_audit WHERE doc_type = ?", [action]).fetchone()[0] == 1
+    assert api._write_behind.empty()
+
+
+def test_flush_of_empty_queue_is_a_no_op(api):
+    api._flush_write_behind()
+    assert api._flush_write_behind() == 0
+
+
+def test_verification_state_write_back_is_queued_once_per_lead(api, monkeypatch):
+    monkeypatch.setattr(api, "_write_behind", queue.SimpleQueue())
+    lead_id = str(uuid.uuid4())
+
+    for _ in range(3):
+        api._queue_verification_state(lead_id, "RAW")
+    api._queue_verification_state(lead_id, "ATTORNEY_READY")
+
+    queued = [api._write_behind.get_nowait() for _ in range(api._write_behind.qsize())]
+    assert queued == [
+        (api._VERIFICATION_STATE_UPDATE_SQL, ("RAW", lead_id)),
+        (api._VERIFICATION_STATE_UPDATE_SQL, ("ATTORNEY_READY", lead_id)),
+    ]
+    api._queued_verification_state.pop(lead_id, None)
+
+
+def test_flush_rearms_verification_state_write_back(api, db, add_lead):
+    lead_id = add_lead()
+    api._queue_verification_state(lead_id, "RAW")
+    api._flush_write_behind()
+
+    assert lead_id not in api._queued_verification_state
+    assert db.execute("SELECT verification_state FROM leads WHERE id = ?", [lead_id]).fetchone()[0] == "RAW"